@@ -0,0 +1,152 @@
+"""
+Benchmark da busca textual em audit_logs: LIKE nas colunas x FTS5.
+
+Gera um banco SQLite sintético com o schema da aplicação e N logs (detalhes
+JSON com MAC, IP e nome de host, como os gravados por log_host_*), e mede o
+tempo de cada consulta de busca.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_audit_fts --rows 2000000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+
+from src.models.user import db
+from src.models.audit_log import AuditLog
+
+USERS = [f'usuario.{i:02d}' for i in range(30)] + ['anonymous']
+ACTIONS = ['CREATE', 'UPDATE', 'DELETE', 'LOGIN', 'LOGOUT', 'VIEW', 'RESTART']
+BATCH = 50000
+
+
+def random_mac(rng):
+    return ':'.join(f'{rng.randrange(256):02X}' for _ in range(6))
+
+
+def synthetic_rows(count, seed=42):
+    """Gera logs sintéticos em ordem cronológica."""
+    rng = random.Random(seed)
+    start = datetime.utcnow() - timedelta(days=365)
+    step = timedelta(days=365) / max(count, 1)
+    for i in range(count):
+        action = rng.choice(ACTIONS)
+        username = rng.choice(USERS)
+        host_name = f'HOST_{rng.randrange(200000):06d}'
+        if action in ('CREATE', 'UPDATE', 'DELETE'):
+            resource_type = 'HOST'
+            resource_name = host_name
+            details = json.dumps({
+                'host_name': host_name,
+                'mac_address': random_mac(rng),
+                'ip_address': f'10.8.{rng.randrange(32)}.{rng.randrange(256)}'
+            })
+        elif action in ('LOGIN', 'LOGOUT'):
+            resource_type, resource_name, details = 'USER', username, None
+        else:
+            resource_type, resource_name = 'CONFIG', 'dhcp_service'
+            details = 'Verificação de status do serviço DHCP: active'
+        yield {
+            'timestamp': start + step * i,
+            'user_id': None,
+            'username': username,
+            'action': action,
+            'resource_type': resource_type,
+            'resource_name': resource_name,
+            'details': details,
+            'ip_address': f'10.8.16.{rng.randrange(256)}',
+            'status': 'SUCCESS',
+            'error_message': None,
+            **AuditLog.host_columns(resource_type, resource_name, json.loads(details) if resource_type == 'HOST' else None)
+        }
+
+
+def populate(engine, rows):
+    """Cria o schema e insere os logs em lotes. Retorna o tempo gasto."""
+    db.metadata.create_all(engine)
+    AuditLog.upgrade_schema(engine)
+
+    insert = AuditLog.__table__.insert()
+    started = time.perf_counter()
+    batch = []
+    with engine.begin() as conn:
+        for row in synthetic_rows(rows):
+            batch.append(row)
+            if len(batch) >= BATCH:
+                conn.execute(insert, batch)
+                batch = []
+        if batch:
+            conn.execute(insert, batch)
+    return time.perf_counter() - started
+
+
+def timed(conn, sql, params, repeat):
+    """Executa a consulta `repeat` vezes e retorna (melhor tempo, linhas)."""
+    best = None
+    result = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = conn.execute(text(sql), params).fetchall()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000000, help='Quantidade de logs sintéticos')
+    parser.add_argument('--repeat', type=int, default=3, help='Execuções por consulta')
+    parser.add_argument('--db', help='Arquivo SQLite a usar (padrão: temporário)')
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix='bench_fts_'), 'audit.db')
+    engine = create_engine(f'sqlite:///{path}')
+
+    with engine.connect() as conn:
+        existing = conn.execute(text(
+            "SELECT count(*) FROM sqlite_master WHERE name = 'audit_logs'"
+        )).scalar()
+    if not existing:
+        elapsed = populate(engine, args.rows)
+        print(f'{args.rows} logs inseridos em {elapsed:.1f}s ({path})')
+
+    with engine.connect() as conn:
+        sample = conn.execute(text(
+            "SELECT details FROM audit_logs WHERE resource_type = 'HOST' "
+            "ORDER BY id DESC LIMIT 1"
+        )).scalar()
+        mac = json.loads(sample)['mac_address']
+        host = json.loads(sample)['host_name']
+
+        searches = [
+            ('MAC completo', mac),
+            ('prefixo de MAC', mac[:8]),
+            ('nome de host', host),
+            ('usuário', 'usuario.07'),
+        ]
+
+        print(f"\n{'busca':<16} {'LIKE (ms)':>12} {'FTS5 (ms)':>12} {'linhas':>8}")
+        for label, term in searches:
+            like_sql = (
+                "SELECT id FROM audit_logs WHERE username LIKE :p OR resource_name LIKE :p "
+                "OR details LIKE :p ORDER BY timestamp DESC, id DESC LIMIT 100"
+            )
+            fts_sql = (
+                "SELECT id FROM audit_logs WHERE id IN ("
+                "SELECT rowid FROM audit_logs_fts WHERE audit_logs_fts MATCH :m) "
+                "ORDER BY timestamp DESC, id DESC LIMIT 100"
+            )
+            like_time, like_rows = timed(conn, like_sql, {'p': f'%{term}%'}, args.repeat)
+            match = '"' + term.replace('"', '""') + '" *'
+            fts_time, fts_rows = timed(conn, fts_sql, {'m': match}, args.repeat)
+            print(f'{label:<16} {like_time * 1000:>12.1f} {fts_time * 1000:>12.1f} {fts_rows:>8}')
+
+
+if __name__ == '__main__':
+    main()
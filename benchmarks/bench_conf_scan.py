@@ -0,0 +1,186 @@
+"""
+Comparação entre a leitura do dhcpd.conf em modo texto (implementação
+anterior: o arquivo inteiro decodificado em uma str ou em uma lista de
+linhas) e a varredura em bytes sobre o arquivo mapeado (mmap).
+
+Para cada tamanho gera um dhcpd.conf sintético de vários megabytes
+(benchmarks/synthetic.py) e mede tempo e pico de memória alocada pelo Python
+(tracemalloc) de:
+    - parse: hosts do arquivo (lista de dicts antes, HostTable agora)
+    - used_ips: conjunto de IPs fixos
+    - delete / update: edição de um host no meio do arquivo
+
+As páginas mapeadas ficam no cache de páginas do sistema e não entram no
+pico. Com --check, confere também que as duas implementações produzem o
+mesmo resultado (hosts e arquivo editado, byte a byte).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_conf_scan --hosts 20000 100000 --check
+"""
+import argparse
+import os
+import re
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import dhcp_parser
+from benchmarks import synthetic
+
+TEXT_HOST_RE = r'host\s+([\w\d_.-]+)\s*\{([^}]+)\}'
+TEXT_IP_RE = r'fixed-address\s+([0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3});'
+
+
+# Implementação anterior, em modo texto
+
+def text_parse(path):
+    with open(path, 'r') as f:
+        content = f.read()
+    hosts = []
+    for name, block in re.findall(TEXT_HOST_RE, content, re.DOTALL):
+        mac = re.search(r'hardware\s+ethernet\s+([0-9a-fA-F:]{17});', block)
+        ip = re.search(TEXT_IP_RE, block)
+        if mac and ip:
+            date = re.search(r'#\s*Data:\s*(\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2})', block)
+            hosts.append({'name': name, 'mac_address': mac.group(1), 'ip_address': ip.group(1),
+                          'registration_date': date.group(1) if date else 'N/A'})
+    return hosts
+
+
+def text_used_ips(path):
+    with open(path, 'r') as f:
+        content = f.read()
+    return set(re.findall(TEXT_IP_RE, content))
+
+
+def text_delete(path, host_name):
+    with open(path, 'r') as f:
+        lines = f.readlines()
+    new_lines = []
+    in_block = False
+    for line in lines:
+        if re.search(r'^\s*host\s+' + re.escape(host_name) + r'\s*\{', line):
+            in_block = True
+            continue
+        if in_block:
+            if re.search(r'^\s*\}', line):
+                in_block = False
+            continue
+        new_lines.append(line)
+    with open(path, 'w') as f:
+        f.writelines(new_lines)
+
+
+def text_update(path, host_name, mac_address, ip_address):
+    with open(path, 'r') as f:
+        lines = f.readlines()
+    new_lines = []
+    in_block = False
+    for line in lines:
+        if re.search(r'^\s*host\s+' + re.escape(host_name) + r'\s*\{', line):
+            in_block = True
+            new_lines.append(line)
+            continue
+        if in_block:
+            if re.search(r'hardware ethernet', line):
+                new_lines.append(f'\t\t\t\thardware ethernet {mac_address};\n')
+                continue
+            elif re.search(r'fixed-address', line):
+                new_lines.append(f'\t\t\t\tfixed-address {ip_address};\n')
+                continue
+            elif re.search(r'^\s*\}', line):
+                in_block = False
+        new_lines.append(line)
+    with open(path, 'w') as f:
+        f.writelines(new_lines)
+
+
+# Implementação atual, sobre o arquivo mapeado
+
+def mmap_delete(path, host_name):
+    dhcp_parser.apply_edits(path, lambda conf: [
+        (start, end, b'') for start, end in dhcp_parser.find_host_blocks(conf, host_name)])
+
+
+def mmap_update(path, host_name, mac_address, ip_address):
+    from src.routes.dhcp import rewrite_host_block
+    dhcp_parser.apply_edits(path, lambda conf: [
+        (start, end, rewrite_host_block(conf[start:end], mac_address, ip_address))
+        for start, end in dhcp_parser.find_host_blocks(conf, host_name)])
+
+
+def measure(func, repeat, setup=None):
+    """Retorna (mediana do tempo em ms, maior pico de memória em MiB)."""
+    timings = []
+    peaks = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        tracemalloc.start()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return statistics.median(timings) * 1000, max(peaks) / 2 ** 20
+
+
+def run(host_count, repeat, workdir, check):
+    conf_path = os.path.join(workdir, f'dhcpd_{host_count}.conf')
+    work_path = os.path.join(workdir, f'dhcpd_{host_count}.work')
+    hosts, _ = synthetic.generate(conf_path, os.path.join(workdir, 'ips.sh'), host_count)
+    target = hosts[len(hosts) // 2]
+    size_mib = os.path.getsize(conf_path) / 2 ** 20
+    restore = lambda: shutil.copyfile(conf_path, work_path)
+
+    if check:
+        expected = [dict(host, mac_address=host['mac_address'].upper()) for host in text_parse(conf_path)]
+        assert dhcp_parser.parse_hosts(conf_path).to_dicts() == expected, 'parse diverge'
+        assert text_used_ips(conf_path) == dhcp_parser.get_used_ips(conf_path), 'used_ips diverge'
+        for text_func, mmap_func, args in ((text_delete, mmap_delete, ()),
+                                           (text_update, mmap_update, ('02:00:00:00:00:01', '10.250.0.1'))):
+            restore()
+            text_func(work_path, target['name'], *args)
+            with open(work_path, 'rb') as f:
+                expected = f.read()
+            restore()
+            mmap_func(work_path, target['name'], *args)
+            with open(work_path, 'rb') as f:
+                assert f.read() == expected, f'{mmap_func.__name__} diverge'
+
+    rows = []
+    cases = (
+        ('parse', lambda: text_parse(conf_path), lambda: dhcp_parser.parse_hosts(conf_path), None),
+        ('used_ips', lambda: text_used_ips(conf_path), lambda: dhcp_parser.get_used_ips(conf_path), None),
+        ('delete', lambda: text_delete(work_path, target['name']),
+         lambda: mmap_delete(work_path, target['name']), restore),
+        ('update', lambda: text_update(work_path, target['name'], '02:00:00:00:00:01', '10.250.0.1'),
+         lambda: mmap_update(work_path, target['name'], '02:00:00:00:00:01', '10.250.0.1'), restore),
+    )
+    for name, text_func, mmap_func, setup in cases:
+        text_ms, text_mib = measure(text_func, repeat, setup)
+        mmap_ms, mmap_mib = measure(mmap_func, repeat, setup)
+        rows.append((name, host_count, size_mib, text_ms, text_mib, mmap_ms, mmap_mib))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hosts', type=int, nargs='+', default=[20000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--check', action='store_true', help='Confere se as implementações coincidem')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_conf_scan_')
+    print(f"{'op':<9} {'hosts':>7} {'MiB':>6} {'texto ms':>9} {'texto MiB':>10} {'mmap ms':>8} {'mmap MiB':>9}")
+    for host_count in args.hosts:
+        for name, hosts, size, text_ms, text_mib, mmap_ms, mmap_mib in run(host_count, args.repeat,
+                                                                            workdir, args.check):
+            print(f'{name:<9} {hosts:>7} {size:>6.1f} {text_ms:>9.1f} {text_mib:>10.1f} '
+                  f'{mmap_ms:>8.1f} {mmap_mib:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+"""
+Suíte de benchmarks do parser e dos endpoints de DHCP.
+
+Para cada tamanho de inventário gera um dhcpd.conf e um ips_disponiveis.sh
+sintéticos (benchmarks/synthetic.py) e mede:
+    - parser: parse_dhcp_conf, parse_hosts e get_used_ips; leitura das
+      regras (load_rules) e compilação do índice (RuleIndex)
+    - inicialização: host_inventory.warm analisando os arquivos e a partir
+      do snapshot binário (src/utils/inventory_snapshot.py)
+    - leitura pela API: /available-ips, /hosts e /hosts_status (com o
+      fabricante de cada MAC, pelo oui.csv do repositório), com o cache do
+      inventário frio (invalidado antes de cada chamada) e quente
+    - mutações pela API: /register, PUT, PATCH e DELETE em /hosts/<nome>
+
+O systemctl é substituído pelo stub do SANDBOX_ENV. O resultado é gravado em
+JSON (--output) para comparação entre execuções (--compare).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_dhcp --hosts 1000 10000 --output resultado.json
+    python -m benchmarks.bench_dhcp --hosts 1000 10000 --compare resultado.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+os.environ.setdefault('SANDBOX_ENV', 'true')
+
+from dhcp_parser import parse_dhcp_conf, parse_hosts, get_used_ips
+from src.main import create_app, init_database
+from src.models.user import db, User
+from src.config import Config
+from src.utils import host_inventory, oui_registry, rule_store
+from benchmarks import synthetic
+
+# Regressões acima desta razão (atual / referência) são destacadas no --compare
+DEFAULT_THRESHOLD = 1.10
+
+
+def summarize(name, host_count, timings):
+    timings = sorted(timings)
+    return {
+        'bench': name,
+        'hosts': host_count,
+        'repeat': len(timings),
+        'median_ms': statistics.median(timings) * 1000,
+        'min_ms': timings[0] * 1000,
+        'p95_ms': timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000,
+        'mean_ms': statistics.mean(timings) * 1000,
+    }
+
+
+def measure(func, repeat, setup=None):
+    timings = []
+    for i in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func(i)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def make_client(workdir, conf_path, rules_path):
+    registry_path = os.path.join(workdir, 'oui.bin')
+    oui_registry.build([Config.OUI_SOURCE_PATH], registry_path)
+    app = create_app({
+        'SECRET_KEY': 'benchmark',
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'app.db')}",
+        'DHCP_CONF_PATH': conf_path,
+        'RULES_PATH': rules_path,
+        'OUI_REGISTRY_PATH': registry_path,
+        'HOST_CHANGES_DB': os.path.join(workdir, 'host_changes.db'),
+        'AUDIT_SYNC': True,
+        'LOGIN_THROTTLE_ENABLED': False,
+        'METRICS_ENABLED': False,
+    })
+    init_database(app)
+    with app.app_context():
+        if not User.query.filter_by(username='bench').first():
+            user = User(username='bench', email='bench@example.com')
+            user.set_password('bench')
+            db.session.add(user)
+            db.session.commit()
+    client = app.test_client()
+    client.post('/api/auth/login', json={'username': 'bench', 'password': 'bench'})
+    return client
+
+
+def check(response):
+    if response.status_code != 200:
+        raise RuntimeError(f'{response.request.method} {response.request.path}: '
+                           f'{response.status_code} {response.get_data(as_text=True)[:200]}')
+    return response
+
+
+def run_size(host_count, repeat, workdir, seed):
+    conf_path = os.path.join(workdir, f'dhcpd_{host_count}.conf')
+    script_path = os.path.join(workdir, f'ips_{host_count}.sh')
+    rules_path = os.path.join(workdir, f'ip_rules_{host_count}.json')
+    hosts, rules = synthetic.generate(conf_path, script_path, host_count, seed)
+    rule_store.migrate(script_path, rules_path, force=True)
+    results = []
+
+    # Parser
+    for name, func, path in (('parse_dhcp_conf', parse_dhcp_conf, conf_path),
+                             ('parse_hosts', parse_hosts, conf_path),
+                             ('get_used_ips', get_used_ips, conf_path),
+                             ('load_rules', rule_store.load_rules, rules_path)):
+        results.append(summarize(name, host_count, measure(lambda i: func(path), repeat)))
+    loaded_rules = rule_store.load_rules(rules_path)
+    results.append(summarize('rule_index', host_count, measure(lambda i: rule_store.RuleIndex(loaded_rules), repeat)))
+
+    # Inicialização a frio, sem e com o snapshot
+    snapshot_path = os.path.join(workdir, f'inventory_{host_count}.snap')
+    results.append(summarize('warm_parse', host_count, measure(
+        lambda i: host_inventory.warm(conf_path, rules_path), repeat, setup=lambda: host_inventory.invalidate())))
+    host_inventory.invalidate()
+    host_inventory.warm(conf_path, rules_path, snapshot_path)
+    results.append(summarize('warm_snapshot', host_count, measure(
+        lambda i: host_inventory.warm(conf_path, rules_path, snapshot_path), repeat,
+        setup=lambda: host_inventory.invalidate())))
+
+    client = make_client(workdir, conf_path, rules_path)
+    headers = {'Accept-Encoding': 'identity'}
+    rule = rules[len(rules) // 2]
+    reads = {
+        'api_available_ips': f"/api/dhcp/available-ips?start={rule['inicio']}&end={rule['fim']}",
+        'api_hosts': '/api/dhcp/hosts',
+        'api_hosts_status': '/api/dhcp/hosts_status',
+    }
+    for name, url in reads.items():
+        cold = measure(lambda i: check(client.get(url, headers=headers)), repeat,
+                       setup=lambda: host_inventory.invalidate())
+        results.append(summarize(f'{name}_cold', host_count, cold))
+        warm = measure(lambda i: check(client.get(url, headers=headers)), repeat)
+        results.append(summarize(f'{name}_warm', host_count, warm))
+
+    # Mutações: cada iteração cadastra, altera, renomeia e exclui um host novo
+    used = {host['ip_address'] for host in hosts}
+    free_ips = [ip for rule in rules
+                for ip in map(synthetic.ip_to_str, range(synthetic.ip_to_int(rule['inicio']),
+                                                         synthetic.ip_to_int(rule['fim']) + 1))
+                if ip not in used]
+    if len(free_ips) < 2 * repeat:
+        raise RuntimeError('IPs livres insuficientes para as mutações')
+
+    def register(i):
+        check(client.post('/api/dhcp/register', json={
+            'host_name': f'BENCH_{i}', 'mac_address': f'02:BE:00:00:{i >> 8:02X}:{i & 0xFF:02X}',
+            'ip_address': free_ips[2 * i]}))
+
+    def update(i):
+        check(client.put(f'/api/dhcp/hosts/BENCH_{i}', json={
+            'mac_address': f'02:BE:00:01:{i >> 8:02X}:{i & 0xFF:02X}', 'ip_address': free_ips[2 * i + 1]}))
+
+    def rename(i):
+        check(client.patch(f'/api/dhcp/hosts/BENCH_{i}', json={'new_host_name': f'BENCH_RENOMEADO_{i}'}))
+
+    def delete(i):
+        check(client.delete(f'/api/dhcp/hosts/BENCH_RENOMEADO_{i}'))
+
+    timings = {'api_register': [], 'api_update': [], 'api_rename': [], 'api_delete': []}
+    for i in range(repeat):
+        for name, func in (('api_register', register), ('api_update', update),
+                           ('api_rename', rename), ('api_delete', delete)):
+            started = time.perf_counter()
+            func(i)
+            timings[name].append(time.perf_counter() - started)
+    for name, values in timings.items():
+        results.append(summarize(name, host_count, values))
+    return results
+
+
+def metadata(seed):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'seed': seed,
+    }
+
+
+def compare(results, baseline_path, threshold=DEFAULT_THRESHOLD):
+    with open(baseline_path, 'r') as f:
+        baseline = {(row['bench'], row['hosts']): row for row in json.load(f)['results']}
+    print(f"\n{'benchmark':<26} {'hosts':>7} {'ref ms':>10} {'atual ms':>10} {'razão':>7}", file=sys.stderr)
+    regressions = 0
+    for row in results:
+        reference = baseline.get((row['bench'], row['hosts']))
+        if reference is None:
+            continue
+        ratio = row['median_ms'] / reference['median_ms'] if reference['median_ms'] else float('inf')
+        flag = '  <-- regressão' if ratio > threshold else ''
+        regressions += bool(flag)
+        print(f"{row['bench']:<26} {row['hosts']:>7} {reference['median_ms']:>10.2f} "
+              f"{row['median_ms']:>10.2f} {ratio:>7.2f}{flag}", file=sys.stderr)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hosts', type=int, nargs='+', default=[1000, 10000],
+                        help='Tamanhos de inventário (até 500000)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Arquivo JSON de saída (padrão: stdout)')
+    parser.add_argument('--compare', help='JSON de uma execução anterior para comparação')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Razão da mediana acima da qual o --compare aponta regressão (sai com código 1)')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_dhcp_')
+    results = []
+    for host_count in args.hosts:
+        for row in run_size(host_count, args.repeat, workdir, args.seed):
+            print(f"{row['bench']:<26} {row['hosts']:>7} mediana {row['median_ms']:>10.2f} ms "
+                  f"p95 {row['p95_ms']:>10.2f} ms", file=sys.stderr)
+            results.append(row)
+
+    document = {'meta': metadata(args.seed), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2)
+    else:
+        json.dump(document, sys.stdout, indent=2)
+        print()
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark da serialização JSON e do tamanho das respostas dos endpoints de
+hosts (/api/dhcp/hosts e /api/dhcp/hosts_status).
+
+Para cada tamanho de inventário gera um dhcpd.conf sintético
+(benchmarks/synthetic.py) e mede:
+    - tempo de serialização da resposta com o provider da stdlib e com orjson
+    - bytes transferidos sem compressão, com gzip e com deflate
+    - tempo total da requisição (parse em cache + serialização + compressão)
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_json_compression --hosts 2500 25000 --repeat 20
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from flask.json.provider import DefaultJSONProvider
+
+from src.main import create_app, init_database
+from src.utils.rule_store import init_rules
+from src.models.user import db, User
+from src.utils.json_provider import OrjsonProvider, orjson
+from benchmarks import synthetic
+
+ENDPOINTS = ['/api/dhcp/hosts', '/api/dhcp/hosts_status']
+
+
+def median_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def run(count, repeat, workdir):
+    conf_path = os.path.join(workdir, f'dhcpd_{count}.conf')
+    rules_path = os.path.join(workdir, f'ips_{count}.sh')
+    synthetic.generate(conf_path, rules_path, count)
+    app = create_app({
+        'SECRET_KEY': 'benchmark',
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'app.db')}",
+        'DHCP_CONF_PATH': conf_path,
+        'IPS_SCRIPT_PATH': rules_path,
+        'RULES_PATH': os.path.join(workdir, f'ip_rules_{count}.json'),
+        'HOST_CHANGES_DB': os.path.join(workdir, 'host_changes.db'),
+        'AUDIT_SYNC': True,
+        'LOGIN_THROTTLE_ENABLED': False,
+    })
+    init_database(app)
+    init_rules(app)
+    with app.app_context():
+        if not User.query.filter_by(username='bench').first():
+            user = User(username='bench', email='bench@example.com')
+            user.set_password('bench')
+            db.session.add(user)
+            db.session.commit()
+
+    client = app.test_client()
+    client.post('/api/auth/login', json={'username': 'bench', 'password': 'bench'})
+
+    providers = {'stdlib': DefaultJSONProvider(app)}
+    if orjson is not None:
+        providers['orjson'] = OrjsonProvider(app)
+
+    results = []
+    for endpoint in ENDPOINTS:
+        payload = client.get(endpoint, headers={'Accept-Encoding': 'identity'}).get_json()
+        row = {'endpoint': endpoint, 'hosts': count}
+        with app.app_context():
+            for name, provider in providers.items():
+                row[f'{name}_ms'] = median_ms(lambda: provider.response(payload), repeat)
+        for encoding in ('identity', 'gzip', 'deflate'):
+            response = client.get(endpoint, headers={'Accept-Encoding': encoding})
+            row[f'{encoding}_bytes'] = len(response.data)
+            row[f'{encoding}_request_ms'] = median_ms(
+                lambda: client.get(endpoint, headers={'Accept-Encoding': encoding}), repeat)
+        results.append(row)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hosts', type=int, nargs='+', default=[2500, 25000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_json_')
+    print(f"{'endpoint':<24} {'hosts':>7} {'stdlib ms':>10} {'orjson ms':>10} "
+          f"{'bytes':>10} {'gzip':>9} {'deflate':>9} {'req ms':>8} {'req gzip ms':>12}")
+    for count in args.hosts:
+        for row in run(count, args.repeat, workdir):
+            print(f"{row['endpoint']:<24} {row['hosts']:>7} {row['stdlib_ms']:>10.1f} "
+                  f"{row.get('orjson_ms', float('nan')):>10.1f} {row['identity_bytes']:>10} "
+                  f"{row['gzip_bytes']:>9} {row['deflate_bytes']:>9} "
+                  f"{row['identity_request_ms']:>8.1f} {row['gzip_request_ms']:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark da latência de login sob ataque de força bruta (password spray).
+
+Sobe a aplicação em processo com um banco temporário e, durante alguns
+segundos, executa em paralelo:
+    - atacantes: threads que enviam senhas erradas para contas existentes
+      (o que obriga a verificação do hash), cada uma a partir de um IP
+    - usuários legítimos: logins corretos, cada um de um IP diferente
+
+Compara p50/p99 dos logins legítimos com o limitador ligado e desligado.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_login_throttle --attackers 8 --seconds 10
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from src.main import create_app, init_database
+from src.models.user import db, User
+from src.utils.audit_writer import audit_writer
+
+LEGIT_USERS = 50
+TARGET_USERS = 200
+PASSWORD = 'senha-correta'
+
+
+def make_app(db_path, throttle_enabled):
+    app = create_app({
+        'SECRET_KEY': 'benchmark',
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'LOGIN_THROTTLE_ENABLED': throttle_enabled,
+        # Rajada menor que o padrão para que o efeito apareça em poucos segundos
+        'LOGIN_THROTTLE_IP_BURST': 3,
+    })
+    init_database(app)
+
+    with app.app_context():
+        if not User.query.first():
+            names = [f'usuario{i}' for i in range(LEGIT_USERS)] + [f'alvo{i}' for i in range(TARGET_USERS)]
+            for name in names:
+                user = User(username=name, email=f'{name}@example.com')
+                user.set_password(PASSWORD)
+                db.session.add(user)
+            db.session.commit()
+    return app
+
+
+def percentile(values, pct):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run(throttle_enabled, attackers, seconds, db_path):
+    app = make_app(db_path, throttle_enabled)
+    deadline = time.perf_counter() + seconds
+    legit_latencies = []
+    attack = {'requests': 0, 'rejected': 0}
+    lock = threading.Lock()
+
+    def attacker(n):
+        client = app.test_client()
+        i = 0
+        while time.perf_counter() < deadline:
+            response = client.post('/api/auth/login',
+                                   json={'username': f'alvo{i % TARGET_USERS}', 'password': 'errada'},
+                                   environ_base={'REMOTE_ADDR': f'203.0.113.{n}'})
+            with lock:
+                attack['requests'] += 1
+                attack['rejected'] += response.status_code == 429
+            i += 1
+
+    def legit():
+        client = app.test_client()
+        i = 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = client.post('/api/auth/login',
+                                   json={'username': f'usuario{i % LEGIT_USERS}', 'password': PASSWORD},
+                                   environ_base={'REMOTE_ADDR': f'10.8.{i // 250}.{i % 250}'})
+            elapsed = time.perf_counter() - started
+            if response.status_code == 200:
+                legit_latencies.append(elapsed)
+            i += 1
+            time.sleep(0.1)
+
+    threads = [threading.Thread(target=attacker, args=(n,)) for n in range(attackers)]
+    threads.append(threading.Thread(target=legit))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    audit_writer.flush()
+
+    return {
+        'legit_logins': len(legit_latencies),
+        'p50_ms': percentile(legit_latencies, 50) * 1000,
+        'p99_ms': percentile(legit_latencies, 99) * 1000,
+        'mean_ms': statistics.mean(legit_latencies) * 1000 if legit_latencies else float('nan'),
+        'attack_requests': attack['requests'],
+        'attack_rejected': attack['rejected'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--attackers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='bench_login_'), 'app.db')
+
+    baseline = run(False, 0, args.seconds / 2, db_path)
+    print(f"sem ataque:           p50 {baseline['p50_ms']:.1f} ms  p99 {baseline['p99_ms']:.1f} ms "
+          f"({baseline['legit_logins']} logins)")
+    for enabled in (False, True):
+        result = run(enabled, args.attackers, args.seconds, db_path)
+        label = 'ataque, limitador ON ' if enabled else 'ataque, limitador OFF'
+        print(f"{label}: p50 {result['p50_ms']:.1f} ms  p99 {result['p99_ms']:.1f} ms "
+              f"({result['legit_logins']} logins; {result['attack_requests']} tentativas de ataque, "
+              f"{result['attack_rejected']} rejeitadas antes do hash)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark de leitura/escrita concorrente no SQLite por perfil de banco.
+
+Para cada perfil de src/utils/sqlite_profile.py cria um banco temporário com
+o schema da aplicação, e durante alguns segundos executa em paralelo:
+    - escritores: um log de auditoria por transação (como AUDIT_SYNC)
+    - leitores: a consulta da primeira página de /api/audit/logs
+
+Reporta operações por segundo e erros "database is locked" de cada lado.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_sqlite_profile --writers 4 --readers 8 --seconds 10
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+
+from src.models.user import db
+from src.models.audit_log import AuditLog
+from src.utils.sqlite_profile import PROFILES, apply_pragmas
+
+READ_SQL = text(
+    "SELECT * FROM audit_logs ORDER BY timestamp DESC, id DESC LIMIT 50"
+)
+
+
+def make_engine(path, profile, pool_size):
+    pragmas = PROFILES[profile]
+    connect_args = {}
+    if 'busy_timeout' in pragmas:
+        connect_args['timeout'] = pragmas['busy_timeout'] / 1000
+    engine = create_engine(
+        f'sqlite:///{path}', pool_size=pool_size, max_overflow=pool_size,
+        connect_args=connect_args
+    )
+    if pragmas:
+        event.listen(engine, 'connect', lambda conn, record: apply_pragmas(conn, pragmas))
+    return engine
+
+
+def run_profile(profile, writers, readers, seconds, seed_rows):
+    path = os.path.join(tempfile.mkdtemp(prefix=f'bench_{profile}_'), 'app.db')
+    engine = make_engine(path, profile, writers + readers)
+    db.metadata.create_all(engine)
+
+    insert = AuditLog.__table__.insert()
+
+    def row(i):
+        return {
+            'timestamp': datetime.utcnow(), 'user_id': None, 'username': f'usuario.{i % 20}',
+            'action': 'UPDATE', 'resource_type': 'HOST', 'resource_name': f'HOST_{i}',
+            'details': '{"mac_address": "00:11:22:33:44:55", "ip_address": "10.8.2.10"}',
+            'ip_address': '10.8.16.10', 'status': 'SUCCESS', 'error_message': None,
+            'host_name': f'HOST_{i}', 'host_prev_name': None,
+            'host_mac': '00:11:22:33:44:55', 'host_ip': '10.8.2.10'
+        }
+
+    with engine.begin() as conn:
+        conn.execute(insert, [row(i) for i in range(seed_rows)])
+
+    counters = {'writes': 0, 'reads': 0, 'write_errors': 0, 'read_errors': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def writer(worker):
+        i = 0
+        while time.perf_counter() < deadline:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert, [row(worker * 1000000 + i)])
+                key = 'writes'
+            except OperationalError:
+                key = 'write_errors'
+            with lock:
+                counters[key] += 1
+            i += 1
+
+    def reader():
+        while time.perf_counter() < deadline:
+            try:
+                with engine.connect() as conn:
+                    conn.execute(READ_SQL).fetchall()
+                key = 'reads'
+            except OperationalError:
+                key = 'read_errors'
+            with lock:
+                counters[key] += 1
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    return {key: value / seconds if key in ('writes', 'reads') else value
+            for key, value in counters.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--seed-rows', type=int, default=20000, help='Logs inseridos antes da medição')
+    parser.add_argument('--profiles', nargs='+', default=list(PROFILES), choices=list(PROFILES))
+    args = parser.parse_args()
+
+    print(f"{'perfil':<10} {'escritas/s':>12} {'leituras/s':>12} {'erros escrita':>14} {'erros leitura':>14}")
+    for profile in args.profiles:
+        result = run_profile(profile, args.writers, args.readers, args.seconds, args.seed_rows)
+        print(f"{profile:<10} {result['writes']:>12.0f} {result['reads']:>12.0f} "
+              f"{result['write_errors']:>14} {result['read_errors']:>14}")
+
+
+if __name__ == '__main__':
+    main()
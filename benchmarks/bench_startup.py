@@ -0,0 +1,89 @@
+"""
+Benchmark da inicialização da aplicação e da primeira requisição.
+
+Cada rodada executa um processo Python novo que mede:
+    - import: importar src.main (módulos, blueprints, modelos)
+    - create_app / init_database / warm_caches: etapas da inicialização
+    - primeira requisição a /api/dhcp/hosts, com e sem warm_caches
+
+O banco e a chave secreta ficam em um diretório temporário. O dhcpd.conf é
+somente lido; fora do servidor, aponte --dhcp-conf para uma cópia.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_startup --repeat 5 --dhcp-conf dhcpd.conf.bak
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+CHILD = r'''
+import json, os, sys, time
+started = time.perf_counter()
+from src.main import create_app, init_database, warm_caches
+import_s = time.perf_counter() - started
+
+from src.models.user import db, User
+app = create_app({'AUDIT_SYNC': True})
+init_database(app)
+if sys.argv[1] == 'warm':
+    warm_caches(app)
+
+with app.app_context():
+    if not User.query.filter_by(username='bench').first():
+        user = User(username='bench', email='bench@example.com')
+        user.set_password('bench')
+        db.session.add(user)
+        db.session.commit()
+
+client = app.test_client()
+client.post('/api/auth/login', json={'username': 'bench', 'password': 'bench'})
+request_started = time.perf_counter()
+response = client.get('/api/dhcp/hosts')
+first_request_s = time.perf_counter() - request_started
+assert response.status_code == 200, response.status_code
+
+timings = dict(app.extensions['startup_timings'])
+timings['import'] = import_s
+timings['first_request'] = first_request_s
+print(json.dumps(timings))
+'''
+
+STEPS = ['import', 'create_app', 'init_database', 'warm_caches', 'first_request']
+
+
+def run_child(mode, workdir, dhcp_conf):
+    env = dict(os.environ)
+    if dhcp_conf:
+        env['DHCP_CONF_PATH'] = os.path.abspath(dhcp_conf)
+    env.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(workdir, 'app.db')}")
+    env.setdefault('SECRET_KEY_FILE', os.path.join(workdir, 'secret_key'))
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD, mode], env=env, check=True,
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--dhcp-conf', help='dhcpd.conf usado (padrão: DHCP_CONF_PATH)')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_startup_')
+    print(f"{'modo':<8} " + ' '.join(f'{step:>15}' for step in STEPS) + '   (mediana, ms)')
+    for mode in ('cold', 'warm'):
+        results = [run_child(mode, workdir, args.dhcp_conf) for _ in range(args.repeat)]
+        cells = []
+        for step in STEPS:
+            values = [result[step] for result in results if step in result]
+            cells.append(f'{statistics.median(values) * 1000:>15.1f}' if values else f"{'-':>15}")
+        print(f"{mode:<8} " + ' '.join(cells))
+
+
+if __name__ == '__main__':
+    main()
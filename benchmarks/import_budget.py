@@ -0,0 +1,108 @@
+"""
+Orçamento de tempo de importação dos módulos de entrada (-X importtime).
+
+Para cada alvo, um processo Python novo pré-importa o framework (Flask,
+Flask-SQLAlchemy, Flask-Login, comum a todos) e em seguida o alvo; o tempo
+medido é o custo próprio do projeto, mais estável entre máquinas que o
+total. Também verifica que o alvo não importa módulos que não usa (ex.: o
+create_user.py não deve carregar rotas nem o parser do DHCP).
+
+Sai com código 1 se algum alvo estourar o orçamento ou importar um módulo
+proibido. Os mesmos orçamentos são verificados por
+tests/test_import_budget.py.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.import_budget
+    python -m benchmarks.import_budget --repeat 9 --scale 2   # máquina lenta
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+PRELOAD = 'flask_sqlalchemy, flask_login'
+
+# Módulos da aplicação web que CLIs e a importação de src.main não devem carregar
+WEB_STACK = ['src.routes', 'src.utils.profiling', 'src.utils.static_assets', 'src.utils.compression',
+             'src.utils.metrics', 'dhcp_parser', 'dhcp_service_manager']
+
+# alvo: (orçamento em ms, prefixos de módulos proibidos)
+BUDGETS = {
+    'src.main': (30, WEB_STACK + ['src.models.audit_log']),
+    'create_user': (30, WEB_STACK + ['src.models.audit_log']),
+    'src.utils.audit_archive': (60, WEB_STACK),
+    'dhcp_parser': (10, ['flask', 'sqlalchemy', 'src']),
+}
+
+LINE_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(target):
+    """
+    Importa o alvo em um processo novo.
+
+    Returns:
+        tupla (tempo cumulativo do alvo em ms, lista de módulos importados)
+    """
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {PRELOAD}; import {target}'],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stderr
+    modules = []
+    cumulative = None
+    for line in stderr.splitlines():
+        match = LINE_RE.match(line)
+        if not match:
+            continue
+        if not match.group(3):
+            # Linha de nível superior: os filhos aparecem antes dela
+            if match.group(4) == target:
+                modules.append(target)
+                cumulative = int(match.group(2)) / 1000
+                break
+            modules = []
+            continue
+        modules.append(match.group(4))
+    if cumulative is None:
+        # Já importado pelo pré-carregamento
+        cumulative = 0.0
+    return cumulative, modules
+
+
+def forbidden_imports(modules, prefixes):
+    return sorted({name for name in modules
+                   for prefix in prefixes if name == prefix or name.startswith(prefix + '.')})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='Medições por alvo (usa a mediana)')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiplicador dos orçamentos')
+    parser.add_argument('targets', nargs='*', help='Alvos (padrão: todos de BUDGETS)')
+    args = parser.parse_args()
+
+    failures = 0
+    print(f"{'alvo':<26} {'mediana ms':>11} {'orçamento':>10}  situação")
+    for target in args.targets or BUDGETS:
+        budget, prefixes = BUDGETS.get(target, (float('inf'), []))
+        budget *= args.scale
+        runs = [measure(target) for _ in range(args.repeat)]
+        elapsed = statistics.median(run[0] for run in runs)
+        forbidden = forbidden_imports(runs[0][1], prefixes)
+
+        problems = []
+        if elapsed > budget:
+            problems.append('acima do orçamento')
+        if forbidden:
+            problems.append('importa ' + ', '.join(forbidden))
+        failures += bool(problems)
+        print(f"{target:<26} {elapsed:>11.1f} {budget:>10.0f}  {'; '.join(problems) or 'ok'}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
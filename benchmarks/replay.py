@@ -0,0 +1,402 @@
+"""
+Reprodução de logs de acesso (Werkzeug ou formato combinado) como teste de
+carga.
+
+Cada linha de requisição do log (ex.: flask.log) vira uma requisição agendada
+no mesmo instante relativo em que foi feita, dividido por --speed (compressão
+do tempo; 0 dispara tudo sem espera). --concurrency clientes, cada um com a
+sua sessão autenticada, executam a fila. Ao final são informados a vazão e,
+por rota, p50/p95/p99 da latência e a taxa de erros (status >= 400 ou falha
+de conexão).
+
+Alvos:
+    - em processo (padrão): create_app com uma configuração isolada, com
+      banco, chave secreta, dhcpd.conf e ips_disponiveis.sh sintéticos
+      (benchmarks/synthetic.py) em um diretório temporário e o systemctl
+      substituído pelo stub do SANDBOX_ENV. --config aponta um arquivo
+      Python com configurações que sobrescrevem as do sandbox
+    - --url: uma instância local já em execução, autenticada com
+      --username/--password (ou REPLAY_PASSWORD)
+
+Os logs não guardam o corpo das requisições: apenas GET/HEAD são
+reproduzidos. O login é feito uma vez por cliente no início e as demais
+linhas (POST, PUT, PATCH, DELETE) são contadas como ignoradas.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.replay flask.log --speed 10 --concurrency 4
+    python -m benchmarks.replay flask.log --speed 0 --repeat 20 --hosts 10000 --output replay.json
+    python -m benchmarks.replay flask.log --url http://127.0.0.1:5000 --username admin
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import queue
+import re
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from datetime import datetime
+
+os.environ.setdefault('SANDBOX_ENV', 'true')
+
+from flask import Config
+from werkzeug.exceptions import HTTPException
+
+from src.main import create_app, init_database, warm_caches
+from src.models.user import db, User
+from benchmarks import synthetic
+
+REPLAYED_METHODS = frozenset(['GET', 'HEAD'])
+
+ANSI_RE = re.compile(r'\x1b\[[0-9;]*m')
+# Werkzeug: 10.8.30.191 - - [02/Nov/2025 18:32:30] "GET /api/ HTTP/1.0" 200 -
+# Combinado: 10.8.30.191 - - [02/Nov/2025:18:32:30 -0300] "GET /api/ HTTP/1.1" 200 512 "-" "Mozilla/5.0"
+LINE_RE = re.compile(
+    r'^\S+ \S+ \S+ \[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<path>\S+) [^"]*" (?P<status>\d{3}) ')
+TIME_FORMATS = ('%d/%b/%Y %H:%M:%S', '%d/%b/%Y:%H:%M:%S %z')
+
+SANDBOX_USER = 'replay'
+
+
+def parse_log(path):
+    """
+    Lê as linhas de requisição de um log de acesso, ignorando as demais
+    (avisos, tracebacks, mensagens do servidor) e as cores ANSI do Werkzeug.
+
+    Returns:
+        list de dicts com 'time' (datetime), 'method', 'path' e 'status'
+    """
+    entries = []
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            match = LINE_RE.match(ANSI_RE.sub('', line))
+            if not match:
+                continue
+            for time_format in TIME_FORMATS:
+                try:
+                    timestamp = datetime.strptime(match.group('time'), time_format)
+                    break
+                except ValueError:
+                    continue
+            else:
+                continue
+            entries.append({
+                'time': timestamp.replace(tzinfo=None),
+                'method': match.group('method'),
+                'path': match.group('path'),
+                'status': int(match.group('status')),
+            })
+    return entries
+
+
+def schedule(entries, speed, repeat):
+    """
+    Calcula o instante (segundos desde o início) de cada requisição. Com
+    repeat > 1 o log é reproduzido em sequência, uma vez após a outra.
+
+    Returns:
+        list de tuplas (instante, entrada)
+    """
+    if not entries:
+        return []
+    first = entries[0]['time']
+    span = (entries[-1]['time'] - first).total_seconds()
+    plan = []
+    for round_ in range(repeat):
+        for entry in entries:
+            offset = (entry['time'] - first).total_seconds() + round_ * (span + 1)
+            plan.append((offset / speed if speed else 0.0, entry))
+    return plan
+
+
+class RouteResolver:
+    """Agrupa os caminhos pela regra de URL da aplicação (ex.: /api/dhcp/hosts/<string:host_name>)."""
+
+    def __init__(self, app):
+        self.adapter = app.url_map.bind('localhost')
+        self._cache = {}
+
+    def __call__(self, method, path):
+        path = path.split('?', 1)[0]
+        key = (method, path)
+        route = self._cache.get(key)
+        if route is None:
+            try:
+                rule, _ = self.adapter.match(path, method=method, return_rule=True)
+                route = rule.rule
+            except HTTPException:
+                route = path
+            self._cache[key] = route
+        return route
+
+
+class InProcessTarget:
+    """Executa as requisições na aplicação WSGI em processo, com um test client por thread."""
+
+    def __init__(self, app, username, password):
+        self.app = app
+        self.username = username
+        self.password = password
+        self._local = threading.local()
+
+    def _client(self):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self.app.test_client()
+            if self.username:
+                client.post('/api/auth/login', json={'username': self.username, 'password': self.password})
+            self._local.client = client
+        return client
+
+    def request(self, method, path):
+        response = self._client().open(path, method=method)
+        response.close()
+        return response.status_code
+
+
+class HttpTarget:
+    """Executa as requisições contra uma instância em execução, com uma sessão (cookies) por thread."""
+
+    def __init__(self, base_url, username, password, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _opener(self):
+        opener = getattr(self._local, 'opener', None)
+        if opener is None:
+            opener = urllib.request.build_opener(
+                urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+            if self.username:
+                body = json.dumps({'username': self.username, 'password': self.password}).encode()
+                login = urllib.request.Request(f'{self.base_url}/api/auth/login', data=body,
+                                               headers={'Content-Type': 'application/json'})
+                self._send(opener, login)
+            self._local.opener = opener
+        return opener
+
+    def _send(self, opener, req):
+        try:
+            with opener.open(req, timeout=self.timeout) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+
+    def request(self, method, path):
+        opener = self._opener()
+        return self._send(opener, urllib.request.Request(f'{self.base_url}{path}', method=method))
+
+
+def sandbox_app(workdir, host_count, seed, config_file=None):
+    """
+    Cria a aplicação com banco, chave secreta e arquivos do DHCP sintéticos em
+    workdir e um usuário para os clientes da reprodução.
+    """
+    conf_path = os.path.join(workdir, 'dhcpd.conf')
+    rules_path = os.path.join(workdir, 'ips_disponiveis.sh')
+    synthetic.generate(conf_path, rules_path, host_count, seed)
+
+    config = {
+        'SECRET_KEY': 'replay',
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'app.db')}",
+        'DHCP_CONF_PATH': conf_path,
+        'IPS_SCRIPT_PATH': rules_path,
+        'RULES_PATH': os.path.join(workdir, 'ip_rules.json'),
+        'INVENTORY_SNAPSHOT_PATH': os.path.join(workdir, 'inventory.snap'),
+        'HOST_CHANGES_DB': os.path.join(workdir, 'host_changes.db'),
+        'AUDIT_ARCHIVE_DIR': os.path.join(workdir, 'audit_archive'),
+        'PROFILING_DIR': os.path.join(workdir, 'profiles'),
+        'LOGIN_THROTTLE_ENABLED': False,
+    }
+    if config_file:
+        overrides = Config(os.getcwd())
+        overrides.from_pyfile(os.path.abspath(config_file))
+        config.update(overrides)
+
+    app = create_app(config)
+    init_database(app)
+    warm_caches(app)
+    with app.app_context():
+        if not User.query.filter_by(username=SANDBOX_USER).first():
+            user = User(username=SANDBOX_USER, email='replay@example.com')
+            user.set_password(SANDBOX_USER)
+            db.session.add(user)
+            db.session.commit()
+    return app
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float('nan')
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def replay(plan, target, resolver, concurrency):
+    """
+    Dispara as requisições nos instantes planejados com até concurrency
+    requisições simultâneas.
+
+    Returns:
+        tupla (amostras, duração em segundos), com uma amostra
+        (rota, status ou None, latência, atraso em relação ao plano) por
+        requisição
+    """
+    pending = queue.Queue(maxsize=concurrency * 2)
+    samples = []
+    samples_lock = threading.Lock()
+    started = time.perf_counter()
+
+    def worker():
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            offset, method, path = item
+            lag = time.perf_counter() - started - offset
+            request_started = time.perf_counter()
+            try:
+                status = target.request(method, path)
+            except Exception:
+                status = None
+            elapsed = time.perf_counter() - request_started
+            with samples_lock:
+                samples.append((resolver(method, path), status, elapsed, lag))
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for offset, entry in plan:
+        delay = offset - (time.perf_counter() - started)
+        if delay > 0:
+            time.sleep(delay)
+        pending.put((offset, entry['method'], entry['path']))
+    for _ in threads:
+        pending.put(None)
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def summarize(samples, duration):
+    by_route = defaultdict(list)
+    for route, status, elapsed, _ in samples:
+        by_route[route].append((status, elapsed))
+
+    routes = []
+    for route, items in sorted(by_route.items(), key=lambda item: -len(item[1])):
+        latencies = sorted(elapsed for _, elapsed in items)
+        errors = sum(1 for status, _ in items if status is None or status >= 400)
+        routes.append({
+            'route': route,
+            'requests': len(items),
+            'errors': errors,
+            'error_rate': errors / len(items),
+            'p50_ms': percentile(latencies, 0.50) * 1000,
+            'p95_ms': percentile(latencies, 0.95) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000,
+            'max_ms': latencies[-1] * 1000,
+        })
+
+    latencies = sorted(elapsed for _, _, elapsed, _ in samples)
+    lags = sorted(lag for _, _, _, lag in samples)
+    errors = sum(1 for _, status, _, _ in samples if status is None or status >= 400)
+    return {
+        'requests': len(samples),
+        'duration_s': duration,
+        'throughput_rps': len(samples) / duration if duration else float('nan'),
+        'errors': errors,
+        'error_rate': errors / len(samples) if samples else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        # Atraso em relação ao plano: alto indica concorrência insuficiente
+        'lag_p95_ms': percentile(lags, 0.95) * 1000,
+        'routes': routes,
+    }
+
+
+def print_report(report, skipped):
+    print(f"{'rota':<44} {'reqs':>6} {'erros':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}", file=sys.stderr)
+    for row in report['routes']:
+        print(f"{row['route']:<44} {row['requests']:>6} {row['error_rate']:>6.1%} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}", file=sys.stderr)
+    print(f"\n{report['requests']} requisições em {report['duration_s']:.2f} s "
+          f"({report['throughput_rps']:.1f} req/s), erros {report['error_rate']:.1%}, "
+          f"p50 {report['p50_ms']:.1f} ms, p95 {report['p95_ms']:.1f} ms, p99 {report['p99_ms']:.1f} ms, "
+          f"atraso p95 {report['lag_p95_ms']:.1f} ms", file=sys.stderr)
+    if skipped:
+        details = ', '.join(f'{method} {count}' for method, count in sorted(skipped.items()))
+        print(f'Ignoradas (sem corpo no log): {details}', file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('log', help='Log de acesso (Werkzeug ou formato combinado)')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='Compressão do tempo: 10 reproduz 10x mais rápido; 0 sem espera (padrão: 1)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Clientes simultâneos (padrão: 4)')
+    parser.add_argument('--repeat', type=int, default=1, help='Reproduções seguidas do log (padrão: 1)')
+    parser.add_argument('--url', help='Instância em execução (padrão: aplicação em processo)')
+    parser.add_argument('--username', help='Usuário para o login com --url')
+    parser.add_argument('--password', default=os.environ.get('REPLAY_PASSWORD', ''),
+                        help='Senha para o login com --url (padrão: REPLAY_PASSWORD)')
+    parser.add_argument('--config', help='Arquivo Python com configurações do sandbox em processo')
+    parser.add_argument('--hosts', type=int, default=2000, help='Hosts do dhcpd.conf sintético (padrão: 2000)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Grava o relatório em JSON')
+    args = parser.parse_args()
+
+    entries = parse_log(args.log)
+    skipped = defaultdict(int)
+    replayed = []
+    for entry in entries:
+        if entry['method'] in REPLAYED_METHODS:
+            replayed.append(entry)
+        else:
+            skipped[entry['method']] += 1
+    if not replayed:
+        parser.error(f'nenhuma requisição GET/HEAD encontrada em {args.log}')
+
+    if args.url:
+        # Apenas para agrupar as rotas: não toca no banco nem nos arquivos
+        app = create_app({'SECRET_KEY': 'replay'})
+        target = HttpTarget(args.url, args.username, args.password)
+    else:
+        workdir = tempfile.mkdtemp(prefix='replay_')
+        app = sandbox_app(workdir, args.hosts, args.seed, args.config)
+        target = InProcessTarget(app, SANDBOX_USER, SANDBOX_USER)
+
+    plan = schedule(replayed, args.speed, args.repeat)
+    samples, duration = replay(plan, target, RouteResolver(app), max(1, args.concurrency))
+    report = summarize(samples, duration)
+    print_report(report, skipped)
+
+    if args.output:
+        document = {
+            'meta': {
+                'log': os.path.abspath(args.log),
+                'target': args.url or 'in-process',
+                'speed': args.speed,
+                'concurrency': args.concurrency,
+                'repeat': args.repeat,
+                'hosts': None if args.url else args.hosts,
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+            },
+            'skipped': dict(skipped),
+            **report,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
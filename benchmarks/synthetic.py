@@ -0,0 +1,178 @@
+"""
+Gerador de dhcpd.conf e ips_disponiveis.sh sintéticos para benchmarks.
+
+Os arquivos imitam os de produção: cabeçalho com opções globais e bloco
+key, um subnet com todos os hosts, blocos group, hosts comentados, linhas de
+comentário soltas e as três formas de bloco host encontradas no arquivo real
+(indentação com espaços, com tabs e a gerada pelo /register, com o trailer
+"# Data:" depois da chave de fechamento). O resultado é determinístico para
+a mesma semente.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.synthetic --hosts 100000 --conf /tmp/dhcpd.conf --rules /tmp/ips.sh
+"""
+import argparse
+import random
+
+CATEGORIES = ['Desktop', 'Notebook', 'Celular', 'Tablet', 'Equipamento', 'Access Point',
+              'Servidores', 'Temporário', 'Ativos de Rede', 'Outros']
+ACCESS_MODES = ['Apenas rede local', 'Internet com proxy', 'Internet sem proxy', 'Internet NAT']
+NAME_PREFIXES = ['CC_GAB', 'CC_SECR', 'CC_COMU', 'SUB', 'MARIA', 'JOSE', 'ANA', 'CARLOS',
+                 'NOTE', 'CEL', 'IMPRESSORA', 'AP', 'SRV', 'TABLET']
+# Prefixos OUI reais (fabricantes comuns no inventário)
+OUIS = ['00:16:41', '00:25:11', '00:25:22', 'BC:EE:7B', '40:16:7E', 'F0:4D:A2', 'B4:85:E1',
+        '00:45:E2', '3C:52:82', 'A4:BB:6D', 'DC:A6:32', '00:1A:2B', 'F8:75:A4', '98:FA:9B']
+
+# Fração dos endereços de cada regra ocupada por hosts (o restante fica livre)
+OCCUPANCY = 0.8
+
+
+def ip_to_int(address):
+    a, b, c, d = (int(part) for part in address.split('.'))
+    return (a << 24) | (b << 16) | (c << 8) | d
+
+
+def ip_to_str(value):
+    return f'{(value >> 24) & 0xFF}.{(value >> 16) & 0xFF}.{(value >> 8) & 0xFF}.{value & 0xFF}'
+
+
+def generate_rules(host_count, rule_size=256, base=(10 << 24) | (8 << 16)):
+    """
+    Gera regras contíguas (categoria x acesso) com capacidade para host_count
+    hosts a OCCUPANCY de ocupação.
+
+    Returns:
+        list de dicts no formato de parse_ip_ranges
+    """
+    needed = int(host_count / OCCUPANCY) + rule_size
+    rule_count = max(len(CATEGORIES), -(-needed // rule_size))
+    rules = []
+    for i in range(rule_count):
+        start = base + i * rule_size
+        rules.append({
+            'categoria': CATEGORIES[i % len(CATEGORIES)],
+            'acesso': ACCESS_MODES[(i // len(CATEGORIES)) % len(ACCESS_MODES)],
+            'inicio': ip_to_str(start),
+            'fim': ip_to_str(start + rule_size - 1),
+        })
+    return rules
+
+
+def write_rules(path, rules):
+    """Grava as regras no formato do ips_disponiveis.sh."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('#!/bin/bash\n# Script sintético para benchmarks\n\nCONF="/etc/dhcp/dhcpd.conf"\n\n'
+                'checa_regra() {\n    echo "$1 - $2 ($3 - $4)"\n}\n\n')
+        for rule in rules:
+            label = f'"{rule["categoria"]}" "{rule["acesso"]}"'
+            f.write(f'checa_regra {label:<42} "{rule["inicio"]}" "{rule["fim"]}"\n')
+
+
+def generate_hosts(host_count, rules, seed=1):
+    """
+    Gera host_count hosts com nomes, MACs e IPs únicos, distribuídos pelas
+    regras e deixando endereços livres em todas elas.
+
+    Returns:
+        list de dicts com 'name', 'mac_address', 'ip_address' e
+        'registration_date' (None para hosts sem trailer)
+    """
+    rng = random.Random(seed)
+    addresses = []
+    for rule in rules:
+        for value in range(ip_to_int(rule['inicio']), ip_to_int(rule['fim']) + 1):
+            if len(addresses) >= host_count / OCCUPANCY:
+                break
+            addresses.append(value)
+    rng.shuffle(addresses)
+    addresses = sorted(addresses[:host_count])
+
+    hosts = []
+    for i, address in enumerate(addresses):
+        oui = OUIS[rng.randrange(len(OUIS))]
+        mac = f'{oui}:{(i >> 16) & 0xFF:02X}:{(i >> 8) & 0xFF:02X}:{i & 0xFF:02X}'
+        date = None
+        if rng.random() < 0.3:
+            date = (f'20{rng.randint(20, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} '
+                    f'{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}')
+        hosts.append({
+            'name': f'{NAME_PREFIXES[rng.randrange(len(NAME_PREFIXES))]}_{i}',
+            'mac_address': mac.lower() if rng.random() < 0.05 else mac,
+            'ip_address': ip_to_str(address),
+            'registration_date': date,
+        })
+    return hosts
+
+
+def _host_block(host, style):
+    name, mac, ip = host['name'], host['mac_address'], host['ip_address']
+    if host['registration_date'] is not None:
+        # Forma gravada pelo /register: trailer após a chave de fechamento
+        return (f'\n          host {name} {{\n                  hardware ethernet {mac};\n'
+                f'\t\t          fixed-address {ip};\n\t\t          }}\n'
+                f'\t\t          # Data: {host["registration_date"]}\n')
+    if style == 0:
+        return (f'          host {name} {{\n                  hardware ethernet {mac};\n'
+                f'                  fixed-address {ip};\n          }}\n')
+    return f'\thost {name} {{\n\t\thardware ethernet {mac};\n\t\tfixed-address {ip};\n\t}}\n'
+
+
+def write_conf(path, hosts, seed=1, group_size=500, comment_ratio=0.01):
+    """Grava os hosts em um dhcpd.conf com a estrutura do arquivo de produção."""
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('# dhcpd.conf\n# #\n# # Configuration file for ISC dhcpd (sintético)\n# #\n'
+                'log-facility local6;\nallow client-updates;\none-lease-per-client true;\ndeny duplicates;\n\n'
+                'key "rndc-key" {\n        algorithm hmac-md5;\n        secret "c2ludGV0aWNv";\n};\n\n'
+                'subnet 10.0.0.0 netmask 255.0.0.0 {\n        authoritative;\n'
+                '        option domain-name              "casacivil.local";\n'
+                '        option routers                  10.8.30.1;\n'
+                '        default-lease-time              600;\n        max-lease-time                  7200;\n\n')
+        in_group = False
+        for i, host in enumerate(hosts):
+            if group_size and i % group_size == 0:
+                if in_group:
+                    f.write('        }\n')
+                in_group = rng.random() < 0.5
+                if in_group:
+                    f.write(f'\n        # Grupo {i // group_size}\n        group {{\n'
+                            f'        option domain-name-servers 10.8.30.8;\n')
+            if rng.random() < comment_ratio:
+                f.write(f'#          host {host["name"]}_ANTIGO {{\n#                  hardware ethernet '
+                        f'ee:f3:8b:31:81:1d;\n#          }}\n')
+            elif rng.random() < comment_ratio:
+                f.write('          # Equipamento devolvido, manter reserva\n')
+            f.write(_host_block(host, rng.randrange(2)))
+        if in_group:
+            f.write('        }\n')
+        f.write('}\n')
+
+
+def generate(conf_path, rules_path, host_count, seed=1):
+    """
+    Gera o par dhcpd.conf / ips_disponiveis.sh.
+
+    Returns:
+        tupla (hosts, regras)
+    """
+    rules = generate_rules(host_count)
+    hosts = generate_hosts(host_count, rules, seed)
+    write_rules(rules_path, rules)
+    write_conf(conf_path, hosts, seed)
+    return hosts, rules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hosts', type=int, default=10000)
+    parser.add_argument('--conf', required=True, help='Caminho do dhcpd.conf gerado')
+    parser.add_argument('--rules', required=True, help='Caminho do ips_disponiveis.sh gerado')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    hosts, rules = generate(args.conf, args.rules, args.hosts, args.seed)
+    print(f'{len(hosts)} hosts em {args.conf}, {len(rules)} regras em {args.rules}')
+
+
+if __name__ == '__main__':
+    main()
@@ -2,10 +2,16 @@ import os
 import sys
 import getpass
 from src.models.user import db, User
-from src.main import app
+from src.main import create_cli_app
+from src.utils.user_cache import user_cache
 
 class UserManager:
-    def __init__(self):
+    def __init__(self, app=None):
+        # Apenas o banco: não carrega rotas, parser do DHCP nem extensões web
+        if app is None:
+            app = create_cli_app()
+            with app.app_context():
+                db.create_all()
         self.app = app
     
     def create_user(self, username=None, email=None, password=None):
@@ -72,6 +78,7 @@ class UserManager:
             try:
                 user.set_password(new_password)
                 db.session.commit()
+                user_cache.invalidate(user.id)
                 print(f"✅ Senha do usuário '{username}' alterada com sucesso!")
                 return True
             except Exception as e:
@@ -98,8 +105,10 @@ class UserManager:
                 return False
             
             try:
+                user_id = user.id
                 db.session.delete(user)
                 db.session.commit()
+                user_cache.invalidate(user_id)
                 print(f"✅ Usuário '{username}' excluído com sucesso!")
                 return True
             except Exception as e:
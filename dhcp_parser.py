@@ -1,45 +1,386 @@
+import fcntl
+import mmap
+import os
 import re
+import shutil
+import sys
+from array import array
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from socket import inet_aton, inet_ntoa
 
-def parse_dhcp_conf(file_path):
+# Datas de cadastro são guardadas como segundos desde EPOCH, sem fuso: o
+# texto do "# Data:" é hora local e volta exatamente como foi lido.
+EPOCH = datetime(1970, 1, 1)
+NO_DATE = -1
+
+# Padrões em bytes, aplicados direto sobre o arquivo mapeado (map_file). Nos
+# nomes, [\x80-\xff] aceita os bytes de caracteres UTF-8 não ASCII, que o \w
+# de bytes não reconhece.
+# Só MACs bem formados: o valor vai direto para int(..., 16)
+MAC_RE = re.compile(rb'hardware\s+ethernet\s+((?:[0-9a-fA-F]{2}:){5}[0-9a-fA-F]{2});')
+IP_RE = re.compile(rb'fixed-address\s+([0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3});')
+# Bloco host. O caso comum (MAC e IP logo no início do bloco) é extraído pelo
+# próprio padrão, grupos 2 e 3; nos demais, MAC e IP são procurados no
+# conteúdo do bloco (grupo 4).
+HOST_BLOCK_RE = re.compile(
+    rb'host\s+([\w.\-\x80-\xff]+)\s*\{'
+    rb'(?:\s*' + MAC_RE.pattern + rb'\s*' + IP_RE.pattern + rb')?'
+    rb'([^}]*)\}'
+)
+DATE_RE = re.compile(rb'#\s*Data:\s*(\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2})')
+
+
+def ip_to_int(ip_address):
+    """Converte um endereço IPv4 em inteiro de 32 bits (ValueError se inválido)."""
+    a, b, c, d = map(int, ip_address.split('.'))
+    if a > 255 or b > 255 or c > 255 or d > 255:
+        raise ValueError(f'Endereço IP inválido: {ip_address}')
+    return (a << 24) | (b << 16) | (c << 8) | d
+
+
+def int_to_ip(value):
+    """Converte um inteiro de 32 bits em endereço IPv4."""
+    return f'{(value >> 24) & 0xFF}.{(value >> 16) & 0xFF}.{(value >> 8) & 0xFF}.{value & 0xFF}'
+
+
+def mac_to_int(mac_address):
+    """Converte um endereço MAC (XX:XX:XX:XX:XX:XX ou com '-') em inteiro de 48 bits."""
+    return int(mac_address.replace(':', '').replace('-', ''), 16)
+
+
+def int_to_mac(value):
+    """Converte um inteiro de 48 bits em endereço MAC no formato XX:XX:XX:XX:XX:XX."""
+    return value.to_bytes(6, 'big').hex(':').upper()
+
+
+def date_to_int(text):
+    """Converte 'AAAA-MM-DD HH:MM:SS' em segundos desde EPOCH."""
+    return int((datetime.fromisoformat(text) - EPOCH).total_seconds())
+
+
+def int_to_date(value):
+    """Converte segundos desde EPOCH em 'AAAA-MM-DD HH:MM:SS', ou 'N/A' para NO_DATE."""
+    if value == NO_DATE:
+        return 'N/A'
+    return (EPOCH + timedelta(seconds=value)).isoformat(' ')
+
+
+class HostRecord:
     """
-    Analisa o arquivo dhcpd.conf para extrair informações de hosts.
-    Retorna uma lista de dicionários, onde cada dicionário representa um host
-    com 'name', 'mac_address' e 'ip_address'.
+    Um host do dhcpd.conf. IP, MAC e data ficam como inteiros; as
+    propriedades ip_address, mac_address e registration_date devolvem o
+    texto. Tratado como imutável: pode ser compartilhado entre requisições.
     """
-    hosts = []
-    with open(file_path, 'r') as f:
-        content = f.read()
 
-    # Regex para encontrar blocos 'host' e extrair nome, MAC e IP
-    host_blocks = re.findall(r'host\s+([\w\d_.-]+)\s*\{([^}]+)\}', content, re.DOTALL)
+    __slots__ = ('name', 'ip', 'mac', 'registered')
+
+    def __init__(self, name, ip, mac, registered=NO_DATE):
+        self.name = name
+        self.ip = ip
+        self.mac = mac
+        self.registered = registered
+
+    @classmethod
+    def from_strings(cls, name, mac_address, ip_address, registration_date=None):
+        registered = NO_DATE
+        if registration_date and registration_date != 'N/A':
+            registered = date_to_int(registration_date)
+        return cls(name, ip_to_int(ip_address), mac_to_int(mac_address), registered)
+
+    @property
+    def ip_address(self):
+        return int_to_ip(self.ip)
+
+    @property
+    def mac_address(self):
+        return int_to_mac(self.mac)
+
+    @property
+    def registration_date(self):
+        return int_to_date(self.registered)
+
+    def replace(self, **changes):
+        """Retorna uma cópia com os campos informados alterados."""
+        values = {field: getattr(self, field) for field in self.__slots__}
+        values.update(changes)
+        return HostRecord(**values)
+
+    def to_dict(self):
+        """Formato da API (o mesmo de parse_dhcp_conf)."""
+        return {
+            'name': self.name,
+            'mac_address': int_to_mac(self.mac),
+            'ip_address': int_to_ip(self.ip),
+            'registration_date': int_to_date(self.registered),
+        }
+
+    def _key(self):
+        return (self.name, self.ip, self.mac, self.registered)
+
+    def __eq__(self, other):
+        if not isinstance(other, HostRecord):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return (f'HostRecord({self.name!r}, {self.ip_address}, {self.mac_address}, '
+                f'{self.registration_date})')
+
+
+class HostTable:
+    """
+    Hosts do dhcpd.conf em colunas: nomes em uma lista e IP (uint32), MAC
+    (48 bits) e data de cadastro (segundos desde EPOCH) em arrays. Ocupa uma
+    fração da memória de uma lista de dicts e não gera objetos para o GC além
+    dos nomes. Indexação e iteração produzem HostRecord sob demanda; a
+    conversão para o formato da API (to_dicts) fica para a serialização.
+    """
+
+    __slots__ = ('names', 'ips', 'macs', 'dates')
+
+    def __init__(self):
+        self.names = []
+        self.ips = array('I')
+        self.macs = array('Q')
+        self.dates = array('q')
+
+    @classmethod
+    def from_columns(cls, names, ips, macs, dates):
+        """Monta a tabela a partir de colunas já prontas (sem cópia)."""
+        table = cls()
+        table.names, table.ips, table.macs, table.dates = names, ips, macs, dates
+        return table
+
+    def append(self, name, ip, mac, registered=NO_DATE):
+        self.names.append(name)
+        self.ips.append(ip)
+        self.macs.append(mac)
+        self.dates.append(registered)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, index):
+        return HostRecord(self.names[index], self.ips[index], self.macs[index], self.dates[index])
+
+    def __iter__(self):
+        return map(HostRecord, self.names, self.ips, self.macs, self.dates)
+
+    def index(self, name):
+        """Posição do host com o nome informado, ou -1."""
+        try:
+            return self.names.index(name)
+        except ValueError:
+            return -1
 
-    for host_name, block_content in host_blocks:
-        mac_match = re.search(r'hardware\s+ethernet\s+([0-9a-fA-F:]{17});', block_content)
-        ip_match = re.search(r'fixed-address\s+([0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3});', block_content)
+    def find(self, name):
+        """HostRecord com o nome informado, ou None."""
+        index = self.index(name)
+        return self[index] if index >= 0 else None
 
-        if mac_match and ip_match:
-            date_match = re.search(r'#\s*Data:\s*(\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2})', block_content)
-            hosts.append({
-                'name': host_name,
-                'mac_address': mac_match.group(1),
-                'ip_address': ip_match.group(1),
-                'registration_date': date_match.group(1) if date_match else 'N/A'
-            })
-    return hosts
+    def ip_strings(self):
+        """IPs de todos os hosts como texto, convertidos em lote."""
+        packed = array('I', self.ips)
+        if sys.byteorder == 'little':
+            packed.byteswap()
+        data = packed.tobytes()
+        return [inet_ntoa(data[i:i + 4]) for i in range(0, len(data), 4)]
+
+    def mac_strings(self):
+        """MACs de todos os hosts como texto (XX:XX:XX:XX:XX:XX), convertidos em lote."""
+        packed = array('Q', self.macs)
+        if sys.byteorder == 'little':
+            packed.byteswap()
+        # Cada valor ocupa 8 bytes (24 caracteres com os ':'); os 2 primeiros são zero
+        text = packed.tobytes().hex(':').upper()
+        return [text[i + 6:i + 23] for i in range(0, len(text), 24)]
+
+    def to_dicts(self):
+        """Lista de dicts no formato da API (o mesmo de parse_dhcp_conf)."""
+        # Poucos hosts têm data: formata cada valor distinto uma única vez
+        dates = {value: int_to_date(value) for value in set(self.dates)}
+        return [
+            {'name': name, 'mac_address': mac, 'ip_address': ip, 'registration_date': dates[registered]}
+            for name, ip, mac, registered in zip(self.names, self.ip_strings(), self.mac_strings(), self.dates)
+        ]
+
+
+@contextmanager
+def map_file(file_path):
+    """
+    Mapeia o arquivo em memória (somente leitura) para varredura com os
+    padrões em bytes, sem decodificar nem copiar o conteúdo. apply_edits
+    nunca altera o arquivo no lugar (substitui o arquivo inteiro), então o
+    mapeamento continua válido e íntegro mesmo durante uma gravação.
+
+    Yields:
+        mmap, ou b'' para arquivo vazio
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def parse_hosts(file_path):
+    """
+    Analisa o arquivo dhcpd.conf e retorna os hosts em uma HostTable.
+    Blocos sem MAC ou IP, com MAC malformado ou com IP fora da faixa IPv4,
+    são ignorados.
+
+    O arquivo é varrido mapeado em memória: apenas nome, MAC, IP e data de
+    cada host são copiados.
+    """
+    table = HostTable()
+    with map_file(file_path) as mm:
+        for block in HOST_BLOCK_RE.finditer(mm):
+            name, mac, ip = block.group(1, 2, 3)
+            start, end = block.span(4)
+            if mac is None:
+                mac_match = MAC_RE.search(mm, start, end)
+                ip_match = IP_RE.search(mm, start, end)
+                if not (mac_match and ip_match):
+                    continue
+                mac, ip = mac_match.group(1), ip_match.group(1)
+            try:
+                ip = int.from_bytes(inet_aton(ip.decode('ascii')), 'big')
+            except OSError:
+                continue  # Octeto acima de 255
+            registered = NO_DATE
+            date_match = DATE_RE.search(mm, start, end) if mm.find(b'#', start, end) >= 0 else None
+            if date_match:
+                try:
+                    registered = date_to_int(date_match.group(1).decode('ascii'))
+                except ValueError:
+                    pass  # Data impossível (ex.: mês 13): tratada como ausente
+            table.append(name.decode('utf-8'), ip, int(mac.replace(b':', b''), 16), registered)
+    return table
+
+
+def parse_dhcp_conf(file_path):
+    """
+    Analisa o arquivo dhcpd.conf para extrair informações de hosts.
+    Retorna uma lista de dicionários, onde cada dicionário representa um host
+    com 'name', 'mac_address', 'ip_address' e 'registration_date'.
+    Para grandes inventários, prefira parse_hosts.
+    """
+    return parse_hosts(file_path).to_dicts()
 
 def get_used_ips(file_path):
     """
     Extrai todos os IPs fixos usados no arquivo dhcpd.conf.
     Retorna um conjunto de strings de endereços IP.
     """
-    used_ips = set()
-    with open(file_path, 'r') as f:
-        content = f.read()
-    
-    ip_matches = re.findall(r'fixed-address\s+([0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3});', content)
-    for ip in ip_matches:
-        used_ips.add(ip)
-    return used_ips
+    with map_file(file_path) as mm:
+        return {ip.decode('ascii') for ip in IP_RE.findall(mm)}
+
+
+def host_block_pattern(host_name):
+    """
+    Padrão que localiza os blocos de um host: da linha "host NOME {" até a
+    primeira linha seguinte iniciada por "}" (ou o fim do arquivo), com as
+    linhas inteiras.
+    """
+    name = re.escape(host_name.encode('utf-8'))
+    return re.compile(
+        rb'^[^\S\n]*host[^\S\n]+' + name + rb'[^\S\n]*\{[^\n]*(?:\n|\Z)'
+        rb'(?:[^\n]*\n)*?'
+        rb'(?:[^\S\n]*\}[^\n]*(?:\n|\Z)|[^\n]*\Z)',
+        re.MULTILINE
+    )
+
+
+def find_host_blocks(mm, host_name):
+    """Posições (início, fim) dos blocos do host no conteúdo mapeado."""
+    return [match.span() for match in host_block_pattern(host_name).finditer(mm)]
+
+
+def apply_edits(file_path, compute_edits):
+    """
+    Altera o arquivo sem montar uma cópia dele em memória: o conteúdo atual é
+    mapeado, compute_edits(mm) indica os trechos a substituir e o resultado é
+    gravado em um arquivo temporário ao lado do original, que o substitui com
+    os.replace. Uma falha no meio da gravação (queda, SIGKILL, disco cheio)
+    deixa o arquivo anterior intacto.
+
+    A varredura e a gravação ocorrem sob o mesmo flock exclusivo (em
+    file_path + '.lock', como em rule_store): as posições calculadas por
+    compute_edits não ficam desatualizadas por uma gravação de outro worker.
+    Links simbólicos são resolvidos e o arquivo novo recebe as permissões e,
+    se possível, o dono do anterior.
+
+    Args:
+        compute_edits: função que recebe o conteúdo mapeado (mmap, ou b''
+            para arquivo vazio) e retorna a lista de tuplas (início, fim,
+            bytes novos), sem sobreposição. Lista vazia: nada é gravado.
+
+    Returns:
+        a lista de alterações aplicadas
+    """
+    path = os.path.realpath(file_path)
+    with open(f'{path}.lock', 'a') as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        with map_file(path) as mm:
+            edits = sorted(compute_edits(mm) or [])
+            if not edits:
+                return edits
+
+            st = os.stat(path)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            try:
+                with open(tmp_path, 'wb') as f, memoryview(mm) as content:
+                    # Os trechos mantidos são gravados direto do mapeamento
+                    position = 0
+                    for start, end, data in edits:
+                        f.write(content[position:start])
+                        f.write(data)
+                        position = end
+                    f.write(content[position:])
+                    f.flush()
+                    os.fsync(f.fileno())
+                shutil.copymode(path, tmp_path)
+                try:
+                    os.chown(tmp_path, st.st_uid, st.st_gid)
+                except PermissionError:
+                    pass  # Sem privilégio para trocar o dono: fica o do processo
+                os.replace(tmp_path, path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+
+        # Persiste a troca de nomes no diretório
+        dir_fd = os.open(os.path.dirname(path), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+        return edits
+
+
+SUBNET_RE = re.compile(
+    rb'^[^\S\n]*subnet\s+([0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3})'
+    rb'\s+netmask\s+([0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3})',
+    re.MULTILINE
+)
+
+
+def get_subnets(file_path):
+    """
+    Extrai as declarações subnet (não comentadas) do arquivo dhcpd.conf.
+    Retorna uma lista de dicionários com 'network' e 'netmask'.
+    """
+    with map_file(file_path) as mm:
+        return [{'network': network.decode('ascii'), 'netmask': netmask.decode('ascii')}
+                for network, netmask in SUBNET_RE.findall(mm)]
 
 
 def parse_ip_ranges(file_path):
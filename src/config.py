@@ -0,0 +1,84 @@
+import os
+import secrets
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATABASE_DIR = os.path.join(BASE_DIR, 'src', 'database')
+
+
+def load_secret_key(path):
+    """
+    Lê a chave secreta persistida em arquivo, gerando-a na primeira execução.
+    Assim as sessões sobrevivem a reinícios sem uma chave fixa no código.
+    """
+    try:
+        with open(path, 'r') as f:
+            key = f.read().strip()
+        if key:
+            return key
+    except FileNotFoundError:
+        pass
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    key = secrets.token_hex(32)
+    # O_EXCL: se outro processo criou o arquivo ao mesmo tempo, usa a chave dele
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        with open(path, 'r') as f:
+            return f.read().strip()
+    with os.fdopen(fd, 'w') as f:
+        f.write(key + '\n')
+    return key
+
+
+class Config:
+    """
+    Configuração padrão da aplicação. Os valores podem ser sobrescritos por
+    variáveis de ambiente ou pelo argumento de create_app().
+
+    Variáveis de ambiente:
+        - SECRET_KEY: Chave das sessões (padrão: gerada em SECRET_KEY_FILE)
+        - DATABASE_URL: URI do banco (padrão: src/database/app.db)
+        - DB_PROFILE: Perfil do SQLite (ver src/utils/sqlite_profile.py)
+        - AUDIT_RETENTION_DAYS / AUDIT_ARCHIVE_DIR: Retenção dos logs de
+          auditoria (ver src/utils/audit_archive.py)
+        - DHCP_CONF_PATH: dhcpd.conf gerenciado
+        - RULES_PATH: Cadastro das regras de IP (ver src/utils/rule_store.py)
+        - IPS_SCRIPT_PATH: ips_disponiveis.sh de onde as regras são
+          importadas na primeira execução
+        - INVENTORY_SNAPSHOT_PATH: Snapshot binário do inventário, lido na
+          inicialização (ver src/utils/inventory_snapshot.py; vazio desliga)
+        - OUI_SOURCE_PATH / OUI_REGISTRY_PATH: Registro de fabricantes de MAC
+          do IEEE e sua versão compilada (ver src/utils/oui_registry.py)
+        - TRUSTED_PROXY_COUNT: Quantidade de proxies reversos na frente da
+          aplicação (padrão: 0). Com 1 ou mais, o REMOTE_ADDR passa a ser o
+          endereço que o último proxy adicionou ao X-Forwarded-For (ProxyFix)
+        - METRICS_TOKEN: Token exigido pelo /metrics (padrão: sem token)
+        - PROFILING_ADMINS: Usuários, separados por vírgula, que podem pedir
+          perfis de requisições (ver src/utils/profiling.py)
+        - TRACEMALLOC_INTERVAL: Segundos entre snapshots de memória (0 desliga)
+    """
+    SECRET_KEY = os.environ.get('SECRET_KEY')
+    SECRET_KEY_FILE = os.environ.get('SECRET_KEY_FILE', os.path.join(DATABASE_DIR, 'secret_key'))
+
+    SQLALCHEMY_DATABASE_URI = os.environ.get(
+        'DATABASE_URL', f"sqlite:///{os.path.join(DATABASE_DIR, 'app.db')}")
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DB_PROFILE = os.environ.get('DB_PROFILE', 'wal')
+
+    AUDIT_RETENTION_DAYS = int(os.environ.get('AUDIT_RETENTION_DAYS', 365))
+    AUDIT_ARCHIVE_DIR = os.environ.get('AUDIT_ARCHIVE_DIR', os.path.join(DATABASE_DIR, 'archive'))
+
+    DHCP_CONF_PATH = os.environ.get('DHCP_CONF_PATH', os.path.join(BASE_DIR, 'dhcpd.conf'))
+    IPS_SCRIPT_PATH = os.environ.get('IPS_SCRIPT_PATH', os.path.join(BASE_DIR, 'ips_disponiveis.sh'))
+    RULES_PATH = os.environ.get('RULES_PATH', os.path.join(BASE_DIR, 'ip_rules.json'))
+    INVENTORY_SNAPSHOT_PATH = os.environ.get('INVENTORY_SNAPSHOT_PATH', os.path.join(DATABASE_DIR, 'inventory.snap'))
+    OUI_SOURCE_PATH = os.environ.get('OUI_SOURCE_PATH', os.path.join(BASE_DIR, 'oui.csv'))
+    OUI_REGISTRY_PATH = os.environ.get('OUI_REGISTRY_PATH', os.path.join(DATABASE_DIR, 'oui.bin'))
+
+    TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT', 0))
+
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+    PROFILING_ADMINS = [name.strip() for name in os.environ.get('PROFILING_ADMINS', '').split(',') if name.strip()]
+    TRACEMALLOC_INTERVAL = int(os.environ.get('TRACEMALLOC_INTERVAL', 0))
@@ -1,58 +1,220 @@
 import os
 import sys
 # DON'T CHANGE THIS !!!
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+# Executado como script (python src/main.py), o diretório raiz do projeto não
+# está no path; importado como pacote (wsgi.py, python -m), já está.
+if not __package__:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from flask import Flask, send_from_directory
+import time
+from contextlib import contextmanager
+
+from flask import Flask
 from flask_login import LoginManager
-from src.models.user import db, User
-from src.models.audit_log import AuditLog
-from src.routes.user import user_bp
-from src.routes.dhcp import dhcp_bp
-from src.routes.auth import auth_bp
-from src.routes.audit import audit_bp
+from src.config import Config, load_secret_key
+from src.models.user import db
+from src.utils.sqlite_profile import init_db
+from src.utils.user_cache import user_cache
 
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+# Blueprints e extensões são importados dentro de create_app(): quem só
+# precisa do banco (create_user.py, audit_archive) usa create_cli_app() e não
+# carrega rotas, parser do DHCP, métricas nem perfilamento.
 
 # Configurar Flask-Login
 login_manager = LoginManager()
-login_manager.init_app(app)
 login_manager.login_view = 'auth.login'
 login_manager.login_message = 'Por favor, faça login para acessar esta página.'
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
-
-app.register_blueprint(user_bp, url_prefix='/api')
-app.register_blueprint(dhcp_bp, url_prefix='/api/dhcp')
-app.register_blueprint(auth_bp, url_prefix='/api/auth')
-app.register_blueprint(audit_bp, url_prefix='/api/audit')
-
-# uncomment if you need to use database
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
-with app.app_context():
-    db.create_all()
-
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
-def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
-            return "Static folder not configured", 404
-
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
+    return user_cache.get(int(user_id))
+
+
+@contextmanager
+def startup_step(app, name):
+    """Mede uma etapa da inicialização e a registra em app.extensions['startup_timings']."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        app.extensions.setdefault('startup_timings', {})[name] = elapsed
+        app.logger.info('Inicialização: %s em %.1f ms', name, elapsed * 1000)
+
+
+def load_config(app, config=None):
+    """Carrega Config e, por cima, as configurações informadas (objeto ou dicionário)."""
+    app.config.from_object(Config)
+    if isinstance(config, dict):
+        app.config.from_mapping(config)
+    elif config is not None:
+        app.config.from_object(config)
+
+
+def create_app(config=None):
+    """
+    Cria e configura a aplicação, sem tocar no banco nem nos arquivos do DHCP.
+
+    Args:
+        config: Objeto ou dicionário com configurações que sobrescrevem Config
+
+    As etapas pesadas ficam em init_database() e warm_caches(), chamadas
+    explicitamente por quem sobe o servidor (ver wsgi.py).
+    """
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+
+    with startup_step(app, 'create_app'):
+        load_config(app, config)
+        if not app.config.get('SECRET_KEY'):
+            app.config['SECRET_KEY'] = load_secret_key(app.config['SECRET_KEY_FILE'])
+        if app.config['TRUSTED_PROXY_COUNT']:
+            from werkzeug.middleware.proxy_fix import ProxyFix
+            app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXY_COUNT'])
+
+        from src.utils.audit_writer import audit_writer
+        from src.utils import host_changes
+        from src.utils.compression import compression
+        from src.utils.json_provider import init_json
+        from src.utils.login_throttle import login_throttle
+        from src.utils.metrics import metrics
+        from src.utils.profiling import profiler
+        from src.utils.static_assets import static_assets
+
+        init_json(app)
+        # Primeiro a registrar o after_request, é o último a executá-lo: a
+        # latência medida inclui os demais hooks, como a compressão
+        metrics.init_app(app)
+        login_manager.init_app(app)
+        register_blueprints(app)
+
+        init_db(app, db)
+        audit_writer.init_app(app)
+        user_cache.init_app(app)
+        login_throttle.init_app(app)
+        host_changes.init_app(app)
+        static_assets.init_app(app)
+        compression.init_app(app)
+        profiler.init_app(app)
+
+        app.add_url_rule('/', 'serve', serve, defaults={'path': ''})
+        app.add_url_rule('/<path:path>', 'serve', serve)
+
+    return app
+
+
+def register_blueprints(app):
+    """Importa e registra os blueprints da API."""
+    from src.routes.user import user_bp
+    from src.routes.dhcp import dhcp_bp
+    from src.routes.rules import rules_bp
+    from src.routes.diff import diff_bp
+    from src.routes.auth import auth_bp
+    from src.routes.audit import audit_bp
+    from src.routes.metrics import metrics_bp, register_app_gauges
+    from src.routes.debug import debug_bp
+
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(dhcp_bp, url_prefix='/api/dhcp')
+    app.register_blueprint(rules_bp, url_prefix='/api/dhcp')
+    app.register_blueprint(diff_bp, url_prefix='/api/dhcp')
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(audit_bp, url_prefix='/api/audit')
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(debug_bp, url_prefix='/api/debug')
+    register_app_gauges()
+
+
+def create_cli_app(config=None):
+    """
+    Cria uma aplicação mínima, apenas com o banco e o cache de usuários, para
+    ferramentas de linha de comando. Não registra blueprints nem extensões
+    web e não lê a chave secreta.
+
+    Args:
+        config: Objeto ou dicionário com configurações que sobrescrevem Config
+    """
+    app = Flask(__name__)
+    load_config(app, config)
+    init_db(app, db)
+    # Apenas para que invalidate() sinalize as alterações aos workers
+    user_cache.init_app(app)
+    return app
+
+
+def init_database(app):
+    """
+    Cria as tabelas e aplica as atualizações de schema. Ao final, fecha as
+    conexões do pool para que nenhuma conexão SQLite seja herdada pelos
+    workers após o fork (gunicorn --preload).
+    """
+    from src.models.audit_log import AuditLog, AuditLogRollup
+
+    with startup_step(app, 'init_database'), app.app_context():
+        db.create_all()
+        AuditLog.upgrade_schema()
+        AuditLogRollup.backfill_if_empty()
+        db.session.remove()
+        db.engine.dispose()
+
+
+def warm_caches(app):
+    """
+    Carrega o inventário de hosts e as regras de IP antes da primeira
+    requisição. Com --preload, os workers herdam os caches já carregados.
+    Na primeira execução, importa as regras do ips_disponiveis.sh (init_rules).
+    Compila o registro de fabricantes de MAC se estiver desatualizado
+    (init_registry); ele só é aberto na primeira consulta.
+    """
+    from src.utils import host_changes, host_inventory
+    from src.utils.oui_registry import init_registry
+    from src.utils.rule_store import init_rules
+
+    with startup_step(app, 'warm_caches'):
+        init_rules(app)
+        init_registry(app)
+        try:
+            counts = host_inventory.warm(app.config['DHCP_CONF_PATH'], app.config['RULES_PATH'],
+                                         app.config['INVENTORY_SNAPSHOT_PATH'])
+            host_changes.sync_with_file(app.config['DHCP_CONF_PATH'])
+        except (OSError, ValueError) as e:
+            app.logger.warning('Inventário de hosts não carregado: %s', e)
         else:
-            return "index.html not found", 404
+            app.logger.info('Inventário carregado: %d hosts, %d regras', counts['hosts'], counts['rules'])
+            if counts['snapshot'] in ('loaded', 'saved'):
+                app.logger.info('Snapshot do inventário: %s', counts['snapshot'])
+            elif counts['snapshot'] is not None:
+                app.logger.warning('Snapshot do inventário não gravado: %s', counts['snapshot'])
+
+
+def serve(path):
+    from src.utils.static_assets import static_assets
+    return static_assets.send(path)
+
+
+_app = None
+
+def __getattr__(name):
+    """
+    Compatibilidade com `from src.main import app`: cria e inicializa a
+    aplicação no primeiro acesso.
+    """
+    global _app
+    if name != 'app':
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if _app is None:
+        from src.utils.oui_registry import init_registry
+        from src.utils.rule_store import init_rules
+
+        _app = create_app()
+        init_database(_app)
+        init_rules(_app)
+        init_registry(_app)
+    return _app
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # Servidor de desenvolvimento. Em produção, use o wsgi.py.
+    app = create_app()
+    init_database(app)
+    warm_caches(app)
+    app.run(host='0.0.0.0', port=5000, debug=os.environ.get('FLASK_DEBUG') == '1')
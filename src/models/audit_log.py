@@ -1,4 +1,8 @@
+from collections import Counter
 from datetime import datetime
+from sqlalchemy import bindparam, func, insert, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from src.models.user import db
 
 class AuditLog(db.Model):
@@ -7,6 +11,19 @@ class AuditLog(db.Model):
     Registra todas as operações realizadas no sistema DHCP.
     """
     __tablename__ = 'audit_logs'
+    __table_args__ = (
+        # Índices compostos para a paginação por cursor em (timestamp, id),
+        # com e sem os filtros de igualdade usados pela interface
+        db.Index('ix_audit_logs_timestamp_id', 'timestamp', 'id'),
+        db.Index('ix_audit_logs_action_timestamp', 'action', 'timestamp', 'id'),
+        db.Index('ix_audit_logs_resource_type_timestamp', 'resource_type', 'timestamp', 'id'),
+        db.Index('ix_audit_logs_status_timestamp', 'status', 'timestamp', 'id'),
+        # Histórico por host, inclusive através de renomeações
+        db.Index('ix_audit_logs_host_name', 'host_name', 'timestamp'),
+        db.Index('ix_audit_logs_host_prev_name', 'host_prev_name'),
+        db.Index('ix_audit_logs_host_mac', 'host_mac'),
+        db.Index('ix_audit_logs_host_ip', 'host_ip'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -19,6 +36,12 @@ class AuditLog(db.Model):
     ip_address = db.Column(db.String(45), nullable=True)  # IPv4 ou IPv6
     status = db.Column(db.String(20), nullable=False, default='SUCCESS')  # SUCCESS, FAILURE, ERROR
     error_message = db.Column(db.Text, nullable=True)
+
+    # Dados do host extraídos de details na gravação (apenas resource_type HOST)
+    host_name = db.Column(db.String(255), nullable=True)
+    host_prev_name = db.Column(db.String(255), nullable=True)  # Nome anterior, em renomeações
+    host_mac = db.Column(db.String(17), nullable=True)
+    host_ip = db.Column(db.String(45), nullable=True)
     
     # Relacionamento com User
     user = db.relationship('User', backref='audit_logs', lazy=True)
@@ -39,8 +62,169 @@ class AuditLog(db.Model):
             'details': self.details,
             'ip_address': self.ip_address,
             'status': self.status,
-            'error_message': self.error_message
+            'error_message': self.error_message,
+            'host_name': self.host_name,
+            'host_prev_name': self.host_prev_name,
+            'host_mac': self.host_mac,
+            'host_ip': self.host_ip
         }
+
+    @staticmethod
+    def host_columns(resource_type, resource_name, details):
+        """
+        Extrai as colunas host_* de um log a partir dos detalhes gravados por
+        log_host_create, log_host_update, log_host_rename e log_host_delete.
+
+        Args:
+            resource_type: Tipo de recurso do log
+            resource_name: Nome do recurso afetado
+            details: Dicionário de detalhes (antes da conversão para JSON)
+
+        Returns:
+            dict com host_name, host_prev_name, host_mac e host_ip
+        """
+        if resource_type != 'HOST':
+            return {'host_name': None, 'host_prev_name': None, 'host_mac': None, 'host_ip': None}
+
+        details = details if isinstance(details, dict) else {}
+        new_data = details.get('new_data') or {}
+        return {
+            'host_name': details.get('new_name') or details.get('host_name') or resource_name,
+            'host_prev_name': details.get('old_name'),
+            'host_mac': details.get('mac_address') or new_data.get('mac_address'),
+            'host_ip': details.get('ip_address') or new_data.get('ip_address')
+        }
+
+    @staticmethod
+    def upgrade_schema(bind=None):
+        """
+        Atualiza um banco existente para o schema atual de audit_logs: colunas,
+        índices e busca textual. Deve ser chamado após db.create_all().
+        """
+        AuditLog.ensure_columns(bind)
+        AuditLog.ensure_indexes(bind)
+        AuditLog.ensure_fts(bind)
+
+    @staticmethod
+    def ensure_columns(bind=None):
+        """
+        Adiciona as colunas host_* a bancos criados antes delas e as preenche
+        a partir do JSON de details dos logs existentes.
+        """
+        with (bind or db.engine).begin() as conn:
+            existing = {row[1] for row in conn.execute(text("PRAGMA table_info(audit_logs)"))}
+            missing = [name for name in ('host_name', 'host_prev_name', 'host_mac', 'host_ip')
+                       if name not in existing]
+            if not missing:
+                return
+
+            for name in missing:
+                column_type = AuditLog.__table__.c[name].type.compile(dialect=conn.dialect)
+                conn.execute(text(f"ALTER TABLE audit_logs ADD COLUMN {name} {column_type}"))
+
+            conn.execute(text(
+                "UPDATE audit_logs SET host_name = resource_name WHERE resource_type = 'HOST'"
+            ))
+            conn.execute(text(
+                "UPDATE audit_logs SET "
+                "host_name = COALESCE(json_extract(details, '$.new_name'), "
+                "json_extract(details, '$.host_name'), resource_name), "
+                "host_prev_name = json_extract(details, '$.old_name'), "
+                "host_mac = COALESCE(json_extract(details, '$.mac_address'), "
+                "json_extract(details, '$.new_data.mac_address')), "
+                "host_ip = COALESCE(json_extract(details, '$.ip_address'), "
+                "json_extract(details, '$.new_data.ip_address')) "
+                "WHERE resource_type = 'HOST' AND json_valid(details) "
+                "AND json_type(details) = 'object'"
+            ))
+    
+    @staticmethod
+    def ensure_indexes(bind=None):
+        """
+        Cria os índices de audit_logs que ainda não existem. Necessário para
+        bancos criados antes dos índices compostos, já que db.create_all() não
+        altera tabelas existentes.
+        """
+        for index in AuditLog.__table__.indexes:
+            index.create(bind=bind or db.engine, checkfirst=True)
+
+    @staticmethod
+    def ensure_fts(bind=None):
+        """
+        Cria a tabela FTS5 audit_logs_fts (conteúdo externo espelhado de
+        audit_logs em username, resource_name e details) e os triggers que a
+        mantêm sincronizada. Na primeira criação o índice é populado com os
+        logs existentes.
+
+        Returns:
+            bool: False se o SQLite não tiver suporte a FTS5
+        """
+        with (bind or db.engine).begin() as conn:
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'audit_logs_fts'"
+            )).first() is not None
+            if exists:
+                return True
+
+            try:
+                conn.execute(text(
+                    "CREATE VIRTUAL TABLE audit_logs_fts USING fts5("
+                    "username, resource_name, details, "
+                    "content='audit_logs', content_rowid='id')"
+                ))
+            except OperationalError:
+                return False
+
+            conn.execute(text(
+                "CREATE TRIGGER IF NOT EXISTS audit_logs_fts_ai AFTER INSERT ON audit_logs BEGIN "
+                "INSERT INTO audit_logs_fts(rowid, username, resource_name, details) "
+                "VALUES (new.id, new.username, new.resource_name, new.details); "
+                "END"
+            ))
+            conn.execute(text(
+                "CREATE TRIGGER IF NOT EXISTS audit_logs_fts_ad AFTER DELETE ON audit_logs BEGIN "
+                "INSERT INTO audit_logs_fts(audit_logs_fts, rowid, username, resource_name, details) "
+                "VALUES ('delete', old.id, old.username, old.resource_name, old.details); "
+                "END"
+            ))
+            conn.execute(text("INSERT INTO audit_logs_fts(audit_logs_fts) VALUES ('rebuild')"))
+        return True
+
+    @staticmethod
+    def search_condition(q):
+        """
+        Retorna a condição que restringe audit_logs aos logs cujo username,
+        resource_name ou details contém todos os termos de q.
+
+        Cada termo vira uma frase com prefixo no FTS5, então '00:25:22' encontra
+        MACs que começam com 00:25:22 e 'maria' encontra MARIA_DACIANE_321.
+        Sem FTS5 disponível, cai para LIKE nas três colunas.
+        """
+        terms = q.split()
+        if not AuditLog.has_fts():
+            conditions = []
+            for term in terms:
+                pattern = f'%{term}%'
+                conditions.append(
+                    AuditLog.username.ilike(pattern)
+                    | AuditLog.resource_name.ilike(pattern)
+                    | AuditLog.details.ilike(pattern)
+                )
+            return db.and_(*conditions)
+
+        match = ' '.join('"' + term.replace('"', '""') + '" *' for term in terms)
+        return AuditLog.id.in_(
+            text("SELECT rowid FROM audit_logs_fts WHERE audit_logs_fts MATCH :fts_match")
+            .bindparams(fts_match=match)
+            .columns(db.column('rowid', db.Integer))
+        )
+
+    @staticmethod
+    def has_fts():
+        """Indica se a tabela audit_logs_fts existe no banco."""
+        return db.session.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'audit_logs_fts'"
+        )).first() is not None
     
     @staticmethod
     def create_log(username, action, resource_type, resource_name=None, 
@@ -75,5 +259,108 @@ class AuditLog(db.Model):
             user_id=user_id
         )
         db.session.add(log)
+        db.session.flush()
+        AuditLogRollup.increment(db.session.connection(), [{
+            'timestamp': log.timestamp,
+            'action': log.action,
+            'resource_type': log.resource_type,
+            'status': log.status,
+            'username': log.username
+        }])
         db.session.commit()
         return log
+
+
+class AuditLogRollup(db.Model):
+    """
+    Contadores diários de logs de auditoria por ação, recurso, status e usuário.
+    Mantidos incrementalmente a cada gravação em audit_logs, permitem calcular
+    as estatísticas sem varrer a tabela de logs.
+    """
+    __tablename__ = 'audit_log_rollups'
+
+    day = db.Column(db.Date, primary_key=True)
+    action = db.Column(db.String(50), primary_key=True)
+    resource_type = db.Column(db.String(50), primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    username = db.Column(db.String(120), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    KEY_COLUMNS = ('day', 'action', 'resource_type', 'status', 'username')
+
+    def __repr__(self):
+        return f'<AuditLogRollup {self.day} {self.action} {self.resource_type} {self.status} {self.username}: {self.count}>'
+
+    @staticmethod
+    def increment(conn, rows):
+        """
+        Soma os logs informados aos contadores, na transação da conexão recebida.
+
+        Args:
+            conn: Conexão SQLAlchemy (a mesma usada para inserir os logs)
+            rows: Dicionários com timestamp, action, resource_type, status e username
+        """
+        counts = Counter(
+            (row['timestamp'].date(), row['action'], row['resource_type'], row['status'], row['username'])
+            for row in rows
+        )
+        if not counts:
+            return
+
+        table = AuditLogRollup.__table__
+        stmt = sqlite_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(AuditLogRollup.KEY_COLUMNS),
+            set_={'count': table.c['count'] + stmt.excluded['count']}
+        )
+        conn.execute(stmt, [
+            dict(zip(AuditLogRollup.KEY_COLUMNS, key), count=count)
+            for key, count in counts.items()
+        ])
+
+    @staticmethod
+    def decrement(conn, rows):
+        """
+        Subtrai dos contadores os logs informados (removidos de audit_logs), na
+        transação da conexão recebida. Contadores zerados são apagados.
+
+        Args:
+            conn: Conexão SQLAlchemy (a mesma usada para remover os logs)
+            rows: Dicionários com timestamp, action, resource_type, status e username
+        """
+        counts = Counter(
+            (row['timestamp'].date(), row['action'], row['resource_type'], row['status'], row['username'])
+            for row in rows
+        )
+        if not counts:
+            return
+
+        table = AuditLogRollup.__table__
+        key = [table.c[column] == bindparam(f'key_{column}') for column in AuditLogRollup.KEY_COLUMNS]
+        conn.execute(
+            table.update().where(*key).values(count=table.c['count'] - bindparam('removed')),
+            [dict({f'key_{column}': value for column, value in zip(AuditLogRollup.KEY_COLUMNS, key_values)},
+                  removed=count)
+             for key_values, count in counts.items()]
+        )
+        conn.execute(table.delete().where(table.c['count'] <= 0))
+
+    @staticmethod
+    def backfill_if_empty():
+        """Reconstrói os contadores a partir de audit_logs quando a tabela está vazia."""
+        if db.session.query(AuditLogRollup.day).first() is not None:
+            return
+        if db.session.query(AuditLog.id).first() is None:
+            return
+
+        day = func.date(AuditLog.timestamp)
+        grouped = select(
+            day, AuditLog.action, AuditLog.resource_type, AuditLog.status,
+            AuditLog.username, func.count(AuditLog.id)
+        ).group_by(day, AuditLog.action, AuditLog.resource_type, AuditLog.status, AuditLog.username)
+        db.session.execute(
+            insert(AuditLogRollup.__table__).from_select(
+                list(AuditLogRollup.KEY_COLUMNS) + ['count'], grouped
+            )
+        )
+        db.session.commit()
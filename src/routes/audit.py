@@ -1,10 +1,124 @@
-from flask import Blueprint, request, jsonify
+import base64
+import csv
+import io
+import json
+from itertools import islice
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from flask_login import login_required
-from src.models.audit_log import AuditLog
+from sqlalchemy import case, func, tuple_
+from src.models.user import db
+from src.models.audit_log import AuditLog, AuditLogRollup
+from src.utils.audit_archive import archived_months, count_archived_logs, iter_archived_logs
 from datetime import datetime, timedelta
 
 audit_bp = Blueprint('audit', __name__)
 
+def parse_log_filters(args):
+    """
+    Lê os filtros de logs dos query parameters.
+
+    Returns:
+        dict com action, resource_type, username, q, status, start_dt e end_dt
+        (None quando não informados)
+
+    Raises:
+        ValueError: Com a mensagem de erro quando uma data é inválida
+    """
+    action = args.get('action')
+    resource_type = args.get('resource_type')
+    status = args.get('status')
+    start_date = args.get('start_date')
+    end_date = args.get('end_date')
+
+    filters = {
+        'action': action.upper() if action else None,
+        'resource_type': resource_type.upper() if resource_type else None,
+        'username': args.get('username') or None,
+        'q': args.get('q', '').strip() or None,
+        'status': status.upper() if status else None,
+        'start_dt': None,
+        'end_dt': None
+    }
+
+    if start_date:
+        try:
+            filters['start_dt'] = datetime.strptime(start_date, '%Y-%m-%d')
+        except ValueError:
+            raise ValueError('Formato de data inicial inválido. Use YYYY-MM-DD')
+
+    if end_date:
+        try:
+            filters['end_dt'] = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+        except ValueError:
+            raise ValueError('Formato de data final inválido. Use YYYY-MM-DD')
+
+    return filters
+
+def log_conditions(filters):
+    """Converte os filtros em condições sobre audit_logs."""
+    conditions = []
+    if filters['action']:
+        conditions.append(AuditLog.action == filters['action'])
+    if filters['resource_type']:
+        conditions.append(AuditLog.resource_type == filters['resource_type'])
+    if filters['username']:
+        conditions.append(AuditLog.username.ilike(f"%{filters['username']}%"))
+    if filters['q']:
+        conditions.append(AuditLog.search_condition(filters['q']))
+    if filters['status']:
+        conditions.append(AuditLog.status == filters['status'])
+    if filters['start_dt']:
+        conditions.append(AuditLog.timestamp >= filters['start_dt'])
+    if filters['end_dt']:
+        conditions.append(AuditLog.timestamp < filters['end_dt'])
+    return conditions
+
+def estimate_log_count(filters):
+    """
+    Estima o total de logs para os filtros usando audit_log_rollups.
+    As datas dos filtros são sempre dias inteiros, então o valor só diverge do
+    COUNT(*) exato se os contadores estiverem desatualizados.
+    """
+    query = db.session.query(func.coalesce(func.sum(AuditLogRollup.count), 0))
+    if filters['action']:
+        query = query.filter(AuditLogRollup.action == filters['action'])
+    if filters['resource_type']:
+        query = query.filter(AuditLogRollup.resource_type == filters['resource_type'])
+    if filters['username']:
+        query = query.filter(AuditLogRollup.username.ilike(f"%{filters['username']}%"))
+    if filters['status']:
+        query = query.filter(AuditLogRollup.status == filters['status'])
+    if filters['start_dt']:
+        query = query.filter(AuditLogRollup.day >= filters['start_dt'].date())
+    if filters['end_dt']:
+        query = query.filter(AuditLogRollup.day < filters['end_dt'].date())
+    return int(query.scalar())
+
+def log_archive_dir(filters):
+    """
+    Retorna o diretório de arquivos de log a consultar para os filtros, ou
+    None. Os arquivos só são lidos quando o período pedido começa antes do
+    limite de retenção.
+    """
+    archive_dir = current_app.config.get('AUDIT_ARCHIVE_DIR')
+    if filters['start_dt'] and archived_months(archive_dir, filters['start_dt'], filters['end_dt']):
+        return archive_dir
+    return None
+
+def encode_cursor(timestamp, log_id):
+    """Gera o cursor opaco que aponta para depois do log (timestamp, id)."""
+    raw = f"{timestamp.isoformat()}|{log_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Decodifica um cursor gerado por encode_cursor. Retorna (timestamp, id)."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        timestamp, log_id = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8').split('|')
+        return datetime.fromisoformat(timestamp), int(log_id)
+    except (ValueError, UnicodeError):
+        raise ValueError('Cursor inválido')
+
 @audit_bp.route('/logs', methods=['GET'])
 @login_required
 def get_logs():
@@ -15,60 +129,89 @@ def get_logs():
         - action: Filtrar por tipo de ação (CREATE, UPDATE, DELETE, LOGIN, LOGOUT)
         - resource_type: Filtrar por tipo de recurso (HOST, USER, CONFIG)
         - username: Filtrar por nome de usuário
+        - q: Busca textual (FTS5) em usuário, recurso e detalhes, por exemplo
+          um MAC, IP ou nome de host
         - status: Filtrar por status (SUCCESS, FAILURE, ERROR)
         - start_date: Data inicial (formato: YYYY-MM-DD)
         - end_date: Data final (formato: YYYY-MM-DD)
         - limit: Número máximo de resultados (padrão: 100)
         - offset: Offset para paginação (padrão: 0)
+        - cursor: Paginação por cursor em (timestamp, id). Vazio para a
+          primeira página e depois o valor de next_cursor da resposta anterior.
+          Quando presente, offset é ignorado e o custo de cada página é o mesmo
+          independentemente da profundidade.
+        - Quando start_date é anterior ao período de retenção, os logs
+          arquivados em AUDIT_ARCHIVE_DIR são incluídos após os do banco
+        - total: Apenas com cursor: 'exact' (COUNT(*)), 'estimate' (pelos
+          contadores de audit_log_rollups; exato quando há busca q) ou 'none'
+          (padrão). Os logs arquivados são contados por
+          audit_archive.count_archived_logs; com offset e busca q, ficam fora
+          do total (total_includes_archive: false)
     """
     try:
-        # Obter parâmetros de filtro
-        action = request.args.get('action')
-        resource_type = request.args.get('resource_type')
-        username = request.args.get('username')
-        status = request.args.get('status')
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
         limit = int(request.args.get('limit', 100))
         offset = int(request.args.get('offset', 0))
-        
+        cursor = request.args.get('cursor')
+        total_mode = request.args.get('total', 'none')
+
+        try:
+            filters = parse_log_filters(request.args)
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            return jsonify({
+                'message': str(e),
+                'success': False
+            }), 400
+
+        archive_dir = log_archive_dir(filters)
+
         # Construir query
-        query = AuditLog.query
-        
-        if action:
-            query = query.filter(AuditLog.action == action.upper())
-        
-        if resource_type:
-            query = query.filter(AuditLog.resource_type == resource_type.upper())
-        
-        if username:
-            query = query.filter(AuditLog.username.ilike(f'%{username}%'))
-        
-        if status:
-            query = query.filter(AuditLog.status == status.upper())
-        
-        if start_date:
-            try:
-                start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-                query = query.filter(AuditLog.timestamp >= start_dt)
-            except ValueError:
-                return jsonify({
-                    'message': 'Formato de data inicial inválido. Use YYYY-MM-DD',
-                    'success': False
-                }), 400
-        
-        if end_date:
-            try:
-                end_dt = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
-                query = query.filter(AuditLog.timestamp < end_dt)
-            except ValueError:
-                return jsonify({
-                    'message': 'Formato de data final inválido. Use YYYY-MM-DD',
-                    'success': False
-                }), 400
+        query = AuditLog.query.filter(*log_conditions(filters))
         
         # Ordenar por timestamp decrescente (mais recente primeiro)
-        query = query.order_by(AuditLog.timestamp.desc())
+        query = query.order_by(AuditLog.timestamp.desc(), AuditLog.id.desc())
+
+        if cursor is not None:
+            if after:
+                query = query.filter(tuple_(AuditLog.timestamp, AuditLog.id) < tuple_(*after))
+
+            # Busca um registro a mais para saber se existe próxima página
+            logs_data = [log.to_dict() for log in query.limit(limit + 1).all()]
+
+            # Logs arquivados são sempre mais antigos que os do banco, então
+            # entram depois que a parte do banco se esgota
+            if len(logs_data) <= limit and archive_dir:
+                before = after if not logs_data else None
+                for row in iter_archived_logs(archive_dir, filters, before):
+                    logs_data.append(row)
+                    if len(logs_data) > limit:
+                        break
+
+            next_cursor = None
+            if len(logs_data) > limit and limit > 0:
+                last = logs_data[limit - 1]
+                next_cursor = encode_cursor(datetime.fromisoformat(last['timestamp']), last['id'])
+
+            response = {
+                'success': True,
+                'limit': limit,
+                'next_cursor': next_cursor,
+                'logs': logs_data[:limit]
+            }
+            if total_mode == 'exact' or (total_mode == 'estimate' and filters['q']):
+                response['total'] = AuditLog.query.filter(*log_conditions(filters)).count()
+                if archive_dir:
+                    archived_total = count_archived_logs(archive_dir, filters)
+                    if archived_total is None:
+                        # Busca textual: só contando os logs arquivados um a um
+                        archived_total = sum(1 for _ in iter_archived_logs(archive_dir, filters))
+                    response['total'] += archived_total
+            elif total_mode == 'estimate':
+                response['total'] = estimate_log_count(filters)
+                if archive_dir:
+                    response['total'] += count_archived_logs(archive_dir, filters)
+                response['total_estimated'] = True
+            return jsonify(response)
         
         # Obter total de registros
         total = query.count()
@@ -78,14 +221,27 @@ def get_logs():
         
         # Converter para dicionários
         logs_data = [log.to_dict() for log in logs]
-        
-        return jsonify({
+
+        # Complementar com os logs arquivados que atendem aos filtros. Apenas
+        # os meses necessários para a página são lidos
+        archived_total = 0
+        if archive_dir:
+            if len(logs_data) < limit:
+                skip = max(0, offset - total)
+                logs_data += islice(iter_archived_logs(archive_dir, filters, skip=skip), limit - len(logs_data))
+            archived_total = count_archived_logs(archive_dir, filters)
+
+        response = {
             'success': True,
-            'total': total,
+            'total': total + (archived_total or 0),
             'limit': limit,
             'offset': offset,
             'logs': logs_data
-        })
+        }
+        if archived_total is None:
+            # Com busca textual (q), os logs arquivados não entram no total
+            response['total_includes_archive'] = False
+        return jsonify(response)
         
     except Exception as e:
         return jsonify({
@@ -120,44 +276,57 @@ def get_log(log_id):
 @audit_bp.route('/logs/stats', methods=['GET'])
 @login_required
 def get_logs_stats():
-    """Retorna estatísticas dos logs de auditoria."""
+    """
+    Retorna estatísticas dos logs de auditoria.
+
+    Os números vêm de audit_log_rollups (contadores diários) em uma única
+    consulta agrupada, então o custo não cresce com o tamanho de audit_logs.
+    Como a granularidade é diária (UTC), logs_24h considera o dia de ontem
+    inteiro e logs_week os últimos 7 dias completos mais o dia atual.
+    Logs já arquivados (ver src/utils/audit_archive.py) não são contados.
+    """
     try:
-        # Total de logs
-        total_logs = AuditLog.query.count()
-        
-        # Logs por ação
-        actions_stats = {}
-        for action in ['CREATE', 'UPDATE', 'DELETE', 'LOGIN', 'LOGOUT']:
-            count = AuditLog.query.filter(AuditLog.action == action).count()
-            actions_stats[action] = count
-        
-        # Logs por tipo de recurso
-        resources_stats = {}
-        for resource in ['HOST', 'USER', 'CONFIG']:
-            count = AuditLog.query.filter(AuditLog.resource_type == resource).count()
-            resources_stats[resource] = count
-        
-        # Logs por status
-        status_stats = {}
-        for status in ['SUCCESS', 'FAILURE', 'ERROR']:
-            count = AuditLog.query.filter(AuditLog.status == status).count()
-            status_stats[status] = count
-        
-        # Logs das últimas 24 horas
-        yesterday = datetime.utcnow() - timedelta(days=1)
-        logs_24h = AuditLog.query.filter(AuditLog.timestamp >= yesterday).count()
-        
-        # Logs da última semana
-        last_week = datetime.utcnow() - timedelta(days=7)
-        logs_week = AuditLog.query.filter(AuditLog.timestamp >= last_week).count()
-        
+        today = datetime.utcnow().date()
+        yesterday = today - timedelta(days=1)
+        last_week = today - timedelta(days=7)
+
+        rows = db.session.query(
+            AuditLogRollup.action,
+            AuditLogRollup.resource_type,
+            AuditLogRollup.status,
+            AuditLogRollup.username,
+            func.sum(AuditLogRollup.count),
+            func.sum(case((AuditLogRollup.day >= yesterday, AuditLogRollup.count), else_=0)),
+            func.sum(case((AuditLogRollup.day >= last_week, AuditLogRollup.count), else_=0))
+        ).group_by(
+            AuditLogRollup.action,
+            AuditLogRollup.resource_type,
+            AuditLogRollup.status,
+            AuditLogRollup.username
+        ).all()
+
+        total_logs = 0
+        logs_24h = 0
+        logs_week = 0
+        actions_stats = dict.fromkeys(['CREATE', 'UPDATE', 'DELETE', 'LOGIN', 'LOGOUT'], 0)
+        resources_stats = dict.fromkeys(['HOST', 'USER', 'CONFIG'], 0)
+        status_stats = dict.fromkeys(['SUCCESS', 'FAILURE', 'ERROR'], 0)
+        users_stats = {}
+
+        for action, resource_type, status, username, count, count_24h, count_week in rows:
+            total_logs += count
+            logs_24h += count_24h
+            logs_week += count_week
+            if action in actions_stats:
+                actions_stats[action] += count
+            if resource_type in resources_stats:
+                resources_stats[resource_type] += count
+            if status in status_stats:
+                status_stats[status] += count
+            users_stats[username] = users_stats.get(username, 0) + count
+
         # Usuários mais ativos
-        from sqlalchemy import func
-        top_users = AuditLog.query.with_entities(
-            AuditLog.username,
-            func.count(AuditLog.id).label('count')
-        ).group_by(AuditLog.username).order_by(func.count(AuditLog.id).desc()).limit(10).all()
-        
+        top_users = sorted(users_stats.items(), key=lambda item: item[1], reverse=True)[:10]
         top_users_data = [{'username': user[0], 'count': user[1]} for user in top_users]
         
         return jsonify({
@@ -202,3 +371,83 @@ def get_recent_logs():
             'message': f'Erro ao buscar logs recentes: {str(e)}',
             'success': False
         }), 500
+
+# Quantidade de linhas lidas do banco e enviadas ao cliente por vez na exportação
+EXPORT_CHUNK_SIZE = 1000
+
+@audit_bp.route('/export', methods=['GET'])
+@login_required
+def export_logs():
+    """
+    Exporta os logs de auditoria em CSV ou JSON Lines.
+
+    Aceita os mesmos filtros de /logs (action, resource_type, username, q,
+    status, start_date, end_date) e format=csv|jsonl (padrão: csv).
+
+    A resposta é transmitida em partes: as linhas são lidas do banco como
+    tuplas com yield_per, sem instanciar objetos AuditLog, então o uso de
+    memória não depende da quantidade de logs exportados.
+    """
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in ('csv', 'jsonl'):
+        return jsonify({
+            'message': 'Formato inválido. Use csv ou jsonl',
+            'success': False
+        }), 400
+
+    try:
+        filters = parse_log_filters(request.args)
+    except ValueError as e:
+        return jsonify({
+            'message': str(e),
+            'success': False
+        }), 400
+
+    archive_dir = log_archive_dir(filters)
+    columns = list(AuditLog.__table__.columns)
+    names = [column.name for column in columns]
+    stmt = db.select(*columns).where(*log_conditions(filters)).order_by(
+        AuditLog.timestamp.desc(), AuditLog.id.desc()
+    ).execution_options(yield_per=EXPORT_CHUNK_SIZE)
+
+    def iter_rows():
+        for row in db.session.execute(stmt):
+            row = dict(zip(names, row))
+            row['timestamp'] = row['timestamp'].isoformat() if row['timestamp'] else None
+            yield row
+        if archive_dir:
+            yield from iter_archived_logs(archive_dir, filters)
+
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=names, extrasaction='ignore')
+        writer.writeheader()
+        for count, row in enumerate(iter_rows(), 1):
+            writer.writerow(row)
+            if count % EXPORT_CHUNK_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    def generate_jsonl():
+        lines = []
+        for row in iter_rows():
+            lines.append(json.dumps(row, ensure_ascii=False))
+            if len(lines) >= EXPORT_CHUNK_SIZE:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+        if lines:
+            yield '\n'.join(lines) + '\n'
+
+    if export_format == 'csv':
+        body, mimetype = generate_csv(), 'text/csv'
+    else:
+        body, mimetype = generate_jsonl(), 'application/x-ndjson'
+
+    filename = f"audit_logs_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify, session
 from flask_login import login_user, logout_user, login_required, current_user
 from src.models.user import User, db
 from src.utils.audit import log_user_login, log_user_logout, log_action
+from src.utils.login_throttle import login_throttle
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -93,6 +94,19 @@ def login():
                 'success': False
             }), 400
         
+        # Limitar tentativas antes de qualquer consulta ou hash de senha
+        # REMOTE_ADDR, não o X-Forwarded-For enviado pelo cliente: atrás de um
+        # proxy, o ProxyFix (TRUSTED_PROXY_COUNT) o substitui pelo IP real
+        retry_after = login_throttle.check(request.remote_addr or 'unknown', username)
+        if retry_after:
+            retry_seconds = int(retry_after) + 1
+            response = jsonify({
+                'message': f'Muitas tentativas de login. Tente novamente em {retry_seconds} segundos.',
+                'success': False
+            })
+            response.headers['Retry-After'] = str(retry_seconds)
+            return response, 429
+        
         # Buscar usuário por username ou email
         user = User.query.filter(
             (User.username == username) | (User.email == username)
@@ -112,6 +126,8 @@ def login():
                 'success': False
             }), 401
         
+        login_throttle.succeeded(username)
+
         # Fazer login do usuário
         login_user(user, remember=remember)
         
@@ -184,3 +200,12 @@ def check_auth():
             'message': f'Erro interno do servidor: {str(e)}',
             'success': False
         }), 500
+
+@auth_bp.route('/throttle', methods=['GET'])
+@login_required
+def get_throttle_stats():
+    """Retorna os contadores do limitador de tentativas de login."""
+    return jsonify({
+        'success': True,
+        'stats': login_throttle.stats()
+    })
@@ -0,0 +1,63 @@
+from functools import wraps
+
+from flask import Blueprint, jsonify, send_from_directory
+from flask_login import login_required, current_user
+
+from src.utils.profiling import profiler, SAFE_NAME_RE
+
+debug_bp = Blueprint('debug', __name__)
+
+
+def profiling_admin_required(view):
+    """Restringe a rota aos usuários listados em PROFILING_ADMINS."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not profiler.is_admin(current_user):
+            return jsonify({
+                'message': 'Acesso restrito aos administradores de perfilamento',
+                'success': False
+            }), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@debug_bp.route('/profiles', methods=['GET'])
+@login_required
+@profiling_admin_required
+def list_profiles():
+    """Lista os perfis de requisições e os snapshots de memória gravados."""
+    return jsonify({
+        'success': True,
+        'files': profiler.list_files()
+    })
+
+
+@debug_bp.route('/profiles/<string:name>', methods=['GET'])
+@login_required
+@profiling_admin_required
+def download_profile(name):
+    """Baixa um perfil (.prof, .html, .txt) ou snapshot de memória (.snapshot)."""
+    if not SAFE_NAME_RE.match(name):
+        return jsonify({
+            'message': 'Nome de arquivo inválido',
+            'success': False
+        }), 400
+    return send_from_directory(profiler.directory, name, as_attachment=True)
+
+
+@debug_bp.route('/memory/snapshot', methods=['POST'])
+@login_required
+@profiling_admin_required
+def take_memory_snapshot():
+    """Grava um snapshot de memória agora (inicia o tracemalloc se necessário)."""
+    try:
+        name = profiler.take_memory_snapshot()
+        return jsonify({
+            'success': True,
+            'name': name
+        })
+    except Exception as e:
+        return jsonify({
+            'message': f'Erro ao gravar snapshot de memória: {str(e)}',
+            'success': False
+        }), 500
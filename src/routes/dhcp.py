@@ -1,32 +1,35 @@
-import os
 import re
-import sys
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 
 from flask_login import login_required, current_user
+from sqlalchemy import or_
 
-# Adicionar o diretório raiz ao path para importar o dhcp_parser
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-
-from dhcp_parser import parse_dhcp_conf, get_used_ips, parse_ip_ranges
-from src.utils.audit import log_host_create, log_host_update, log_host_delete, log_action
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from src.utils.audit import log_host_create, log_host_update, log_host_rename, log_host_delete, log_action
+from src.models.audit_log import AuditLog
+from src.utils import host_changes, host_inventory, rule_store
+from src.utils.metrics import metrics
 from dhcp_service_manager import get_dhcp_status, restart_dhcp_service
+from dhcp_parser import HostRecord, ip_to_int, int_to_ip, mac_to_int, find_host_blocks, apply_edits
 
 dhcp_bp = Blueprint('dhcp', __name__)
 
-# Caminhos dos arquivos de configuração
-DHCP_CONF_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'dhcpd.conf')
-IPS_SCRIPT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'ips_disponiveis.sh')
+def dhcp_conf_path():
+    """Caminho do dhcpd.conf configurado na aplicação (DHCP_CONF_PATH)."""
+    return current_app.config['DHCP_CONF_PATH']
 
-def ip_to_int(ip_address):
-    """Converte um endereço IP para inteiro."""
-    parts = list(map(int, ip_address.split('.')))
-    return (parts[0] << 24) + (parts[1] << 16) + (parts[2] << 8) + parts[3]
+def rules_path():
+    """Caminho do arquivo de regras de IP configurado na aplicação (RULES_PATH)."""
+    return current_app.config['RULES_PATH']
 
-def int_to_ip(ip_int):
-    """Converte um inteiro para endereço IP."""
-    return f"{(ip_int >> 24) & 0xFF}.{(ip_int >> 16) & 0xFF}.{(ip_int >> 8) & 0xFF}.{ip_int & 0xFF}"
+def host_vendors(hosts_count):
+    """
+    Fabricante do MAC de cada host (host_inventory.get_host_vendors), ou
+    None para todos se o registro OUI não tiver sido compilado.
+    """
+    try:
+        return host_inventory.get_host_vendors(dhcp_conf_path(), current_app.config['OUI_REGISTRY_PATH'])
+    except (FileNotFoundError, ValueError):
+        return [None] * hosts_count
 
 def get_ips_in_range(start_ip, end_ip, used_ips, limit=50):
     """Retorna uma lista de IPs disponíveis em um range."""
@@ -43,21 +46,31 @@ def get_ips_in_range(start_ip, end_ip, used_ips, limit=50):
     
     return available
 
+def rewrite_host_block(block, mac_address, ip_address):
+    """
+    Troca as linhas de MAC e IP de um bloco host (bytes, como localizado por
+    find_host_blocks), mantendo a linha de abertura e as demais.
+    """
+    lines = block.splitlines(keepends=True)
+    new_lines = lines[:1]
+    for line in lines[1:]:
+        if b'hardware ethernet' in line:
+            new_lines.append(f'\t\t\t\thardware ethernet {mac_address};\n'.encode('ascii'))
+        elif b'fixed-address' in line:
+            new_lines.append(f'\t\t\t\tfixed-address {ip_address};\n'.encode('ascii'))
+        else:
+            new_lines.append(line)
+    return b''.join(new_lines)
+
 def validate_mac(mac_address):
     """Valida o formato do endereço MAC."""
     return re.match(r"^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$", mac_address)
 
 
 
-def find_rule_for_ip(ip_address, rules):
-    """Encontra a regra de IP para um determinado endereço IP."""
-    for rule in rules:
-        start_int = ip_to_int(rule['inicio'])
-        end_int = ip_to_int(rule['fim'])
-        ip_int = ip_to_int(ip_address)
-        if start_int <= ip_int <= end_int:
-            return f"{rule['categoria']} - {rule['acesso']}"
-    return "N/A"
+def find_rule_for_ip(ip_address, rule_index):
+    """Encontra a regra de IP (rótulo, ou 'N/A') para um determinado endereço IP."""
+    return rule_index.label_for(ip_address)
 
 def validate_ip(ip_address):
     """Valida o formato do endereço IP."""
@@ -70,8 +83,8 @@ def validate_ip(ip_address):
 def get_stats():
     """Retorna estatísticas do sistema DHCP."""
     try:
-        hosts_data = parse_dhcp_conf(DHCP_CONF_PATH)
-        ip_rules = parse_ip_ranges(IPS_SCRIPT_PATH)
+        hosts_data = host_inventory.get_hosts(dhcp_conf_path())
+        ip_rules = host_inventory.get_rules(rules_path())
         
         return jsonify({
             'total_hosts': len(hosts_data),
@@ -84,19 +97,6 @@ def get_stats():
             'success': False
         }), 500
 
-@dhcp_bp.route('/rules', methods=['GET'])
-@login_required
-def get_rules():
-    """Retorna todas as regras de IP disponíveis."""
-    try:
-        ip_rules = parse_ip_ranges(IPS_SCRIPT_PATH)
-        return jsonify(ip_rules)
-    except Exception as e:
-        return jsonify({
-            'message': f'Erro ao carregar regras: {str(e)}',
-            'success': False
-        }), 500
-
 @dhcp_bp.route('/available-ips', methods=['GET'])
 @login_required
 def get_available_ips():
@@ -117,7 +117,7 @@ def get_available_ips():
                 'success': False
             }), 400
         
-        used_ips = get_used_ips(DHCP_CONF_PATH)
+        used_ips = host_inventory.get_used_ips(dhcp_conf_path())
         available_ips = get_ips_in_range(start_ip, end_ip, used_ips)
         
         return jsonify(available_ips)
@@ -130,15 +130,19 @@ def get_available_ips():
 @dhcp_bp.route('/hosts_status', methods=['GET'])
 @login_required
 def get_hosts_status():
-    """Retorna todos os hosts cadastrados com o status de conectividade e a regra de IP."""
+    """
+    Retorna todos os hosts cadastrados com o status de conectividade, a regra
+    de IP e o fabricante do MAC (vendor, None se desconhecido).
+    """
     try:
-        hosts_data = parse_dhcp_conf(DHCP_CONF_PATH)
-        ip_rules = parse_ip_ranges(IPS_SCRIPT_PATH)
-        hosts_with_status = []
-        for host in hosts_data:
+        hosts_data = host_inventory.get_hosts(dhcp_conf_path())
+        host_rules = host_inventory.get_host_rules(dhcp_conf_path(), rules_path())
+        vendors = host_vendors(len(hosts_data))
+        hosts_with_status = hosts_data.to_dicts()
+        for host, rule, vendor in zip(hosts_with_status, host_rules, vendors):
             host['connectivity_status'] = "Cadastrado no DHCP"
-            host['rule'] = find_rule_for_ip(host['ip_address'], ip_rules)
-            hosts_with_status.append(host)
+            host['rule'] = rule
+            host['vendor'] = vendor
         
         return jsonify(hosts_with_status)
     except Exception as e:
@@ -147,13 +151,50 @@ def get_hosts_status():
             'success': False
         }), 500
 
+@dhcp_bp.route('/vendor', methods=['GET'])
+@login_required
+def get_vendor():
+    """
+    Consulta o fabricante de endereços MAC no registro OUI offline.
+
+    Query parameters:
+        - mac: um ou mais MACs separados por vírgula
+    """
+    try:
+        macs = [mac.strip() for mac in request.args.get('mac', '').split(',') if mac.strip()]
+        if not macs:
+            return jsonify({
+                'message': 'O parâmetro mac é obrigatório',
+                'success': False
+            }), 400
+        invalid = [mac for mac in macs if not validate_mac(mac)]
+        if invalid:
+            return jsonify({
+                'message': f'Endereço MAC inválido: {invalid[0]}. Use o formato XX:XX:XX:XX:XX:XX',
+                'success': False
+            }), 400
+        try:
+            registry = host_inventory.get_oui_registry(current_app.config['OUI_REGISTRY_PATH'])
+        except FileNotFoundError:
+            return jsonify({
+                'message': 'Registro OUI não compilado (python -m src.utils.oui_registry build)',
+                'success': False
+            }), 503
+        return jsonify([{'mac_address': mac.upper().replace('-', ':'), 'vendor': registry.vendor_for(mac)}
+                        for mac in macs])
+    except Exception as e:
+        return jsonify({
+            'message': f'Erro ao consultar fabricante: {str(e)}',
+            'success': False
+        }), 500
+
 @dhcp_bp.route('/status', methods=['GET'])
 @login_required
 def get_service_status():
     """Retorna o status do serviço DHCP."""
     try:
         status_info = get_dhcp_status()
-        log_action(f"Verificação de status do serviço DHCP: {status_info['status']}")
+        log_action('VIEW', 'CONFIG', 'dhcp_service', f"Verificação de status do serviço DHCP: {status_info['status']}")
         return jsonify(status_info)
     except Exception as e:
         return jsonify({
@@ -167,11 +208,13 @@ def get_service_status():
 def restart_service():
     """Reinicia o serviço DHCP."""
     try:
-        restart_info = restart_dhcp_service()
+        with metrics.span('restart'):
+            restart_info = restart_dhcp_service()
         if restart_info['success']:
-            log_action("Serviço DHCP reiniciado com sucesso.")
+            log_action('RESTART', 'CONFIG', 'dhcp_service', "Serviço DHCP reiniciado com sucesso.")
         else:
-            log_action(f"Falha ao reiniciar o serviço DHCP: {restart_info['message']}")
+            log_action('RESTART', 'CONFIG', 'dhcp_service', "Falha ao reiniciar o serviço DHCP.",
+                       status='FAILURE', error_message=restart_info['message'])
         return jsonify(restart_info)
     except Exception as e:
         return jsonify({
@@ -183,16 +226,107 @@ def restart_service():
 @dhcp_bp.route('/hosts', methods=['GET'])
 @login_required
 def get_hosts():
-    """Retorna todos os hosts cadastrados."""
+    """
+    Retorna todos os hosts cadastrados.
+
+    Query parameters:
+        - since: Versão já conhecida pelo cliente. Quando informada, retorna
+          apenas os hosts adicionados, alterados ou removidos depois dela, ou o
+          inventário completo se a versão não estiver mais no log de alterações.
+
+    A versão atual é enviada no cabeçalho X-Hosts-Version.
+    """
     try:
-        hosts_data = parse_dhcp_conf(DHCP_CONF_PATH)
-        return jsonify(hosts_data)
+        since = request.args.get('since')
+        host_changes.sync_with_file(dhcp_conf_path())
+
+        if since is not None:
+            try:
+                since_version = int(since)
+            except ValueError:
+                return jsonify({
+                    'message': 'Parâmetro since inválido',
+                    'success': False
+                }), 400
+
+            delta = host_changes.changes_since(since_version)
+            if delta is not None:
+                response = jsonify({
+                    'success': True,
+                    'full': False,
+                    'version': delta['version'],
+                    'upserted': delta['upserted'],
+                    'removed': delta['removed']
+                })
+                response.headers['X-Hosts-Version'] = str(delta['version'])
+                return response
+
+            version = host_changes.current_version()
+            response = jsonify({
+                'success': True,
+                'full': True,
+                'version': version,
+                'hosts': host_inventory.get_hosts(dhcp_conf_path()).to_dicts()
+            })
+            response.headers['X-Hosts-Version'] = str(version)
+            return response
+
+        version = host_changes.current_version()
+        hosts_data = host_inventory.get_hosts(dhcp_conf_path())
+        response = jsonify(hosts_data.to_dicts())
+        response.headers['X-Hosts-Version'] = str(version)
+        return response
     except Exception as e:
         return jsonify({
             'message': f'Erro ao carregar hosts: {str(e)}',
             'success': False
         }), 500
 
+# Limite de nomes seguidos em uma cadeia de renomeações
+MAX_RENAME_CHAIN = 100
+
+@dhcp_bp.route('/hosts/<string:host_name>/history', methods=['GET'])
+@login_required
+def get_host_history(host_name):
+    """
+    Retorna o histórico de auditoria de um host, em ordem cronológica,
+    incluindo os registros feitos sob nomes anteriores ou posteriores do mesmo
+    host (cadeia de renomeações). Usa apenas as colunas indexadas host_*.
+    """
+    try:
+        names = {host_name}
+        frontier = [host_name]
+        while frontier and len(names) < MAX_RENAME_CHAIN:
+            renames = AuditLog.query.with_entities(
+                AuditLog.host_name, AuditLog.host_prev_name
+            ).filter(
+                AuditLog.host_prev_name.isnot(None),
+                or_(AuditLog.host_name.in_(frontier), AuditLog.host_prev_name.in_(frontier))
+            ).all()
+
+            frontier = []
+            for new_name, old_name in renames:
+                for name in (new_name, old_name):
+                    if name not in names:
+                        names.add(name)
+                        frontier.append(name)
+
+        logs = AuditLog.query.filter(
+            or_(AuditLog.host_name.in_(names), AuditLog.host_prev_name.in_(names))
+        ).order_by(AuditLog.timestamp, AuditLog.id).all()
+
+        return jsonify({
+            'success': True,
+            'host_name': host_name,
+            'names': sorted(names),
+            'history': [log.to_dict() for log in logs]
+        })
+    except Exception as e:
+        return jsonify({
+            'message': f'Erro ao carregar histórico do host: {str(e)}',
+            'success': False
+        }), 500
+
 @dhcp_bp.route('/register', methods=['POST'])
 @login_required
 def register_ip():
@@ -229,43 +363,27 @@ def register_ip():
                 'success': False
             }), 400
         
+        # Alterações externas ao arquivo entram no log antes desta
+        host_changes.sync_with_file(dhcp_conf_path())
+
         # Verificar se o IP já está em uso
-        used_ips = get_used_ips(DHCP_CONF_PATH)
+        used_ips = host_inventory.get_used_ips(dhcp_conf_path())
         if ip_address in used_ips:
             return jsonify({
                 'message': f'O IP {ip_address} já está em uso',
                 'success': False
             }), 400
         
-        # Verificar se o IP está dentro de alguma regra
-        ip_rules = parse_ip_ranges(IPS_SCRIPT_PATH)
-        is_ip_in_rule = False
-        for rule in ip_rules:
-            start_int = ip_to_int(rule["inicio"])
-            end_int = ip_to_int(rule["fim"])
-            ip_int = ip_to_int(ip_address)
-            if start_int <= ip_int <= end_int:
-                is_ip_in_rule = True
-                break
-        
-        if not is_ip_in_rule:
-            return jsonify({
-                'message': f'O IP {ip_address} não pertence a nenhum range de regras definido',
-                'success': False
-            }), 400
-        
         # Verificar se o nome do host já existe
-        hosts_data = parse_dhcp_conf(DHCP_CONF_PATH)
-        existing_names = [host['name'] for host in hosts_data]
-        if host_name.replace(' ', '_') in existing_names:
+        hosts_data = host_inventory.get_hosts(dhcp_conf_path())
+        if host_name.replace(' ', '_') in hosts_data.names:
             return jsonify({
                 'message': f'O nome do host {host_name} já existe',
                 'success': False
             }), 400
         
         # Verificar se o MAC já existe
-        existing_macs = [host['mac_address'] for host in hosts_data]
-        if mac_address in existing_macs:
+        if mac_to_int(mac_address) in hosts_data.macs:
             return jsonify({
                 'message': f'O endereço MAC {mac_address} já está cadastrado',
                 'success': False
@@ -275,52 +393,63 @@ def register_ip():
         from datetime import datetime
         registration_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         host_name_clean = host_name.replace(' ', '_').replace('-', '_')
+        # O "# Data:" fica dentro do bloco, onde parse_hosts o procura: o
+        # host relido do arquivo é igual ao registrado em host_changes
         new_host_entry = f'''
           host {host_name_clean} {{
                   hardware ethernet {mac_address};
 		          fixed-address {ip_address};
-		          }}
-		          # Data: {registration_date}'''
+		          # Data: {registration_date}
+		          }}'''
         
         # --- INÍCIO DA CORREÇÃO ---
-        # A correção consiste em ler o arquivo, remover a última chave '}' e
-        # inserir a nova entrada de host antes de reescrever a chave '}'.
-        
-        with open(DHCP_CONF_PATH, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        # Encontra a posição da última chave de fechamento '}' no arquivo
-        # Isso assume que a última '}' é a que fecha o bloco 'subnet'.
-        last_brace_index = content.rfind('}')
-        
-        if last_brace_index != -1:
-            # Divide o conteúdo em duas partes: antes e depois da última '}'
-            content_before_brace = content[:last_brace_index]
-            content_after_brace = content[last_brace_index:]
-            
-            # Remove a última chave '}' do conteúdo anterior
-            # O bloco de host deve ser inserido antes da chave de fechamento do subnet
-            new_content = content_before_brace.rstrip() + new_host_entry + '\n' + content_after_brace.lstrip()
-            
-            # Reescreve o arquivo com o novo conteúdo
-            with open(DHCP_CONF_PATH, 'w', encoding='utf-8') as f:
-                f.write(new_content)
-        else:
-            # Se não encontrou a chave, volta para a lógica de 'append' e registra o erro
-            with open(DHCP_CONF_PATH, 'a', encoding='utf-8') as f:
-                f.write(new_host_entry)
-            print(f"ERRO: Não foi encontrada a chave de fechamento '}}' no arquivo {DHCP_CONF_PATH}. Novo host adicionado ao final.")
+        # A correção consiste em inserir a nova entrada de host antes da última
+        # chave '}', removendo os espaços em branco que a antecedem.
+        
+        def insert_host(conf):
+            # Encontra a posição da última chave de fechamento '}' no arquivo
+            # Isso assume que a última '}' é a que fecha o bloco 'subnet'.
+            last_brace_index = conf.rfind(b'}')
+            if last_brace_index == -1:
+                # Se não encontrou a chave, volta para a lógica de 'append' e registra o erro
+                print(f"ERRO: Não foi encontrada a chave de fechamento '}}' no arquivo {dhcp_conf_path()}. Novo host adicionado ao final.")
+                return [(len(conf), len(conf), new_host_entry.encode('utf-8'))]
+            insert_at = last_brace_index
+            while insert_at > 0 and conf[insert_at - 1] in b' \t\n\r\x0b\x0c':
+                insert_at -= 1
+            # O bloco de host é inserido antes da chave de fechamento do subnet
+            return [(insert_at, last_brace_index, new_host_entry.encode('utf-8') + b'\n')]
+
+        # Verificar se o IP está dentro de alguma regra. O lock das regras é
+        # mantido até a gravação: a regra não é excluída nesse intervalo
+        with rule_store.locked(rules_path(), shared=True):
+            rule_index = host_inventory.get_rule_index(rules_path())
+            if rule_index.find(ip_to_int(ip_address)) < 0:
+                return jsonify({
+                    'message': f'O IP {ip_address} não pertence a nenhum range de regras definido',
+                    'success': False
+                }), 400
+
+            # Posições calculadas e gravação sob o mesmo lock (apply_edits)
+            with metrics.span('file_write'):
+                apply_edits(dhcp_conf_path(), insert_host)
         
         # --- FIM DA CORREÇÃO ---
         
+        host_inventory.invalidate(dhcp_conf_path())
+        host_changes.record_upsert(dhcp_conf_path(), HostRecord.from_strings(
+            host_name_clean, mac_address, ip_address, registration_date))
+        
         # Registrar log de auditoria
-        rule_name = find_rule_for_ip(ip_address, ip_rules)
+        rule_name = find_rule_for_ip(ip_address, rule_index)
         log_host_create(host_name_clean, mac_address, ip_address, rule_name)
         
         # Reiniciar serviço DHCP automaticamente
-        restart_info = restart_dhcp_service()
+        with metrics.span('restart'):
+            restart_info = restart_dhcp_service()
         if not restart_info['success']:
-            log_action(f"Aviso: Falha ao reiniciar o serviço DHCP após criação: {restart_info['message']}")
+            log_action('RESTART', 'CONFIG', 'dhcp_service', "Aviso: Falha ao reiniciar o serviço DHCP após criação.",
+                       status='FAILURE', error_message=restart_info['message'])
         
         return jsonify({
             'message': f'Host {host_name} registrado com sucesso!',
@@ -343,53 +472,32 @@ def register_ip():
 def delete_host(host_name):
     """Exclui um host do arquivo dhcpd.conf."""
     try:
+        host_changes.sync_with_file(dhcp_conf_path())
+
         # Obter dados do host antes de excluir para o log
-        hosts_data = parse_dhcp_conf(DHCP_CONF_PATH)
-        host_to_delete = None
-        for host in hosts_data:
-            if host['name'] == host_name:
-                host_to_delete = host
-                break
-        
-        with open(DHCP_CONF_PATH, 'r') as f:
-            lines = f.readlines()
-
-        new_lines = []
-        in_host_block = False
-        host_found = False
-        # Itera pelas linhas e recria o arquivo sem o bloco do host a ser excluído
-        for i, line in enumerate(lines):
-            # Encontra o início do bloco 'host'
-            if re.search(r'^\s*host\s+' + re.escape(host_name) + r'\s*\{', line):
-                in_host_block = True
-                host_found = True
-                continue
-
-            # Se estiver dentro do bloco 'host', verifica o fechamento
-            if in_host_block:
-                if re.search(r'^\s*\}', line) or re.search(r'^\s*\}\s*#\s*Data:', line):
-                    in_host_block = False
-                    continue
-                # Ignora as linhas dentro do bloco
-                continue
-
-            # Adiciona as linhas que não fazem parte do bloco a ser excluído
-            new_lines.append(line)
+        host_to_delete = host_inventory.get_hosts(dhcp_conf_path()).find(host_name)
+        
+        # Localiza e remove os blocos do host (da linha de abertura à linha
+        # com '}'), sob o mesmo lock
+        with metrics.span('file_write'):
+            blocks = apply_edits(dhcp_conf_path(), lambda conf: [
+                (start, end, b'') for start, end in find_host_blocks(conf, host_name)])
 
-        if host_found:
-            # Reescreve o arquivo com as linhas restantes
-            with open(DHCP_CONF_PATH, 'w') as f:
-                f.writelines(new_lines)
+        if blocks:
+            host_inventory.invalidate(dhcp_conf_path())
+            host_changes.record_delete(dhcp_conf_path(), host_name)
 
             # Registrar log de auditoria
             if host_to_delete:
-                rule_name = find_rule_for_ip(host_to_delete['ip_address'], parse_ip_ranges(IPS_SCRIPT_PATH))
-                log_host_delete(host_to_delete['name'], host_to_delete['mac_address'], host_to_delete['ip_address'])
+                rule_name = find_rule_for_ip(host_to_delete.ip_address, host_inventory.get_rule_index(rules_path()))
+                log_host_delete(host_to_delete.name, host_to_delete.mac_address, host_to_delete.ip_address)
             
             # Reiniciar serviço DHCP automaticamente
-            restart_info = restart_dhcp_service()
+            with metrics.span('restart'):
+                restart_info = restart_dhcp_service()
             if not restart_info['success']:
-                log_action(f"Aviso: Falha ao reiniciar o serviço DHCP após exclusão: {restart_info['message']}")
+                log_action('RESTART', 'CONFIG', 'dhcp_service', "Aviso: Falha ao reiniciar o serviço DHCP após exclusão.",
+                           status='FAILURE', error_message=restart_info['message'])
 
             return jsonify({
                 'message': f'Host {host_name} excluído com sucesso!',
@@ -442,97 +550,69 @@ def update_host(host_name):
                 'success': False
             }), 400
         
+        host_changes.sync_with_file(dhcp_conf_path())
+
         # Obter dados atuais do host
-        hosts_data = parse_dhcp_conf(DHCP_CONF_PATH)
-        host_to_update = None
-        for host in hosts_data:
-            if host['name'] == host_name:
-                host_to_update = host
-                break
-        
-        if not host_to_update:
+        hosts_data = host_inventory.get_hosts(dhcp_conf_path())
+        host_index = hosts_data.index(host_name)
+        
+        if host_index < 0:
             return jsonify({
                 'message': f'Host {host_name} não encontrado.',
                 'success': False
             }), 404
             
         # Verificar se o novo IP já está em uso por outro host
-        used_ips = get_used_ips(DHCP_CONF_PATH)
-        if new_ip_address in used_ips and new_ip_address != host_to_update['ip_address']:
+        host_to_update = hosts_data[host_index]
+        used_ips = host_inventory.get_used_ips(dhcp_conf_path())
+        if new_ip_address in used_ips and new_ip_address != host_to_update.ip_address:
             return jsonify({
                 'message': f'O IP {new_ip_address} já está em uso por outro host',
                 'success': False
             }), 400
             
         # Verificar se o novo MAC já está em uso por outro host
-        existing_macs = [host['mac_address'] for host in hosts_data if host['name'] != host_name]
-        if new_mac_address in existing_macs:
+        # Ocorrências do MAC além da do próprio host
+        new_mac = mac_to_int(new_mac_address)
+        if hosts_data.macs.count(new_mac) > (host_to_update.mac == new_mac):
             return jsonify({
                 'message': f'O endereço MAC {new_mac_address} já está cadastrado em outro host',
                 'success': False
             }), 400
             
-        # Verificar se o IP está dentro de alguma regra
-        ip_rules = parse_ip_ranges(IPS_SCRIPT_PATH)
-        is_ip_in_rule = False
-        for rule in ip_rules:
-            start_int = ip_to_int(rule["inicio"])
-            end_int = ip_to_int(rule["fim"])
-            ip_int = ip_to_int(new_ip_address)
-            if start_int <= ip_int <= end_int:
-                is_ip_in_rule = True
-                break
-        
-        if not is_ip_in_rule:
-            return jsonify({
-                'message': f'O IP {new_ip_address} não pertence a nenhum range de regras definido',
-                'success': False
-            }), 400
+        # Verificar se o IP está dentro de alguma regra. O lock das regras é
+        # mantido até a gravação: a regra não é excluída nesse intervalo
+        with rule_store.locked(rules_path(), shared=True):
+            rule_index = host_inventory.get_rule_index(rules_path())
+            if rule_index.find(ip_to_int(new_ip_address)) < 0:
+                return jsonify({
+                    'message': f'O IP {new_ip_address} não pertence a nenhum range de regras definido',
+                    'success': False
+                }), 400
+
+            # Realizar a atualização no arquivo: substitui MAC e IP dentro dos
+            # blocos do host
+            with metrics.span('file_write'):
+                apply_edits(dhcp_conf_path(), lambda conf: [
+                    (start, end, rewrite_host_block(conf[start:end], new_mac_address, new_ip_address))
+                    for start, end in find_host_blocks(conf, host_name)])
             
-        # Realizar a atualização no arquivo
-        with open(DHCP_CONF_PATH, 'r') as f:
-            lines = f.readlines()
-
-        new_lines = []
-        in_host_block = False
-        
-        for line in lines:
-            # Encontra o início do bloco 'host'
-            if re.search(r'^\s*host\s+' + re.escape(host_name) + r'\s*\{', line):
-                in_host_block = True
-                new_lines.append(line)
-                continue
-
-            # Se estiver dentro do bloco 'host', substitui MAC e IP
-            if in_host_block:
-                if re.search(r'hardware ethernet', line):
-                    new_lines.append(f'\t\t\t\thardware ethernet {new_mac_address};\n')
-                    continue
-                elif re.search(r'fixed-address', line):
-                    new_lines.append(f'\t\t\t\tfixed-address {new_ip_address};\n')
-                    continue
-                elif re.search(r'^\s*\}', line) or re.search(r'^\s*\}\s*#\s*Data:', line):
-                    in_host_block = False
-                    new_lines.append(line)
-                    continue
-
-            # Adiciona as linhas que não fazem parte do bloco a ser atualizado
-            new_lines.append(line)
-
-        # Reescreve o arquivo com as linhas atualizadas
-        with open(DHCP_CONF_PATH, 'w') as f:
-            f.writelines(new_lines)
+        host_inventory.invalidate(dhcp_conf_path())
+        host_changes.record_upsert(dhcp_conf_path(), host_to_update.replace(
+            ip=ip_to_int(new_ip_address), mac=mac_to_int(new_mac_address)))
             
         # Registrar log de auditoria
-        rule_name = find_rule_for_ip(new_ip_address, ip_rules)
+        rule_name = find_rule_for_ip(new_ip_address, rule_index)
         log_host_update(host_name, 
-            {'mac_address': host_to_update['mac_address'], 'ip_address': host_to_update['ip_address'], 'rule_name': find_rule_for_ip(host_to_update['ip_address'], ip_rules)}, 
+            {'mac_address': host_to_update.mac_address, 'ip_address': host_to_update.ip_address, 'rule_name': find_rule_for_ip(host_to_update.ip_address, rule_index)}, 
             {'mac_address': new_mac_address, 'ip_address': new_ip_address, 'rule_name': rule_name})
         
         # Reiniciar serviço DHCP automaticamente
-        restart_info = restart_dhcp_service()
+        with metrics.span('restart'):
+            restart_info = restart_dhcp_service()
         if not restart_info['success']:
-            log_action(f"Aviso: Falha ao reiniciar o serviço DHCP após atualização: {restart_info['message']}")
+            log_action('RESTART', 'CONFIG', 'dhcp_service', "Aviso: Falha ao reiniciar o serviço DHCP após atualização.",
+                       status='FAILURE', error_message=restart_info['message'])
 
         return jsonify({
             'message': f'Host {host_name} atualizado com sucesso!',
@@ -574,45 +654,50 @@ def update_host_name(host_name):
         
         new_host_name_clean = new_host_name.replace(' ', '_').replace('-', '_')
         
+        host_changes.sync_with_file(dhcp_conf_path())
+
         # Verificar se o novo nome do host já existe
-        hosts_data = parse_dhcp_conf(DHCP_CONF_PATH)
-        existing_names = [host['name'] for host in hosts_data if host['name'] != host_name]
-        if new_host_name_clean in existing_names:
+        hosts_data = host_inventory.get_hosts(dhcp_conf_path())
+        if new_host_name_clean != host_name and new_host_name_clean in hosts_data.names:
             return jsonify({
                 'message': f'O novo nome do host {new_host_name} já está em uso',
                 'success': False
             }), 400
             
-        # Realizar a atualização no arquivo
-        with open(DHCP_CONF_PATH, 'r') as f:
-            content = f.read()
-
         # Regex para encontrar e substituir o nome do host
         # Procura por 'host NOME_ANTIGO {' e substitui por 'host NOVO_NOME {'
-        pattern = r'(\s*host\s+)' + re.escape(host_name) + r'(\s*\{)'
-        new_content = re.sub(pattern, r'\1' + new_host_name_clean + r'\2', content)
-
-        # Se a substituição ocorreu (ou seja, o host foi encontrado)
-        if new_content != content:
-            with open(DHCP_CONF_PATH, 'w') as f:
-                f.write(new_content)
+        pattern = re.compile(rb'(\s*host\s+)' + re.escape(host_name.encode('utf-8')) + rb'(\s*\{)')
+        def rename_host(conf):
+            if new_host_name_clean == host_name:
+                return []
+            return [(match.end(1), match.start(2), new_host_name_clean.encode('utf-8'))
+                    for match in pattern.finditer(conf)]
+
+        # Se a substituição altera o arquivo (ou seja, o host foi encontrado
+        # e o nome é diferente)
+        with metrics.span('file_write'):
+            edits = apply_edits(dhcp_conf_path(), rename_host)
+        if edits:
+            host_inventory.invalidate(dhcp_conf_path())
                 
             # Obter dados do host antes de atualizar para o log
-            host_to_update = None
-            for host in hosts_data:
-                if host['name'] == host_name:
-                    host_to_update = host
-                    break
+            host_to_update = hosts_data.find(host_name)
+                    
+            host_changes.record_delete(dhcp_conf_path(), host_name)
+            if host_to_update:
+                host_changes.record_upsert(dhcp_conf_path(), host_to_update.replace(name=new_host_name_clean))
                     
             # Registrar log de auditoria
             if host_to_update:
-                rule_name = find_rule_for_ip(host_to_update['ip_address'], parse_ip_ranges(IPS_SCRIPT_PATH))
-                log_action(f"Renomeou host de '{host_name}' para '{new_host_name_clean}' (MAC: {host_to_update['mac_address']}, IP: {host_to_update['ip_address']}, Regra: {rule_name})")
+                rule_name = find_rule_for_ip(host_to_update.ip_address, host_inventory.get_rule_index(rules_path()))
+                log_host_rename(host_name, new_host_name_clean, host_to_update.mac_address, host_to_update.ip_address, rule_name)
             
             # Reiniciar serviço DHCP automaticamente
-            restart_info = restart_dhcp_service()
+            with metrics.span('restart'):
+                restart_info = restart_dhcp_service()
             if not restart_info['success']:
-                log_action(f"Aviso: Falha ao reiniciar o serviço DHCP após renomear: {restart_info['message']}")
+                log_action('RESTART', 'CONFIG', 'dhcp_service', "Aviso: Falha ao reiniciar o serviço DHCP após renomear.",
+                           status='FAILURE', error_message=restart_info['message'])
 
             return jsonify({
                 'message': f'Nome do host atualizado para {new_host_name} com sucesso!',
@@ -0,0 +1,94 @@
+import os
+import re
+from datetime import datetime
+
+from flask import Blueprint, request, jsonify
+
+from flask_login import login_required
+
+from src.routes.dhcp import dhcp_conf_path
+from src.utils import host_inventory
+from src.utils.host_diff import diff_hosts
+
+diff_bp = Blueprint('diff', __name__)
+
+
+# Sufixos de cópias do dhcpd.conf aceitos como versões: .bak, _old, .old,
+# _bck ou .backup, opcionalmente seguidos de data (AAAAMMDD[_HHMM[SS]]) ou de
+# um número. Arquivos de swap de editores e temporários ficam de fora.
+VERSION_SUFFIX_RE = re.compile(r'(?:[._](?:bak|old|bck|backup))?(?:[._-]\d{8}(?:[_-]?\d{4,6})?|\.\d{1,3})?')
+
+
+def config_versions():
+    """
+    Versões do dhcpd.conf disponíveis para comparação: o próprio arquivo e
+    as cópias no mesmo diretório com um dos sufixos de VERSION_SUFFIX_RE
+    (ex.: dhcpd.conf.bak, dhcpd.conf_old, dhcpd.conf.bak.20251028_1530).
+
+    Returns:
+        dict nome -> caminho
+    """
+    directory, base_name = os.path.split(dhcp_conf_path())
+    versions = {}
+    for entry in os.scandir(directory or '.'):
+        if (entry.name.startswith(base_name)
+                and VERSION_SUFFIX_RE.fullmatch(entry.name, len(base_name))
+                and entry.is_file()):
+            versions[entry.name] = entry.path
+    return versions
+
+
+@diff_bp.route('/config-versions', methods=['GET'])
+@login_required
+def list_config_versions():
+    """Lista as versões do dhcpd.conf que podem ser comparadas em /diff."""
+    try:
+        versions = []
+        for name, path in sorted(config_versions().items()):
+            st = os.stat(path)
+            versions.append({
+                'name': name,
+                'size': st.st_size,
+                'modified': datetime.fromtimestamp(st.st_mtime).isoformat(timespec='seconds'),
+                'current': path == dhcp_conf_path()
+            })
+        return jsonify(versions)
+    except Exception as e:
+        return jsonify({
+            'message': f'Erro ao listar versões: {str(e)}',
+            'success': False
+        }), 500
+
+
+@diff_bp.route('/diff', methods=['GET'])
+@login_required
+def get_diff():
+    """
+    Compara os hosts de duas versões do dhcpd.conf.
+
+    Query parameters:
+        - from: versão antiga (nome listado em /config-versions)
+        - to: versão nova (padrão: o dhcpd.conf atual)
+        - summary: true para retornar apenas as quantidades por categoria
+    """
+    try:
+        versions = config_versions()
+        old_name = request.args.get('from', '')
+        new_name = request.args.get('to') or os.path.basename(dhcp_conf_path())
+        for name in (old_name, new_name):
+            if name not in versions:
+                return jsonify({
+                    'message': f'Versão não encontrada: {name}' if name else 'O parâmetro from é obrigatório',
+                    'success': False
+                }), 404 if name else 400
+
+        result = diff_hosts(host_inventory.get_hosts(versions[old_name]),
+                            host_inventory.get_hosts(versions[new_name]))
+        if request.args.get('summary', '').lower() in ('1', 'true'):
+            return jsonify({'from': old_name, 'to': new_name, 'summary': result.summary()})
+        return jsonify({'from': old_name, 'to': new_name, **result.to_dict()})
+    except Exception as e:
+        return jsonify({
+            'message': f'Erro ao comparar versões: {str(e)}',
+            'success': False
+        }), 500
@@ -0,0 +1,38 @@
+import hmac
+
+from flask import Blueprint, Response, current_app, request
+
+from src.utils.audit_writer import audit_writer
+from src.utils.login_throttle import login_throttle
+from src.utils.metrics import metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+def register_app_gauges():
+    """Registra as métricas lidas de outros componentes no momento da coleta."""
+    metrics.register_gauge('audit_queue_depth', 'Logs de auditoria aguardando gravação.',
+                           audit_writer.pending)
+    metrics.register_gauge(
+        'login_attempts_total', 'Tentativas de login, por resultado do limitador.',
+        lambda: {key: value for key, value in login_throttle.stats().items() if key != 'tracked_keys'},
+        kind='counter')
+    metrics.register_gauge('login_throttle_tracked_keys', 'Chaves (IPs e usuários) no limitador de login.',
+                           lambda: login_throttle.stats()['tracked_keys'])
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Retorna as métricas no formato texto do Prometheus.
+
+    Se METRICS_TOKEN estiver configurado, exige o cabeçalho
+    "Authorization: Bearer <token>" (bearer_token no scrape_config).
+    """
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        provided = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(provided, f'Bearer {token}'):
+            return Response('Não autorizado\n', status=401, mimetype='text/plain')
+
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
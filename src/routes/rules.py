@@ -0,0 +1,149 @@
+from flask import Blueprint, request, jsonify
+
+from flask_login import login_required
+
+from src.routes.dhcp import dhcp_conf_path, rules_path
+from src.utils import host_inventory, rule_store
+from src.utils.audit import log_rule_change
+
+rules_bp = Blueprint('rules', __name__)
+
+
+def conf_subnets():
+    """Subnets do dhcpd.conf para validar as regras ([] se o arquivo não puder ser lido)."""
+    try:
+        return host_inventory.get_subnets(dhcp_conf_path())
+    except OSError:
+        return []
+
+
+def rule_error_response(e):
+    """Resposta de erro para as exceções de rule_store."""
+    body = {'message': str(e), 'success': False}
+    if isinstance(e, rule_store.RuleNotFound):
+        return jsonify(body), 404
+    if isinstance(e, rule_store.RuleConflict):
+        body['conflicts'] = e.conflicts
+        return jsonify(body), 409
+    if isinstance(e, rule_store.RuleInUse):
+        body['hosts'] = e.hosts
+        return jsonify(body), 409
+    return jsonify(body), 400
+
+
+@rules_bp.route('/rules', methods=['GET'])
+@login_required
+def get_rules():
+    """Retorna todas as regras de IP disponíveis."""
+    try:
+        ip_rules = host_inventory.get_rules(rules_path())
+        return jsonify(ip_rules)
+    except Exception as e:
+        return jsonify({
+            'message': f'Erro ao carregar regras: {str(e)}',
+            'success': False
+        }), 500
+
+
+@rules_bp.route('/rules/<int:rule_id>', methods=['GET'])
+@login_required
+def get_rule(rule_id):
+    """Retorna uma regra de IP."""
+    try:
+        for rule in host_inventory.get_rules(rules_path()):
+            if rule['id'] == rule_id:
+                return jsonify(rule)
+        return jsonify({
+            'message': f'Regra {rule_id} não encontrada',
+            'success': False
+        }), 404
+    except Exception as e:
+        return jsonify({
+            'message': f'Erro ao carregar regra: {str(e)}',
+            'success': False
+        }), 500
+
+
+@rules_bp.route('/rules', methods=['POST'])
+@login_required
+def create_rule():
+    """
+    Cadastra uma regra de IP.
+
+    Corpo JSON: categoria, acesso, inicio e fim. O range deve estar contido
+    em uma subnet do dhcpd.conf e não pode se sobrepor a outra regra (409).
+    """
+    try:
+        data = request.get_json(silent=True)
+        rule = rule_store.create_rule(rules_path(), data, conf_subnets())
+        host_inventory.invalidate(rules_path())
+        log_rule_change('CREATE', rule)
+        return jsonify({
+            'message': f'Regra {rule_store.rule_label(rule)} cadastrada com sucesso!',
+            'success': True,
+            'data': rule
+        }), 201
+    except rule_store.RuleError as e:
+        return rule_error_response(e)
+    except Exception as e:
+        return jsonify({
+            'message': f'Erro interno do servidor: {str(e)}',
+            'success': False
+        }), 500
+
+
+@rules_bp.route('/rules/<int:rule_id>', methods=['PUT'])
+@login_required
+def update_rule(rule_id):
+    """Altera uma regra de IP. Campos ausentes no corpo JSON mantêm o valor atual."""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            raise rule_store.RuleError('Dados JSON são obrigatórios')
+        old_rule, rule = rule_store.update_rule(rules_path(), rule_id, data, conf_subnets())
+        host_inventory.invalidate(rules_path())
+        log_rule_change('UPDATE', rule, old_rule)
+        return jsonify({
+            'message': f'Regra {rule_store.rule_label(rule)} atualizada com sucesso!',
+            'success': True,
+            'data': rule
+        })
+    except rule_store.RuleError as e:
+        return rule_error_response(e)
+    except Exception as e:
+        return jsonify({
+            'message': f'Erro interno do servidor: {str(e)}',
+            'success': False
+        }), 500
+
+
+@rules_bp.route('/rules/<int:rule_id>', methods=['DELETE'])
+@login_required
+def delete_rule(rule_id):
+    """
+    Exclui uma regra de IP. Se houver hosts com IP no range, a exclusão é
+    recusada (409), a menos que a query string tenha force=true.
+    """
+    try:
+        force = request.args.get('force', '').lower() in ('1', 'true')
+
+        def count_hosts(start, end):
+            return sum(1 for ip in host_inventory.get_hosts(dhcp_conf_path()).ips if start <= ip <= end)
+
+        # A contagem é feita com o lock das regras, que o cadastro de hosts
+        # também mantém: nenhum host entra no range antes da exclusão
+        rule = rule_store.delete_rule(rules_path(), rule_id, None if force else count_hosts)
+        host_inventory.invalidate(rules_path())
+        log_rule_change('DELETE', rule)
+        return jsonify({
+            'message': f'Regra {rule_store.rule_label(rule)} excluída com sucesso!',
+            'success': True,
+            'data': rule
+        })
+    except rule_store.RuleError as e:
+        return rule_error_response(e)
+    except Exception as e:
+        return jsonify({
+            'message': f'Erro interno do servidor: {str(e)}',
+            'success': False
+        }), 500
@@ -1,8 +1,10 @@
 import json
+from datetime import datetime
 from functools import wraps
 from flask import request
 from flask_login import current_user
 from src.models.audit_log import AuditLog
+from src.utils.audit_writer import audit_writer
 
 def get_client_ip():
     """Obtém o endereço IP do cliente."""
@@ -43,18 +45,20 @@ def log_action(action, resource_type, resource_name=None, details=None, status='
         # Obter IP do cliente
         ip_address = get_client_ip()
         
-        # Criar log
-        AuditLog.create_log(
-            username=username,
-            action=action,
-            resource_type=resource_type,
-            resource_name=resource_name,
-            details=details_json,
-            ip_address=ip_address,
-            status=status,
-            error_message=error_message,
-            user_id=user_id
-        )
+        # Enfileirar log (gravado em lote pelo audit_writer)
+        audit_writer.submit({
+            'timestamp': datetime.utcnow(),
+            'username': username,
+            'action': action,
+            'resource_type': resource_type,
+            'resource_name': resource_name,
+            'details': details_json,
+            'ip_address': ip_address,
+            'status': status,
+            'error_message': error_message,
+            'user_id': user_id,
+            **AuditLog.host_columns(resource_type, resource_name, details)
+        })
     except Exception as e:
         # Em caso de erro ao registrar log, apenas imprimir (não deve interromper a operação)
         print(f"Erro ao registrar log de auditoria: {str(e)}")
@@ -128,6 +132,17 @@ def log_host_update(host_name, old_data, new_data):
     
     log_action('UPDATE', 'HOST', host_name, details)
 
+def log_host_rename(old_name, new_name, mac_address, ip_address, rule_name):
+    """Registra renomeação de host."""
+    details = {
+        'old_name': old_name,
+        'new_name': new_name,
+        'mac_address': mac_address,
+        'ip_address': ip_address,
+        'rule_name': rule_name
+    }
+    log_action('UPDATE', 'HOST', new_name, details)
+
 def log_host_delete(host_name, mac_address, ip_address):
     """Registra exclusão de host."""
     details = {
@@ -137,6 +152,13 @@ def log_host_delete(host_name, mac_address, ip_address):
     }
     log_action('DELETE', 'HOST', host_name, details)
 
+def log_rule_change(action, rule, old_rule=None):
+    """Registra criação, alteração ou exclusão de regra de IP."""
+    details = {'rule': rule}
+    if old_rule is not None:
+        details['old_rule'] = old_rule
+    log_action(action, 'CONFIG', f"ip_rule_{rule['id']}", details)
+
 def log_user_login(username, success=True):
     """Registra tentativa de login."""
     log_action(
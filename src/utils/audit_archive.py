@@ -0,0 +1,277 @@
+"""
+Retenção dos logs de auditoria.
+
+Logs mais antigos que AUDIT_RETENTION_DAYS são movidos de audit_logs para
+arquivos mensais compactados (AUDIT_ARCHIVE_DIR/audit-AAAA-MM.jsonl.gz, uma
+linha JSON por log no formato de AuditLog.to_dict()) e a tabela é compactada
+com VACUUM. As consultas de /api/audit/logs com datas antigas leem esses
+arquivos de forma transparente.
+
+Os contadores de audit_log_rollups são decrementados na mesma transação que
+remove os logs: /api/audit/logs/stats considera apenas os logs do banco. As
+quantidades de logs arquivados vêm de archived_counts, calculadas uma vez
+por arquivo mensal e mantidas em cache enquanto o arquivo não muda.
+
+Uso (a partir da raiz do projeto, por exemplo via cron):
+    python -m src.utils.audit_archive [--days N] [--no-vacuum]
+"""
+import gzip
+import json
+import os
+import re
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from src.models.audit_log import AuditLog, AuditLogRollup
+
+ARCHIVE_FILE_RE = re.compile(r'^audit-(\d{4})-(\d{2})\.jsonl\.gz$')
+BATCH_SIZE = 5000
+
+# archived_counts: caminho -> ((mtime, tamanho), Counter)
+_counts_lock = threading.Lock()
+_counts_cache = {}
+
+
+def archive_path(archive_dir, year, month):
+    """Caminho do arquivo de um mês."""
+    return os.path.join(archive_dir, f'audit-{year:04d}-{month:02d}.jsonl.gz')
+
+
+def archive_old_logs(engine, archive_dir, max_age_days, vacuum=True):
+    """
+    Move os logs mais antigos que max_age_days para os arquivos mensais.
+
+    Cada lote é gravado (e sincronizado em disco) no arquivo antes de ser
+    removido do banco. Se o processo for interrompido entre as duas etapas, o
+    lote aparece duplicado no arquivo; a leitura descarta ids repetidos.
+
+    Returns:
+        int: Quantidade de logs arquivados
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+    table = AuditLog.__table__
+    archived = 0
+
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                table.select()
+                .where(table.c.timestamp < cutoff)
+                .order_by(table.c.id)
+                .limit(BATCH_SIZE)
+            ).mappings().all()
+            if not rows:
+                break
+
+            by_month = {}
+            for row in rows:
+                by_month.setdefault((row['timestamp'].year, row['timestamp'].month), []).append(row)
+
+            for (year, month), month_rows in by_month.items():
+                path = archive_path(archive_dir, year, month)
+                with gzip.open(path, 'at', encoding='utf-8') as f:
+                    for row in month_rows:
+                        f.write(json.dumps(row_to_dict(row), ensure_ascii=False) + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            AuditLogRollup.decrement(conn, rows)
+            conn.execute(table.delete().where(table.c.id.in_([row['id'] for row in rows])))
+            archived += len(rows)
+
+    if archived and vacuum:
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.execute(text('VACUUM'))
+
+    return archived
+
+
+def row_to_dict(row):
+    """Converte uma linha de audit_logs para o formato de AuditLog.to_dict()."""
+    data = {column.name: row[column.name] for column in AuditLog.__table__.columns}
+    data['timestamp'] = row['timestamp'].isoformat() if row['timestamp'] else None
+    return data
+
+
+def archived_months(archive_dir, start_dt=None, end_dt=None):
+    """
+    Lista os meses arquivados que intersectam o intervalo [start_dt, end_dt),
+    do mais recente para o mais antigo.
+
+    Returns:
+        Lista de tuplas (ano, mês)
+    """
+    if not archive_dir or not os.path.isdir(archive_dir):
+        return []
+
+    months = []
+    for name in os.listdir(archive_dir):
+        match = ARCHIVE_FILE_RE.match(name)
+        if not match:
+            continue
+        year, month = int(match.group(1)), int(match.group(2))
+        month_start = datetime(year, month, 1)
+        month_end = datetime(year + month // 12, month % 12 + 1, 1)
+        if start_dt and month_end <= start_dt:
+            continue
+        if end_dt and month_start >= end_dt:
+            continue
+        months.append((year, month))
+    return sorted(months, reverse=True)
+
+
+def row_matches(row, filters):
+    """Aplica a um log arquivado os mesmos filtros de /api/audit/logs."""
+    if filters.get('action') and row['action'] != filters['action']:
+        return False
+    if filters.get('resource_type') and row['resource_type'] != filters['resource_type']:
+        return False
+    if filters.get('status') and row['status'] != filters['status']:
+        return False
+    if filters.get('username') and filters['username'].lower() not in (row['username'] or '').lower():
+        return False
+    if filters.get('q'):
+        haystack = ' '.join(
+            row.get(field) or '' for field in ('username', 'resource_name', 'details')
+        ).lower()
+        if not all(term.lower() in haystack for term in filters['q'].split()):
+            return False
+    if filters.get('start_dt') and row['_timestamp'] < filters['start_dt']:
+        return False
+    if filters.get('end_dt') and row['_timestamp'] >= filters['end_dt']:
+        return False
+    return True
+
+
+def archived_counts(archive_dir, year, month):
+    """
+    Quantidade de logs de um arquivo mensal por (dia, ação, recurso, status,
+    usuário), como em audit_log_rollups. Ids repetidos contam uma vez.
+
+    Returns:
+        Counter (somente leitura)
+    """
+    path = archive_path(archive_dir, year, month)
+    st = os.stat(path)
+    signature = (st.st_mtime_ns, st.st_size)
+    with _counts_lock:
+        entry = _counts_cache.get(path)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+
+    keys = {}
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            row = json.loads(line)
+            keys[row['id']] = (row['timestamp'][:10], row['action'], row['resource_type'],
+                               row['status'], row['username'])
+    counts = Counter(keys.values())
+    with _counts_lock:
+        _counts_cache[path] = (signature, counts)
+    return counts
+
+
+def _month_count(archive_dir, year, month, filters):
+    # Datas dos filtros são sempre dias inteiros: o filtro por dia é exato
+    start = filters.get('start_dt').date().isoformat() if filters.get('start_dt') else None
+    end = filters.get('end_dt').date().isoformat() if filters.get('end_dt') else None
+    username = filters['username'].lower() if filters.get('username') else None
+    total = 0
+    for (day, action, resource_type, status, user), count in archived_counts(archive_dir, year, month).items():
+        if filters.get('action') and action != filters['action']:
+            continue
+        if filters.get('resource_type') and resource_type != filters['resource_type']:
+            continue
+        if filters.get('status') and status != filters['status']:
+            continue
+        if username and username not in (user or '').lower():
+            continue
+        if (start and day < start) or (end and day >= end):
+            continue
+        total += count
+    return total
+
+
+def count_archived_logs(archive_dir, filters):
+    """
+    Quantidade de logs arquivados que atendem aos filtros, pelos contadores de
+    archived_counts (sem decodificar os logs a cada chamada).
+
+    Returns:
+        int, ou None com busca textual (q), que não pode ser contada assim
+    """
+    if filters.get('q'):
+        return None
+    return sum(_month_count(archive_dir, year, month, filters)
+               for year, month in archived_months(archive_dir, filters.get('start_dt'), filters.get('end_dt')))
+
+
+def iter_archived_logs(archive_dir, filters, before=None, skip=0):
+    """
+    Percorre os logs arquivados que atendem aos filtros, do mais recente para o
+    mais antigo (ordem de timestamp e id, como em /api/audit/logs).
+
+    Args:
+        archive_dir: Diretório dos arquivos mensais
+        filters: dict retornado por parse_log_filters
+        before: Tupla (timestamp, id) opcional; só retorna logs anteriores a ela
+        skip: Quantidade de logs a pular (paginação por offset). Sem busca
+            textual, meses inteiros são pulados pelos contadores, sem ser lidos
+
+    Yields:
+        dict no formato de AuditLog.to_dict()
+    """
+    for year, month in archived_months(archive_dir, filters.get('start_dt'), filters.get('end_dt')):
+        if before and datetime(year, month, 1) > before[0]:
+            continue
+        if skip and not before and not filters.get('q'):
+            month_total = _month_count(archive_dir, year, month, filters)
+            if month_total <= skip:
+                skip -= month_total
+                continue
+
+        rows = {}
+        with gzip.open(archive_path(archive_dir, year, month), 'rt', encoding='utf-8') as f:
+            for line in f:
+                row = json.loads(line)
+                row['_timestamp'] = datetime.fromisoformat(row['timestamp'])
+                if before and (row['_timestamp'], row['id']) >= before:
+                    continue
+                if row_matches(row, filters):
+                    rows[row['id']] = row
+
+        for row in sorted(rows.values(), key=lambda r: (r['_timestamp'], r['id']), reverse=True):
+            if skip:
+                skip -= 1
+                continue
+            del row['_timestamp']
+            yield row
+
+
+def main():
+    import argparse
+    from src.main import create_cli_app, init_database
+    from src.models.user import db
+
+    parser = argparse.ArgumentParser(description='Arquiva logs de auditoria antigos.')
+    parser.add_argument('--days', type=int, default=None,
+                        help='Idade máxima, em dias, dos logs mantidos no banco '
+                             '(padrão: AUDIT_RETENTION_DAYS)')
+    parser.add_argument('--no-vacuum', action='store_true', help='Não executar VACUUM ao final')
+    args = parser.parse_args()
+
+    app = create_cli_app()
+    init_database(app)
+    days = args.days if args.days is not None else app.config['AUDIT_RETENTION_DAYS']
+    with app.app_context():
+        archived = archive_old_logs(db.engine, app.config['AUDIT_ARCHIVE_DIR'], days,
+                                    vacuum=not args.no_vacuum)
+    print(f"✅ {archived} log(s) com mais de {days} dia(s) arquivado(s) em {app.config['AUDIT_ARCHIVE_DIR']}")
+
+
+if __name__ == '__main__':
+    main()
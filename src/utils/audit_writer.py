@@ -0,0 +1,166 @@
+import atexit
+import os
+import queue
+import threading
+
+from src.models.user import db
+from src.models.audit_log import AuditLog, AuditLogRollup
+from src.utils.metrics import metrics
+
+_STOP = object()
+
+
+class AuditWriter:
+    """
+    Grava os logs de auditoria fora do caminho da requisição.
+
+    Os eventos são colocados em uma fila limitada e uma thread em segundo plano
+    os grava em lote, com um único INSERT (executemany) por transação, na qual
+    também são atualizados os contadores de audit_log_rollups. No modo
+    síncrono (AUDIT_SYNC ou app.testing) cada evento é gravado imediatamente.
+
+    Configuração:
+        - AUDIT_SYNC: Grava de forma síncrona (padrão: False)
+        - AUDIT_QUEUE_SIZE: Tamanho máximo da fila (padrão: 10000)
+        - AUDIT_BATCH_SIZE: Máximo de eventos por transação (padrão: 500)
+        - AUDIT_FLUSH_INTERVAL: Tempo, em segundos, de cada espera da thread
+          de gravação pela fila quando ociosa (padrão: 0.5). Não atrasa a
+          gravação: ao chegar um evento, o lote é gravado na hora com os
+          eventos que já estiverem na fila (até AUDIT_BATCH_SIZE)
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.synchronous = True
+        self.queue_size = 10000
+        self.batch_size = 500
+        self.flush_interval = 0.5
+        self._engine = None
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('AUDIT_SYNC', False)
+        app.config.setdefault('AUDIT_QUEUE_SIZE', 10000)
+        app.config.setdefault('AUDIT_BATCH_SIZE', 500)
+        app.config.setdefault('AUDIT_FLUSH_INTERVAL', 0.5)
+
+        self.app = app
+        self.synchronous = bool(app.config['AUDIT_SYNC'] or app.testing)
+        self.queue_size = app.config['AUDIT_QUEUE_SIZE']
+        self.batch_size = app.config['AUDIT_BATCH_SIZE']
+        self.flush_interval = app.config['AUDIT_FLUSH_INTERVAL']
+        self._engine = None
+
+        app.extensions['audit_writer'] = self
+        atexit.register(self.close)
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            with self.app.app_context():
+                self._engine = db.engine
+        return self._engine
+
+    def submit(self, row):
+        """
+        Enfileira um evento de auditoria.
+
+        Args:
+            row: Dicionário com os valores das colunas de audit_logs
+        """
+        if self.synchronous:
+            self.write_batch([row])
+            return
+
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            # Fila cheia: grava na própria requisição em vez de descartar o evento
+            self.write_batch([row])
+
+    def write_batch(self, rows):
+        """Grava uma lista de eventos em uma única transação."""
+        if not rows:
+            return
+        try:
+            with metrics.span('audit_flush'), self.engine.begin() as conn:
+                conn.execute(AuditLog.__table__.insert(), rows)
+                AuditLogRollup.increment(conn, rows)
+        except Exception as e:
+            print(f"Erro ao gravar lote de {len(rows)} log(s) de auditoria: {str(e)}")
+
+    def flush(self):
+        """Bloqueia até que todos os eventos enfileirados tenham sido gravados."""
+        if self._queue is not None and self._pid == os.getpid():
+            self._queue.join()
+
+    def close(self):
+        """Grava os eventos pendentes e encerra a thread de gravação."""
+        with self._lock:
+            thread = self._thread
+            if thread is None or self._pid != os.getpid():
+                return
+            self._queue.put(_STOP)
+            self._thread = None
+        thread.join()
+
+    def pending(self):
+        """Retorna a quantidade de eventos aguardando gravação."""
+        if self._queue is None or self._pid != os.getpid():
+            return 0
+        return self._queue.qsize()
+
+    def _ensure_thread(self):
+        # Após um fork (gunicorn --preload) a thread do processo pai não existe
+        # no filho, então fila e thread são recriadas por processo.
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        q = self._queue
+        running = True
+        while running:
+            try:
+                item = q.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            items = [item]
+            while len(items) < self.batch_size:
+                try:
+                    items.append(q.get_nowait())
+                except queue.Empty:
+                    break
+
+            rows = [row for row in items if row is not _STOP]
+            running = len(rows) == len(items)
+            self.write_batch(rows)
+            for _ in items:
+                q.task_done()
+
+        # Eventos que chegaram depois do sinal de parada
+        remaining = []
+        while True:
+            try:
+                remaining.append(q.get_nowait())
+            except queue.Empty:
+                break
+        self.write_batch(remaining)
+        for _ in remaining:
+            q.task_done()
+
+
+audit_writer = AuditWriter()
@@ -0,0 +1,84 @@
+import gzip
+import zlib
+
+from flask import request
+
+# Tipos de conteúdo comprimidos. Arquivos estáticos não entram aqui: já são
+# servidos pré-comprimidos (ver src/utils/static_assets.py).
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'text/csv', 'text/plain', 'application/x-ndjson',
+}
+
+
+class Compression:
+    """
+    Comprime com gzip ou deflate, conforme o Accept-Encoding do cliente, as
+    respostas da API acima de um tamanho mínimo.
+
+    Não são comprimidas respostas em streaming (como /api/audit/export),
+    respostas que já têm Content-Encoding, respostas parciais e as que não
+    têm corpo.
+
+    Configuração:
+        - COMPRESS_ENABLED: Liga a compressão (padrão: True)
+        - COMPRESS_MIN_SIZE: Tamanho mínimo do corpo, em bytes (padrão: 1024)
+        - COMPRESS_LEVEL: Nível de compressão, de 1 a 9 (padrão: 6)
+    """
+
+    def __init__(self, app=None):
+        self.min_size = 1024
+        self.level = 6
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('COMPRESS_ENABLED', True)
+        app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+        app.config.setdefault('COMPRESS_LEVEL', 6)
+
+        self.min_size = app.config['COMPRESS_MIN_SIZE']
+        self.level = app.config['COMPRESS_LEVEL']
+        if app.config['COMPRESS_ENABLED']:
+            app.after_request(self.compress_response)
+        app.extensions['compression'] = self
+
+    def choose_encoding(self):
+        """Retorna 'gzip', 'deflate' ou None, pela preferência do cliente."""
+        gzip_quality = request.accept_encodings['gzip']
+        deflate_quality = request.accept_encodings['deflate']
+        if not gzip_quality and not deflate_quality:
+            return None
+        return 'gzip' if gzip_quality >= deflate_quality else 'deflate'
+
+    def compress_response(self, response):
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        if response.content_length is not None and response.content_length < self.min_size:
+            return response
+        encoding = self.choose_encoding()
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+        if encoding == 'gzip':
+            compressed = gzip.compress(data, compresslevel=self.level, mtime=0)
+        else:
+            # "deflate" no HTTP é o formato zlib (RFC 9110, seção 8.4.1.2)
+            compressed = zlib.compress(data, self.level)
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f'{etag}-{encoding}', weak)
+        return response
+
+
+compression = Compression()
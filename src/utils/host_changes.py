@@ -0,0 +1,272 @@
+import os
+import sqlite3
+import threading
+import time
+
+from dhcp_parser import HostRecord
+from src.utils import host_inventory
+
+# Quantidade máxima de alterações mantidas no log. Clientes com uma versão
+# mais antiga que a janela retida recebem o inventário completo.
+MAX_CHANGES = 5000
+
+# O log de alterações fica em um arquivo SQLite próprio (HOST_CHANGES_DB),
+# compartilhado entre os workers: a versão é o rowid da última alteração, a
+# mesma em todos os processos. Cada escrita é uma transação IMMEDIATE, o que
+# serializa os processos.
+#
+# Tabela meta:
+#   - signature: assinatura do dhcpd.conf cujo conteúdo o log já descreve
+#   - floor: versão do último 'reset'. As anteriores não são cobertas pelo
+#     log (o processo que detectou a alteração não conhecia o estado anterior
+#     do arquivo) e recebem o inventário completo
+#
+# Cada processo mantém os hosts no estado da versão _applied, para calcular a
+# diferença quando o arquivo muda; antes disso aplica as alterações gravadas
+# pelos outros workers.
+_lock = threading.Lock()
+_local = threading.local()
+_db_path = None
+_hosts = None
+_applied = None
+_signature = None
+
+
+def init_app(app):
+    app.config.setdefault('HOST_CHANGES_DB', os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), 'database', 'host_changes.db'))
+    configure(app.config['HOST_CHANGES_DB'])
+
+
+def configure(db_path):
+    """Define o arquivo do log de alterações (o banco só é aberto no primeiro uso)."""
+    global _db_path, _hosts, _applied, _signature
+    with _lock:
+        if db_path != _db_path:
+            _db_path = db_path
+            _hosts = _applied = _signature = None
+
+
+def _file_signature(file_path):
+    """Retorna uma assinatura barata (mtime, tamanho, inode) do arquivo."""
+    st = os.stat(file_path)
+    return f'{st.st_mtime_ns}:{st.st_size}:{st.st_ino}'
+
+
+def _connection():
+    if _db_path is None:
+        raise RuntimeError('host_changes não configurado (init_app)')
+    conn = getattr(_local, 'conn', None)
+    if conn is None or _local.key != (os.getpid(), _db_path):
+        conn = sqlite3.connect(_db_path, timeout=5, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS host_changes ('
+                'version INTEGER PRIMARY KEY AUTOINCREMENT, op TEXT NOT NULL, name TEXT NOT NULL, '
+                'ip INTEGER, mac INTEGER, registered INTEGER)'
+            )
+            conn.execute('CREATE TABLE IF NOT EXISTS host_changes_meta (key TEXT PRIMARY KEY, value)')
+            # A primeira versão é derivada do relógio (em microssegundos): se o
+            # banco for apagado, as versões emitidas por ele continuam menores
+            # que as novas e caem no caminho de inventário completo
+            if conn.execute("SELECT 1 FROM sqlite_sequence WHERE name = 'host_changes'").fetchone() is None:
+                conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('host_changes', ?)",
+                             (time.time_ns() // 1000,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        _local.conn = conn
+        _local.key = (os.getpid(), _db_path)
+    return conn
+
+
+def _head(conn):
+    return conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'host_changes'").fetchone()[0]
+
+
+def _meta(conn, key):
+    row = conn.execute('SELECT value FROM host_changes_meta WHERE key = ?', (key,)).fetchone()
+    return row[0] if row else None
+
+
+def _set_meta(conn, key, value):
+    conn.execute('INSERT OR REPLACE INTO host_changes_meta (key, value) VALUES (?, ?)', (key, value))
+
+
+def _catch_up(conn):
+    """
+    Aplica a _hosts as alterações gravadas por outros processos. Deve ser
+    chamada com o lock, dentro de uma transação.
+
+    Returns:
+        bool: False se o estado local não pode ser atualizado (processo novo
+        ou alterações já descartadas do log)
+    """
+    global _applied
+    if _hosts is None:
+        return False
+    floor = _meta(conn, 'floor') or 0
+    oldest = conn.execute('SELECT min(version) FROM host_changes').fetchone()[0]
+    if _applied < floor or (oldest is not None and _applied < oldest - 1):
+        return False
+    for version, op, name, ip, mac, registered in conn.execute(
+            'SELECT version, op, name, ip, mac, registered FROM host_changes WHERE version > ? ORDER BY version',
+            (_applied,)):
+        if op == 'upsert':
+            _hosts[name] = HostRecord(name, ip, mac, registered)
+        elif op == 'delete':
+            _hosts.pop(name, None)
+        _applied = version
+    return True
+
+
+def _append(conn, op, name, host=None):
+    """Grava uma alteração no log. Deve ser chamada com o lock, dentro de uma transação."""
+    global _applied
+    if host is None:
+        conn.execute('INSERT INTO host_changes (op, name) VALUES (?, ?)', (op, name))
+    else:
+        conn.execute('INSERT INTO host_changes (op, name, ip, mac, registered) VALUES (?, ?, ?, ?, ?)',
+                     (op, name, host.ip, host.mac, host.registered))
+    _applied = _head(conn)
+
+
+def _record(file_path, op, host_name, host=None):
+    global _signature
+    with _lock:
+        conn = _connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if not _catch_up(conn):
+                # Sem o estado anterior não há como descrever a alteração
+                conn.execute('COMMIT')
+                _sync(file_path)
+                return
+            _append(conn, op, host_name, host)
+            if op == 'upsert':
+                _hosts[host_name] = host
+            else:
+                _hosts.pop(host_name, None)
+            _prune(conn)
+            _signature = _file_signature(file_path)
+            _set_meta(conn, 'signature', _signature)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+
+def _prune(conn):
+    conn.execute('DELETE FROM host_changes WHERE version <= ?', (_head(conn) - MAX_CHANGES,))
+
+
+def current_version():
+    """Retorna a versão atual do inventário de hosts."""
+    with _lock:
+        return _head(_connection())
+
+
+def record_upsert(file_path, host):
+    """
+    Registra a criação ou alteração de um host, logo após gravar o dhcpd.conf.
+    Quem altera o arquivo deve chamar sync_with_file antes, para que
+    alterações externas não sejam atribuídas a esta gravação.
+
+    Args:
+        file_path: dhcpd.conf alterado
+        host: HostRecord com o estado atual do host, como lido do arquivo
+    """
+    _record(file_path, 'upsert', host.name, host)
+
+
+def record_delete(file_path, host_name):
+    """Registra a exclusão de um host, logo após gravar o dhcpd.conf."""
+    _record(file_path, 'delete', host_name)
+
+
+def sync_with_file(file_path):
+    """
+    Detecta alterações externas no dhcpd.conf (edição manual, restauração de
+    backup, outro worker) e as registra no log de alterações.
+
+    O arquivo só é analisado novamente quando sua assinatura muda, então a
+    chamada é barata no caso comum.
+    """
+    with _lock:
+        if _file_signature(file_path) == _signature:
+            return
+        _sync(file_path)
+
+
+def _sync(file_path):
+    """Corpo de sync_with_file. Deve ser chamada com o lock."""
+    global _hosts, _applied, _signature
+    signature = _file_signature(file_path)
+    current = {host.name: host for host in host_inventory.get_hosts(file_path)}
+    conn = _connection()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        if _meta(conn, 'signature') == signature:
+            # Outro processo já registrou este conteúdo
+            _hosts, _applied = current, _head(conn)
+        elif _catch_up(conn):
+            for name, host in current.items():
+                if _hosts.get(name) != host:
+                    _append(conn, 'upsert', name, host)
+            for name in [name for name in _hosts if name not in current]:
+                _append(conn, 'delete', name)
+            _prune(conn)
+            _hosts = current
+        else:
+            # Estado anterior desconhecido: versões já emitidas deixam de
+            # valer e os clientes recebem o inventário completo
+            _append(conn, 'reset', '')
+            _set_meta(conn, 'floor', _applied)
+            _prune(conn)
+            _hosts = current
+        _set_meta(conn, 'signature', signature)
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+    _signature = signature
+
+
+def changes_since(version):
+    """
+    Retorna as alterações posteriores a uma versão.
+
+    Returns:
+        dict com 'version', 'upserted' (lista de hosts) e 'removed' (lista de
+        nomes), ou None quando a versão solicitada não está mais coberta pelo
+        log e o cliente precisa de um inventário completo.
+    """
+    with _lock:
+        conn = _connection()
+        conn.execute('BEGIN')
+        try:
+            head = _head(conn)
+            floor = _meta(conn, 'floor') or 0
+            oldest = conn.execute('SELECT min(version) FROM host_changes').fetchone()[0]
+            if version > head or version < floor or version < (oldest if oldest is not None else head + 1) - 1:
+                return None
+
+            # Apenas o último estado de cada host importa para o cliente
+            latest = {}
+            for op, name, ip, mac, registered in conn.execute(
+                    'SELECT op, name, ip, mac, registered FROM host_changes WHERE version > ? ORDER BY version',
+                    (version,)):
+                if op != 'reset':
+                    latest[name] = (op, (name, ip, mac, registered))
+        finally:
+            conn.execute('COMMIT')
+
+    return {
+        'version': head,
+        'upserted': [HostRecord(*row).to_dict() for op, row in latest.values() if op == 'upsert'],
+        'removed': [name for name, (op, row) in latest.items() if op == 'delete'],
+    }
@@ -0,0 +1,199 @@
+"""
+Diferença entre dois dhcpd.conf no nível de hosts, em vez de linhas de texto:
+indentação e ordem dos blocos não importam.
+
+Os hosts das duas versões são associados pelo nome e, entre os que só
+existem em uma delas, pelo MAC (dicionários, O(n)). Cada host aparece em uma
+das categorias:
+    - added / removed: só existe na versão nova / antiga
+    - renamed: mesmo MAC com outro nome (o IP pode ter mudado também)
+    - readdressed: mesmo nome com outro IP
+    - mac_changed: mesmo nome com outro MAC
+Um host com IP e MAC alterados aparece em readdressed e em mac_changed.
+Blocos repetidos de um mesmo nome: vale a primeira ocorrência em cada versão.
+
+Uso (a partir da raiz do projeto):
+    python -m src.utils.host_diff dhcpd.conf_old dhcpd.conf.bak
+    python -m src.utils.host_diff dhcpd.conf_old dhcpd.conf.bak --json
+"""
+import sys
+from collections import defaultdict, deque
+from itertools import compress
+from operator import not_
+
+from dhcp_parser import int_to_ip, int_to_mac
+
+CATEGORIES = ('added', 'removed', 'renamed', 'readdressed', 'mac_changed')
+
+
+class HostDiff:
+    """
+    Resultado de diff_hosts. Cada categoria é uma lista de posições nas
+    tabelas: added guarda posições em new, removed em old e as demais pares
+    (posição em old, posição em new). to_dict converte para o formato da API.
+    """
+
+    __slots__ = ('old', 'new', 'unchanged') + CATEGORIES
+
+    def __init__(self, old, new):
+        self.old = old
+        self.new = new
+        self.unchanged = 0
+        for category in CATEGORIES:
+            setattr(self, category, [])
+
+    def summary(self):
+        """Quantidade de hosts em cada versão e em cada categoria."""
+        counts = {'old_hosts': len(self.old), 'new_hosts': len(self.new), 'unchanged': self.unchanged}
+        counts.update((category, len(getattr(self, category))) for category in CATEGORIES)
+        return counts
+
+    def to_dict(self):
+        old, new = self.old, self.new
+        return {
+            'summary': self.summary(),
+            'added': [new[j].to_dict() for j in self.added],
+            'removed': [old[i].to_dict() for i in self.removed],
+            'renamed': [{
+                'old_name': old.names[i],
+                'new_name': new.names[j],
+                'mac_address': int_to_mac(new.macs[j]),
+                'old_ip': int_to_ip(old.ips[i]),
+                'new_ip': int_to_ip(new.ips[j]),
+            } for i, j in self.renamed],
+            'readdressed': [{
+                'name': new.names[j],
+                'mac_address': int_to_mac(new.macs[j]),
+                'old_ip': int_to_ip(old.ips[i]),
+                'new_ip': int_to_ip(new.ips[j]),
+            } for i, j in self.readdressed],
+            'mac_changed': [{
+                'name': new.names[j],
+                'ip_address': int_to_ip(new.ips[j]),
+                'old_mac': int_to_mac(old.macs[i]),
+                'new_mac': int_to_mac(new.macs[j]),
+            } for i, j in self.mac_changed],
+        }
+
+    def lines(self):
+        """Relatório em texto, um host por linha."""
+        old, new = self.old, self.new
+        sections = (
+            ('Adicionados', [f'+ {host.name}  {host.mac_address}  {host.ip_address}'
+                             for host in map(new.__getitem__, self.added)]),
+            ('Removidos', [f'- {host.name}  {host.mac_address}  {host.ip_address}'
+                           for host in map(old.__getitem__, self.removed)]),
+            ('Renomeados', [f'~ {old.names[i]} -> {new.names[j]}  {int_to_mac(new.macs[j])}'
+                            + (f'  {int_to_ip(old.ips[i])} -> {int_to_ip(new.ips[j])}'
+                               if old.ips[i] != new.ips[j] else '')
+                            for i, j in self.renamed]),
+            ('IP alterado', [f'@ {new.names[j]}  {int_to_ip(old.ips[i])} -> {int_to_ip(new.ips[j])}'
+                             for i, j in self.readdressed]),
+            ('MAC alterado', [f'# {new.names[j]}  {int_to_mac(old.macs[i])} -> {int_to_mac(new.macs[j])}'
+                              for i, j in self.mac_changed]),
+        )
+        output = []
+        for title, entries in sections:
+            if entries:
+                output.append(f'{title} ({len(entries)}):')
+                output.extend(f'  {entry}' for entry in entries)
+        counts = self.summary()
+        output.append(f"{counts['old_hosts']} -> {counts['new_hosts']} hosts, {counts['unchanged']} sem alteração")
+        return output
+
+
+def _first_positions(names):
+    # Posição da primeira ocorrência de cada nome
+    return dict(zip(reversed(names), range(len(names) - 1, -1, -1)))
+
+
+def diff_hosts(old, new):
+    """
+    Compara duas HostTable (parse_hosts ou host_inventory.get_hosts).
+
+    Returns:
+        HostDiff
+    """
+    result = HostDiff(old, new)
+    old_positions = _first_positions(old.names)
+    old_ips, old_macs, new_ips, new_macs = old.ips, old.macs, new.ips, new.macs
+
+    # Mesmo nome nas duas versões. A versão nova é percorrida na ordem do
+    # arquivo (acesso sequencial às colunas, bem mais rápido que na ordem de
+    # um conjunto de nomes)
+    matched = bytearray(len(old))
+    new_only = []
+    new_only_names = set()
+    unchanged = 0
+    find_old = old_positions.get
+    for j, name in enumerate(new.names):
+        i = find_old(name)
+        if i is None:
+            if name not in new_only_names:  # Nome repetido na versão nova
+                new_only_names.add(name)
+                new_only.append(j)
+            continue
+        if matched[i]:
+            continue  # Nome repetido na versão nova
+        matched[i] = 1
+        same_ip = old_ips[i] == new_ips[j]
+        same_mac = old_macs[i] == new_macs[j]
+        if same_ip and same_mac:
+            unchanged += 1
+            continue
+        if not same_ip:
+            result.readdressed.append((i, j))
+        if not same_mac:
+            result.mac_changed.append((i, j))
+    result.unchanged = unchanged
+
+    # Nomes de uma versão só: associados pelo MAC (renomeados), na ordem do arquivo
+    added_by_mac = defaultdict(deque)
+    for j in new_only:
+        added_by_mac[new_macs[j]].append(j)
+    for i in compress(range(len(old)), map(not_, matched)):
+        if old_positions[old.names[i]] != i:
+            continue  # Nome repetido na versão antiga
+        candidates = added_by_mac.get(old_macs[i])
+        if candidates:
+            result.renamed.append((i, candidates.popleft()))
+        else:
+            result.removed.append(i)
+    result.added = sorted(j for positions in added_by_mac.values() for j in positions)
+    return result
+
+
+def main():
+    import argparse
+    import json
+    import time
+
+    from dhcp_parser import parse_hosts
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('old', help='dhcpd.conf de referência (versão antiga)')
+    parser.add_argument('new', help='dhcpd.conf comparado (versão nova)')
+    parser.add_argument('--json', action='store_true', help='Saída em JSON, no formato da API')
+    parser.add_argument('--summary', action='store_true', help='Apenas as quantidades por categoria')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    old, new = parse_hosts(args.old), parse_hosts(args.new)
+    parsed = time.perf_counter()
+    result = diff_hosts(old, new)
+    compared = time.perf_counter()
+
+    if args.json:
+        json.dump(result.summary() if args.summary else result.to_dict(), sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    elif args.summary:
+        for name, count in result.summary().items():
+            print(f'{name:<12} {count}')
+    else:
+        print('\n'.join(result.lines()))
+    print(f'Análise {(parsed - started) * 1000:.0f} ms, comparação {(compared - parsed) * 1000:.0f} ms',
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
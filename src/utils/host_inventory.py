@@ -0,0 +1,192 @@
+import os
+import threading
+
+from dhcp_parser import parse_hosts, get_used_ips as parse_used_ips, get_subnets as parse_subnets
+from src.utils.metrics import metrics
+from src.utils.oui_registry import OuiRegistry
+from src.utils.rule_store import RuleIndex, load_rules
+
+# Resultados das análises por (função, arquivo), com a assinatura do arquivo
+# no momento da leitura. Os valores são compartilhados entre requisições e
+# não devem ser modificados por quem os consome.
+_lock = threading.Lock()
+_cache = {}
+
+
+def _file_signature(file_path):
+    """Retorna uma assinatura barata (mtime, tamanho, inode) do arquivo."""
+    st = os.stat(file_path)
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _cached(loader, file_path, span):
+    key = (loader.__name__, file_path)
+    signature = _file_signature(file_path)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+
+    with metrics.span(span):
+        value = loader(file_path)
+    with _lock:
+        _cache[key] = (signature, value)
+    return value
+
+
+def get_hosts(file_path):
+    """Hosts do dhcpd.conf, em uma HostTable (somente leitura)."""
+    return _cached(parse_hosts, file_path, 'parse')
+
+
+def get_used_ips(file_path):
+    """Conjunto de IPs fixos do dhcpd.conf (somente leitura)."""
+    return _cached(parse_used_ips, file_path, 'parse')
+
+
+def get_subnets(file_path):
+    """Subnets declaradas no dhcpd.conf (somente leitura)."""
+    return _cached(parse_subnets, file_path, 'parse')
+
+
+def get_rules(file_path):
+    """Regras de IP do arquivo de regras, RULES_PATH (somente leitura)."""
+    return _cached(load_rules, file_path, 'rule_load')
+
+
+def get_rule_index(file_path):
+    """
+    RuleIndex das regras de get_rules(), para busca da regra de um IP
+    (somente leitura). Recompilado quando as regras mudam.
+    """
+    rules = get_rules(file_path)
+    key = ('rule_index', file_path)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] is rules:
+            return entry[1]
+
+    with metrics.span('rule_load'):
+        index = RuleIndex(rules)
+    with _lock:
+        _cache[key] = (rules, index)
+    return index
+
+
+def get_host_rules(dhcp_conf_path, rules_path):
+    """
+    Rótulo da regra de cada host de get_hosts(), na mesma ordem, ou 'N/A'
+    (somente leitura). Os rótulos são internados: a lista guarda apenas uma
+    referência por host. Recalculada quando os hosts ou as regras mudam.
+    """
+    hosts = get_hosts(dhcp_conf_path)
+    index = get_rule_index(rules_path)
+    key = ('host_rules', dhcp_conf_path, rules_path)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0][0] is hosts and entry[0][1] is index:
+            return entry[1]
+
+    with metrics.span('rule_match'):
+        labels = index.labels_for(hosts.ips)
+    with _lock:
+        _cache[key] = ((hosts, index), labels)
+    return labels
+
+
+def get_oui_registry(file_path):
+    """OuiRegistry do registro compilado (OUI_REGISTRY_PATH), reaberto quando o arquivo muda."""
+    return _cached(OuiRegistry, file_path, 'oui_load')
+
+
+def get_host_vendors(dhcp_conf_path, registry_path):
+    """
+    Fabricante do MAC de cada host de get_hosts(), na mesma ordem, ou None
+    (somente leitura). Recalculada quando os hosts ou o registro mudam.
+    """
+    hosts = get_hosts(dhcp_conf_path)
+    registry = get_oui_registry(registry_path)
+    key = ('host_vendors', dhcp_conf_path, registry_path)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0][0] is hosts and entry[0][1] is registry:
+            return entry[1]
+
+    with metrics.span('oui_match'):
+        vendors = registry.vendors_for(hosts.macs)
+    with _lock:
+        _cache[key] = ((hosts, registry), vendors)
+    return vendors
+
+
+def invalidate(file_path=None):
+    """
+    Descarta as análises de um arquivo (ou de todos). Deve ser chamada após
+    cada escrita feita pela aplicação, já que duas gravações no mesmo tick do
+    relógio do sistema de arquivos podem manter a mesma assinatura.
+    """
+    with _lock:
+        if file_path is None:
+            _cache.clear()
+        else:
+            for key in [key for key in _cache if file_path in key[1:]]:
+                del _cache[key]
+
+
+def _seed(dhcp_conf_path, rules_path, signatures, snapshot):
+    """Preenche o cache com um snapshot, como se os arquivos tivessem sido analisados."""
+    conf_signature, rules_signature = signatures
+    index = RuleIndex(snapshot['rules'])
+    with _lock:
+        _cache[(parse_hosts.__name__, dhcp_conf_path)] = (conf_signature, snapshot['hosts'])
+        _cache[(parse_used_ips.__name__, dhcp_conf_path)] = (conf_signature, snapshot['used_ips'])
+        _cache[(load_rules.__name__, rules_path)] = (rules_signature, snapshot['rules'])
+        _cache[('rule_index', rules_path)] = (snapshot['rules'], index)
+        _cache[('host_rules', dhcp_conf_path, rules_path)] = ((snapshot['hosts'], index), snapshot['host_rules'])
+
+
+def warm(dhcp_conf_path, rules_path, snapshot_path=None):
+    """
+    Carrega o inventário antes de atender requisições. Com gunicorn --preload,
+    chamada no processo mestre, o resultado é herdado pelos workers no fork.
+
+    Com snapshot_path, usa o snapshot binário (ver inventory_snapshot) se ele
+    corresponder ao conteúdo atual dos arquivos; caso contrário, analisa os
+    arquivos e grava um snapshot novo.
+
+    Returns:
+        dict com a quantidade de hosts e de regras carregados e 'snapshot':
+        None (sem snapshot), 'loaded', 'saved' ou a mensagem de erro da
+        gravação
+    """
+    snapshot_state = None
+    if snapshot_path:
+        from src.utils import inventory_snapshot
+
+        # Assinaturas antes do hash: se o arquivo mudar depois, a assinatura
+        # em cache fica desatualizada e a próxima leitura o analisa de novo
+        signatures = (_file_signature(dhcp_conf_path), _file_signature(rules_path))
+        with metrics.span('snapshot_load'):
+            digests = (inventory_snapshot.file_digest(dhcp_conf_path),
+                       inventory_snapshot.file_digest(rules_path))
+            snapshot = inventory_snapshot.load(snapshot_path, digests)
+        if snapshot is not None:
+            _seed(dhcp_conf_path, rules_path, signatures, snapshot)
+            snapshot_state = 'loaded'
+
+    hosts = get_hosts(dhcp_conf_path)
+    used_ips = get_used_ips(dhcp_conf_path)
+    rules = get_rules(rules_path)
+    host_rules = get_host_rules(dhcp_conf_path, rules_path)
+
+    # Só grava se o conteúdo analisado é o mesmo do hash calculado acima
+    if (snapshot_path and snapshot_state is None
+            and signatures == (_file_signature(dhcp_conf_path), _file_signature(rules_path))):
+        try:
+            with metrics.span('snapshot_save'):
+                inventory_snapshot.save(snapshot_path, digests, hosts, used_ips, rules, host_rules)
+        except (OSError, ValueError) as e:
+            snapshot_state = str(e)
+        else:
+            snapshot_state = 'saved'
+    return {'hosts': len(hosts), 'rules': len(rules), 'snapshot': snapshot_state}
@@ -0,0 +1,183 @@
+"""
+Snapshot binário do inventário analisado (hosts do dhcpd.conf, IPs usados,
+regras de IP e a regra de cada host), para que a
+inicialização não precise analisar os arquivos de novo.
+
+O snapshot é identificado pelo SHA-256 do conteúdo dos dois arquivos de
+origem (dhcpd.conf e arquivo de regras): se qualquer um mudar, load() devolve None e o inventário é analisado
+e gravado outra vez. Não usa pickle: as colunas numéricas são gravadas como
+arrays e os textos como blocos UTF-8 separados por NUL, tudo little-endian.
+
+Formato (versão 2):
+    cabeçalho  HEADER: magic, versão, SHA-256 do dhcpd.conf e das regras,
+               quantidade de hosts, de IPs usados e de regras
+    seções     cada uma com o tamanho em bytes (uint64) seguido do conteúdo:
+               nomes, IPs (uint32), MACs (uint64), datas (int64), índice da
+               regra de cada host (int32, -1 sem regra), IPs usados, IDs das
+               regras (uint32) e os campos das regras (categoria, acesso,
+               início e fim)
+
+VERSION deve ser incrementada sempre que o formato ou o resultado do parser
+(dhcp_parser) mudar, invalidando os snapshots existentes.
+"""
+import hashlib
+import os
+import struct
+import sys
+from array import array
+
+from dhcp_parser import HostTable
+from src.utils.rule_store import RULE_FIELDS, rule_label
+
+MAGIC = b'DHCPINV\0'
+VERSION = 2
+HEADER = struct.Struct('<8sH2x32s32sIII')
+SECTION = struct.Struct('<Q')
+
+NO_RULE = -1
+
+
+def file_digest(file_path):
+    """SHA-256 do conteúdo do arquivo."""
+    with open(file_path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').digest()
+
+
+def _pack_array(values):
+    packed = array(values.typecode, values)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack_array(typecode, data, count):
+    values = array(typecode)
+    values.frombytes(data)
+    if len(values) != count:
+        raise ValueError('Seção com tamanho inconsistente')
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def _pack_strings(strings):
+    if any('\0' in text for text in strings):
+        raise ValueError('Texto com caractere NUL não pode ser gravado no snapshot')
+    return '\0'.join(strings).encode('utf-8')
+
+
+def _unpack_strings(data, count):
+    strings = bytes(data).decode('utf-8').split('\0') if count else []
+    if len(strings) != count:
+        raise ValueError('Seção com tamanho inconsistente')
+    return strings
+
+
+def _rule_indexes(rules, host_rules):
+    positions = {}
+    for position, rule in enumerate(rules):
+        positions.setdefault(rule_label(rule), position)
+    return array('i', (positions.get(label, NO_RULE) for label in host_rules))
+
+
+def save(snapshot_path, digests, hosts, used_ips, rules, host_rules):
+    """
+    Grava o snapshot de forma atômica (arquivo temporário + os.replace).
+
+    Args:
+        digests: tupla (file_digest do dhcpd.conf, file_digest das regras),
+            calculados sobre o mesmo conteúdo que foi analisado
+        hosts: HostTable
+        used_ips: conjunto de IPs usados (texto)
+        rules: lista de regras no formato de rule_store.load_rules
+        host_rules: rótulo da regra de cada host, na ordem de hosts
+    """
+    rule_fields = [rule[field] for rule in rules for field in RULE_FIELDS]
+    sections = [
+        _pack_strings(hosts.names),
+        _pack_array(hosts.ips),
+        _pack_array(hosts.macs),
+        _pack_array(hosts.dates),
+        _pack_array(_rule_indexes(rules, host_rules)),
+        _pack_strings(sorted(used_ips)),
+        _pack_array(array('I', (rule['id'] for rule in rules))),
+        _pack_strings(rule_fields),
+    ]
+
+    directory = os.path.dirname(snapshot_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f'{snapshot_path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, digests[0], digests[1], len(hosts), len(used_ips), len(rules)))
+            for data in sections:
+                f.write(SECTION.pack(len(data)))
+                f.write(data)
+        os.replace(tmp_path, snapshot_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load(snapshot_path, digests):
+    """
+    Lê o snapshot, se existir e corresponder ao conteúdo atual dos arquivos.
+
+    Args:
+        digests: tupla (file_digest do dhcpd.conf, file_digest das regras)
+
+    Returns:
+        dict com 'hosts' (HostTable), 'used_ips', 'rules' e 'host_rules' (no
+        formato de host_inventory), ou None se o snapshot não existir, for
+        de outra versão, de outro conteúdo ou estiver corrompido
+    """
+    try:
+        with open(snapshot_path, 'rb') as f:
+            data = memoryview(f.read())
+    except FileNotFoundError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+    magic, version, conf_digest, rules_digest, host_count, used_count, rule_count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION or (conf_digest, rules_digest) != tuple(digests):
+        return None
+
+    sections = []
+    offset = HEADER.size
+    try:
+        while offset < len(data):
+            (length,) = SECTION.unpack_from(data, offset)
+            offset += SECTION.size
+            if offset + length > len(data):
+                return None
+            sections.append(data[offset:offset + length])
+            offset += length
+        if len(sections) != 8:
+            return None
+
+        hosts = HostTable.from_columns(
+            _unpack_strings(sections[0], host_count),
+            _unpack_array('I', sections[1], host_count),
+            _unpack_array('Q', sections[2], host_count),
+            _unpack_array('q', sections[3], host_count),
+        )
+        rule_indexes = _unpack_array('i', sections[4], host_count)
+        used_ips = set(_unpack_strings(sections[5], used_count))
+        rule_ids = _unpack_array('I', sections[6], rule_count)
+        fields = _unpack_strings(sections[7], len(RULE_FIELDS) * rule_count)
+    except (struct.error, ValueError):
+        return None
+
+    width = len(RULE_FIELDS)
+    rules = [{'id': rule_id, **dict(zip(RULE_FIELDS, fields[i * width:(i + 1) * width]))}
+             for i, rule_id in enumerate(rule_ids)]
+    if rule_indexes and (min(rule_indexes) < NO_RULE or max(rule_indexes) >= rule_count):
+        return None
+    # NO_RULE (-1) indexa o último elemento: 'N/A'
+    labels = [sys.intern(rule_label(rule)) for rule in rules] + ['N/A']
+    host_rules = list(map(labels.__getitem__, rule_indexes))
+    return {'hosts': hosts, 'used_ips': used_ips, 'rules': rules, 'host_rules': host_rules}
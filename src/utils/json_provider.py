@@ -0,0 +1,68 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional: sem ele, usa o json da stdlib
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Provider JSON do Flask que serializa com orjson, mantendo a saída do
+    provider padrão: chaves ordenadas, datas no formato HTTP e os mesmos
+    tipos extras (Decimal, UUID, dataclasses), tratados por default().
+
+    Casos que o orjson não aceita (inteiros maiores que 64 bits, argumentos
+    extras de json.dumps) caem no provider padrão.
+    """
+
+    def _options(self, pretty=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._options()).decode('utf-8')
+        except TypeError:
+            return super().dumps(obj)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            data = orjson.dumps(obj, default=self.default, option=self._options(pretty))
+        except TypeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(data + b'\n', mimetype=self.mimetype)
+
+
+def init_json(app):
+    """
+    Define o provider JSON da aplicação.
+
+    Configuração:
+        - JSON_PROVIDER: 'auto' (orjson se instalado, senão stdlib), 'orjson'
+          ou 'stdlib' (padrão: 'auto')
+    """
+    app.config.setdefault('JSON_PROVIDER', 'auto')
+    provider = app.config['JSON_PROVIDER']
+    if provider not in ('auto', 'orjson', 'stdlib'):
+        raise ValueError(f'Provider JSON desconhecido: {provider}')
+    if provider == 'orjson' and orjson is None:
+        raise ValueError('JSON_PROVIDER=orjson, mas o módulo orjson não está instalado')
+
+    if provider != 'stdlib' and orjson is not None:
+        app.json = OrjsonProvider(app)
+    else:
+        app.json = DefaultJSONProvider(app)
@@ -0,0 +1,230 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryBuckets:
+    """Token buckets em memória, limitados às chaves usadas mais recentemente."""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, rate, now):
+        """
+        Tenta consumir uma ficha do bucket da chave.
+
+        Returns:
+            float: 0 se a ficha foi consumida, senão os segundos até a próxima
+        """
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def refund(self, key, capacity, rate, now):
+        """Devolve uma ficha consumida ao bucket da chave."""
+        with self._lock:
+            entry = self._buckets.get(key)
+            if entry is not None:
+                tokens, updated = entry
+                self._buckets[key] = (min(capacity, tokens + (now - updated) * rate + 1), now)
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SQLiteBuckets:
+    """
+    Token buckets em um arquivo SQLite próprio, compartilhado entre os workers.
+    Cada consumo é uma transação IMMEDIATE, o que serializa os processos.
+
+    Cada linha guarda também quando o bucket estará cheio de novo (full_at):
+    a partir daí ela equivale a uma chave nunca vista e é apagada, no máximo
+    uma vez a cada prune_interval segundos por processo.
+    """
+
+    def __init__(self, path, prune_interval=60):
+        self.path = path
+        self.prune_interval = prune_interval
+        self._next_prune = 0.0
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS login_buckets ('
+            'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, full_at REAL NOT NULL)'
+        )
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(login_buckets)')]
+        if 'full_at' not in columns:
+            # Arquivo de uma versão anterior: as linhas antigas são descartáveis
+            conn.execute('ALTER TABLE login_buckets ADD COLUMN full_at REAL NOT NULL DEFAULT 0')
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_login_buckets_full_at ON login_buckets (full_at)')
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _store(self, conn, key, tokens, capacity, rate, now):
+        conn.execute(
+            'INSERT OR REPLACE INTO login_buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?)',
+            (key, tokens, now, now + (capacity - tokens) / rate)
+        )
+
+    def consume(self, key, capacity, rate, now):
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM login_buckets WHERE key = ?', (key,)).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate
+            self._store(conn, key, tokens, capacity, rate, now)
+            if now >= self._next_prune:
+                self._next_prune = now + self.prune_interval
+                conn.execute('DELETE FROM login_buckets WHERE full_at <= ?', (now,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return wait
+
+    def refund(self, key, capacity, rate, now):
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM login_buckets WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                tokens, updated = row
+                self._store(conn, key, min(capacity, tokens + (now - updated) * rate + 1), capacity, rate, now)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def __len__(self):
+        return self._connection().execute('SELECT count(*) FROM login_buckets').fetchone()[0]
+
+
+class LoginThrottle:
+    """
+    Limita tentativas de login por IP de origem e por nome de usuário com
+    token buckets, antes de qualquer verificação de senha (hash scrypt/pbkdf2).
+    O bucket do IP é cobrado em toda tentativa; o do usuário só nas que
+    falham (a ficha é devolvida por succeeded), para que terceiros não
+    bloqueiem um usuário apenas fazendo login por ele.
+
+    O IP é o REMOTE_ADDR da requisição. Atrás de um proxy reverso, configure
+    TRUSTED_PROXY_COUNT (ver src/config.py) para que ele seja o endereço
+    adicionado pelo proxy ao X-Forwarded-For, e não um valor do cliente.
+
+    Configuração:
+        - LOGIN_THROTTLE_ENABLED: Liga o limitador (padrão: True)
+        - LOGIN_THROTTLE_BACKEND: 'memory' (por processo) ou 'sqlite'
+          (compartilhado entre workers via LOGIN_THROTTLE_DB)
+        - LOGIN_THROTTLE_IP_BURST / LOGIN_THROTTLE_IP_PER_MINUTE: Tentativas
+          seguidas permitidas e reposição por minuto, por IP (padrão: 10 / 10)
+        - LOGIN_THROTTLE_USER_BURST / LOGIN_THROTTLE_USER_PER_MINUTE: O mesmo,
+          por nome de usuário (padrão: 5 / 2)
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.buckets = None
+        self.ip_burst = 10
+        self.ip_rate = 10 / 60
+        self.user_burst = 5
+        self.user_rate = 2 / 60
+        self.counters = {'allowed': 0, 'rejected_ip': 0, 'rejected_username': 0}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('LOGIN_THROTTLE_ENABLED', True)
+        app.config.setdefault('LOGIN_THROTTLE_BACKEND', 'memory')
+        app.config.setdefault('LOGIN_THROTTLE_DB', os.path.join(
+            os.path.dirname(os.path.dirname(__file__)), 'database', 'login_throttle.db'))
+        app.config.setdefault('LOGIN_THROTTLE_IP_BURST', 10)
+        app.config.setdefault('LOGIN_THROTTLE_IP_PER_MINUTE', 10)
+        app.config.setdefault('LOGIN_THROTTLE_USER_BURST', 5)
+        app.config.setdefault('LOGIN_THROTTLE_USER_PER_MINUTE', 2)
+
+        self.enabled = app.config['LOGIN_THROTTLE_ENABLED']
+        self.ip_burst = app.config['LOGIN_THROTTLE_IP_BURST']
+        self.ip_rate = app.config['LOGIN_THROTTLE_IP_PER_MINUTE'] / 60
+        self.user_burst = app.config['LOGIN_THROTTLE_USER_BURST']
+        self.user_rate = app.config['LOGIN_THROTTLE_USER_PER_MINUTE'] / 60
+
+        if app.config['LOGIN_THROTTLE_BACKEND'] == 'sqlite':
+            self.buckets = SQLiteBuckets(app.config['LOGIN_THROTTLE_DB'])
+        elif app.config['LOGIN_THROTTLE_BACKEND'] == 'memory':
+            self.buckets = MemoryBuckets()
+        else:
+            raise ValueError(f"Backend de limitação de login desconhecido: {app.config['LOGIN_THROTTLE_BACKEND']}")
+
+        app.extensions['login_throttle'] = self
+
+    def check(self, ip_address, username):
+        """
+        Registra uma tentativa de login e informa se ela pode prosseguir.
+
+        Returns:
+            float: 0 se permitida, senão os segundos para tentar novamente
+        """
+        if not self.enabled:
+            return 0.0
+
+        now = time.time()
+        wait = self.buckets.consume(f'ip:{ip_address}', self.ip_burst, self.ip_rate, now)
+        if wait:
+            self._count('rejected_ip')
+            return wait
+
+        wait = self.buckets.consume(f'user:{username.lower()}', self.user_burst, self.user_rate, now)
+        if wait:
+            self._count('rejected_username')
+            return wait
+
+        self._count('allowed')
+        return 0.0
+
+    def succeeded(self, username):
+        """Devolve a ficha do usuário cobrada por check() em um login bem-sucedido."""
+        if self.enabled:
+            self.buckets.refund(f'user:{username.lower()}', self.user_burst, self.user_rate, time.time())
+
+    def stats(self):
+        """Contadores para monitoramento."""
+        with self._lock:
+            stats = dict(self.counters)
+        stats['tracked_keys'] = len(self.buckets) if self.buckets is not None else 0
+        return stats
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+
+login_throttle = LoginThrottle()
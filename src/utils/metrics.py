@@ -0,0 +1,186 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import g, request
+
+# Limites (em segundos) dos buckets dos histogramas
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PREFIX = 'sgdh'
+
+
+class Histogram:
+    """Histograma de durações com buckets fixos (contagens não cumulativas)."""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+class Metrics:
+    """
+    Métricas da aplicação no formato texto do Prometheus.
+
+    Registra, por rota (o padrão da URL, não o caminho, para manter a
+    cardinalidade baixa), a contagem de requisições por status e o histograma
+    de latência, além de histogramas de trechos nomeados (span()) como o
+    parse do dhcpd.conf, a escrita do arquivo e o restart do serviço.
+
+    Os valores são por processo: com vários workers do gunicorn, cada coleta
+    do /metrics mostra o worker que atendeu a requisição.
+
+    Configuração:
+        - METRICS_ENABLED: Registra as métricas das requisições (padrão: True)
+        - METRICS_BUCKETS: Limites dos buckets, em segundos
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.buckets = DEFAULT_BUCKETS
+        self._requests = {}
+        self._latency = {}
+        self._spans = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('METRICS_ENABLED', True)
+        app.config.setdefault('METRICS_BUCKETS', DEFAULT_BUCKETS)
+
+        self.enabled = app.config['METRICS_ENABLED']
+        self.buckets = tuple(sorted(app.config['METRICS_BUCKETS']))
+        if self.enabled:
+            app.before_request(self._start_request)
+            app.after_request(self._finish_request)
+            app.teardown_request(self._teardown_request)
+        app.extensions['metrics'] = self
+
+    def register_gauge(self, name, help_text, collect, kind='gauge'):
+        """
+        Registra (ou substitui) valores lidos no momento da coleta.
+
+        Args:
+            collect: Função sem argumentos que retorna um número ou um dict
+                {valor do label 'type': número}
+        """
+        self._gauges[name] = (help_text, collect, kind)
+
+    def observe_request(self, method, route, status, seconds):
+        with self._lock:
+            key = (method, route, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            histogram = self._latency.get((method, route))
+            if histogram is None:
+                histogram = self._latency[(method, route)] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def observe_span(self, name, seconds):
+        with self._lock:
+            histogram = self._spans.get(name)
+            if histogram is None:
+                histogram = self._spans[name] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def span(self, name):
+        """Mede o trecho de código como um span nomeado (também funciona como decorator)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_span(name, time.perf_counter() - started)
+
+    def _start_request(self):
+        g._metrics_started = time.perf_counter()
+
+    def _route(self):
+        rule = request.url_rule
+        return rule.rule if rule is not None else '<unmatched>'
+
+    def _finish_request(self, response):
+        started = g.pop('_metrics_started', None)
+        if started is not None:
+            self.observe_request(request.method, self._route(), response.status_code,
+                                 time.perf_counter() - started)
+        return response
+
+    def _teardown_request(self, exc):
+        # Exceções não tratadas não passam pelo after_request
+        started = g.pop('_metrics_started', None)
+        if started is not None:
+            self.observe_request(request.method, self._route(), 500, time.perf_counter() - started)
+
+    def render(self):
+        """Retorna todas as métricas no formato texto do Prometheus (0.0.4)."""
+        with self._lock:
+            requests_total = dict(self._requests)
+            latency = {key: (list(h.counts), h.sum, h.count) for key, h in self._latency.items()}
+            spans = {key: (list(h.counts), h.sum, h.count) for key, h in self._spans.items()}
+
+        lines = [
+            f'# HELP {PREFIX}_http_requests_total Requisições HTTP atendidas, por rota e status.',
+            f'# TYPE {PREFIX}_http_requests_total counter',
+        ]
+        for (method, route, status), value in sorted(requests_total.items()):
+            lines.append(f'{PREFIX}_http_requests_total{{{_labels(method=method, route=route, status=status)}}} {value}')
+
+        lines += [
+            f'# HELP {PREFIX}_http_request_duration_seconds Latência das requisições HTTP, por rota.',
+            f'# TYPE {PREFIX}_http_request_duration_seconds histogram',
+        ]
+        for (method, route), data in sorted(latency.items()):
+            lines += self._render_histogram(f'{PREFIX}_http_request_duration_seconds',
+                                            {'method': method, 'route': route}, *data)
+
+        lines += [
+            f'# HELP {PREFIX}_span_duration_seconds Duração de trechos internos (parse, escrita, restart...).',
+            f'# TYPE {PREFIX}_span_duration_seconds histogram',
+        ]
+        for name, data in sorted(spans.items()):
+            lines += self._render_histogram(f'{PREFIX}_span_duration_seconds', {'span': name}, *data)
+
+        for name, (help_text, collect, kind) in self._gauges.items():
+            lines += [f'# HELP {PREFIX}_{name} {help_text}', f'# TYPE {PREFIX}_{name} {kind}']
+            value = collect()
+            if isinstance(value, dict):
+                for label, item in sorted(value.items()):
+                    lines.append(f'{PREFIX}_{name}{{{_labels(type=label)}}} {item}')
+            else:
+                lines.append(f'{PREFIX}_{name} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+    def _render_histogram(self, name, labels, counts, total, count):
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{_labels(**labels, le=bound)}}} {cumulative}')
+        lines.append(f'{name}_bucket{{{_labels(**labels, le="+Inf")}}} {count}')
+        lines.append(f'{name}_sum{{{_labels(**labels)}}} {total}')
+        lines.append(f'{name}_count{{{_labels(**labels)}}} {count}')
+        return lines
+
+
+metrics = Metrics()
@@ -0,0 +1,250 @@
+"""
+Consulta offline do fabricante de uma placa de rede pelo prefixo do MAC
+(OUI, os 24 bits iniciais), a partir do registro MA-L do IEEE.
+
+O registro é compilado (build) para um arquivo binário e lido via mmap: as
+páginas ficam no cache do sistema operacional, compartilhadas entre os
+workers, e a busca não copia o arquivo para a memória do processo.
+
+Formato (versão 1), little-endian:
+    cabeçalho  HEADER: magic, versão e quantidade de prefixos
+    prefixos   3 bytes cada (big-endian), em ordem crescente: a ordem dos
+               bytes é a ordem numérica, e a busca é um bisect sobre eles
+    offsets    uint32 por prefixo: posição do nome do fabricante no bloco
+    nomes      nomes UTF-8 terminados por NUL, sem repetição (um fabricante
+               com centenas de prefixos guarda o nome uma vez)
+
+MACs administrados localmente (bit 0x02 do primeiro octeto, usado pelos
+MACs aleatórios de celulares e por máquinas virtuais) não têm fabricante.
+Blocos MA-M e MA-S (28 e 36 bits) não são detalhados: retornam o titular
+do prefixo de 24 bits, se estiver no registro.
+
+O registro é compilado na inicialização (init_registry) a partir de
+OUI_SOURCE_PATH, no formato oui.csv ou oui.txt publicados pelo IEEE
+(https://standards-oui.ieee.org/). O oui.csv do repositório traz apenas
+alguns fabricantes; para o registro completo, substitua-o pelo arquivo do
+IEEE ou compile diretamente:
+    python -m src.utils.oui_registry build oui.csv
+    python -m src.utils.oui_registry lookup 00:50:56:12:34:56
+"""
+import csv
+import mmap
+import os
+import re
+import struct
+from bisect import bisect_left
+
+from dhcp_parser import mac_to_int
+
+MAGIC = b'DHCPOUI\0'
+VERSION = 1
+HEADER = struct.Struct('<8sHxxI')
+OFFSET = struct.Struct('<I')
+PREFIX_SIZE = 3
+
+LOCAL_BIT = 0x020000
+
+# Linha de prefixo do oui.txt: "00-50-56   (hex)		VMware, Inc."
+OUI_TXT_RE = re.compile(r'^\s*([0-9A-Fa-f]{2})-([0-9A-Fa-f]{2})-([0-9A-Fa-f]{2})\s+\(hex\)\s+(.*\S)')
+
+_UNKNOWN = object()
+
+
+def read_source(file_path):
+    """
+    Lê um registro do IEEE (oui.csv ou oui.txt).
+
+    Returns:
+        lista de (prefixo de 24 bits, fabricante)
+    """
+    entries = []
+    with open(file_path, encoding='utf-8', newline='') as f:
+        first_line = f.readline()
+        f.seek(0)
+        if first_line.startswith('Registry,'):
+            for row in csv.DictReader(f):
+                if row.get('Registry') != 'MA-L':
+                    continue
+                try:
+                    prefix = int(row['Assignment'], 16)
+                except (TypeError, ValueError):
+                    continue
+                name = ' '.join((row.get('Organization Name') or '').split())
+                if name and 0 <= prefix <= 0xFFFFFF:
+                    entries.append((prefix, name))
+        else:
+            for line in f:
+                match = OUI_TXT_RE.match(line)
+                if match:
+                    entries.append((int(''.join(match.group(1, 2, 3)), 16), ' '.join(match.group(4).split())))
+    return entries
+
+
+def build(source_paths, registry_path):
+    """
+    Compila os registros para o formato binário, de forma atômica
+    (arquivo temporário + os.replace). Um prefixo repetido fica com o
+    fabricante do último arquivo.
+
+    Returns:
+        quantidade de prefixos gravados
+    """
+    vendors = {}
+    for source_path in source_paths:
+        vendors.update(read_source(source_path))
+
+    prefixes = sorted(vendors)
+    name_offsets = {}
+    names = bytearray()
+    offsets = bytearray()
+    for prefix in prefixes:
+        name = vendors[prefix]
+        offset = name_offsets.get(name)
+        if offset is None:
+            offset = name_offsets[name] = len(names)
+            names += name.encode('utf-8').replace(b'\0', b'') + b'\0'
+        offsets += OFFSET.pack(offset)
+
+    directory = os.path.dirname(registry_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f'{registry_path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(prefixes)))
+            f.write(b''.join(prefix.to_bytes(PREFIX_SIZE, 'big') for prefix in prefixes))
+            f.write(offsets)
+            f.write(names)
+        os.replace(tmp_path, registry_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return len(prefixes)
+
+
+class OuiRegistry:
+    """
+    Registro compilado por build(), mapeado em memória. As consultas são
+    memorizadas por prefixo: anotar uma lista de hosts custa um bisect por
+    fabricante distinto, não por host.
+    """
+
+    __slots__ = ('_mm', '_count', '_offsets_start', '_memo')
+
+    def __init__(self, registry_path):
+        with open(registry_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise ValueError(f'Registro OUI inválido: {registry_path}')
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = HEADER.unpack_from(self._mm)
+        self._count = count
+        self._offsets_start = HEADER.size + PREFIX_SIZE * count
+        if (magic != MAGIC or version != VERSION
+                or len(self._mm) < self._offsets_start + OFFSET.size * count):
+            self._mm.close()
+            raise ValueError(f'Registro OUI inválido ou de outra versão: {registry_path}')
+        self._memo = {}
+
+    def __len__(self):
+        return self._count
+
+    def _prefix_at(self, position):
+        start = HEADER.size + PREFIX_SIZE * position
+        return self._mm[start:start + PREFIX_SIZE]
+
+    def _search(self, prefix):
+        if prefix & LOCAL_BIT:
+            return None
+        key = prefix.to_bytes(PREFIX_SIZE, 'big')
+        position = bisect_left(range(self._count), key, key=self._prefix_at)
+        if position == self._count or self._prefix_at(position) != key:
+            return None
+        (offset,) = OFFSET.unpack_from(self._mm, self._offsets_start + OFFSET.size * position)
+        start = self._offsets_start + OFFSET.size * self._count + offset
+        return self._mm[start:self._mm.find(b'\0', start)].decode('utf-8')
+
+    def vendor_for(self, mac):
+        """Fabricante do MAC (inteiro de 48 bits ou texto), ou None."""
+        if isinstance(mac, str):
+            mac = mac_to_int(mac)
+        prefix = mac >> 24
+        vendor = self._memo.get(prefix, _UNKNOWN)
+        if vendor is _UNKNOWN:
+            vendor = self._memo[prefix] = self._search(prefix)
+        return vendor
+
+    def vendors_for(self, macs):
+        """Fabricante de cada MAC (inteiros, ex.: HostTable.macs), na mesma ordem."""
+        memo = self._memo
+        search = self._search
+        vendors = []
+        for mac in macs:
+            prefix = mac >> 24
+            vendor = memo.get(prefix, _UNKNOWN)
+            if vendor is _UNKNOWN:
+                vendor = memo[prefix] = search(prefix)
+            vendors.append(vendor)
+        return vendors
+
+
+def init_registry(app):
+    """
+    Compila OUI_SOURCE_PATH em OUI_REGISTRY_PATH se o registro compilado
+    não existir ou for mais antigo que o arquivo de origem.
+    """
+    source_path = app.config['OUI_SOURCE_PATH']
+    registry_path = app.config['OUI_REGISTRY_PATH']
+    if not source_path or not registry_path or not os.path.exists(source_path):
+        return
+    try:
+        if os.path.getmtime(registry_path) >= os.path.getmtime(source_path):
+            return
+    except OSError:
+        pass
+    try:
+        count = build([source_path], registry_path)
+    except (OSError, ValueError, csv.Error) as e:
+        app.logger.warning('Registro OUI não compilado de %s: %s', source_path, e)
+        return
+    app.logger.info('Registro OUI compilado: %d prefixos de %s', count, source_path)
+
+
+def main():
+    import argparse
+    import sys
+    import time
+    from src.config import Config
+
+    parser = argparse.ArgumentParser(description='Registro OUI (fabricante pelo prefixo do MAC).')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help='Compila oui.csv/oui.txt do IEEE')
+    build_parser.add_argument('sources', nargs='*', default=[Config.OUI_SOURCE_PATH],
+                              help='Arquivos do IEEE (padrão: OUI_SOURCE_PATH)')
+    lookup_parser = subparsers.add_parser('lookup', help='Consulta o fabricante de MACs')
+    lookup_parser.add_argument('macs', nargs='+')
+    parser.add_argument('--registry', default=Config.OUI_REGISTRY_PATH,
+                        help='Registro compilado (padrão: OUI_REGISTRY_PATH)')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        started = time.perf_counter()
+        count = build(args.sources, args.registry)
+        print(f'✅ {count} prefixo(s) gravado(s) em {args.registry} '
+              f'({os.path.getsize(args.registry) / 1024:.0f} KiB, {(time.perf_counter() - started) * 1000:.0f} ms)')
+        return
+
+    registry = OuiRegistry(args.registry)
+    for mac in args.macs:
+        try:
+            vendor = registry.vendor_for(mac)
+        except ValueError:
+            print(f'{mac}  MAC inválido', file=sys.stderr)
+            continue
+        print(f'{mac}  {vendor or "desconhecido"}')
+
+
+if __name__ == '__main__':
+    main()
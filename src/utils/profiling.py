@@ -0,0 +1,237 @@
+import io
+import os
+import re
+import threading
+import time
+import tracemalloc
+import uuid
+
+from flask import g, request
+from flask_login import current_user
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+except ImportError:  # pyinstrument é opcional: sem ele, usa cProfile
+    SamplingProfiler = None
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_QUERY_ARG = '_profile'
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+# Nomes aceitos para os arquivos gerados (evita path traversal no download)
+SAFE_NAME_RE = re.compile(r'^[\w.-]+$')
+
+
+class RequestProfiler:
+    """
+    Perfilamento sob demanda de requisições e snapshots periódicos de memória.
+
+    Um administrador (usuário listado em PROFILING_ADMINS) pede o perfil de
+    uma requisição com o cabeçalho "X-Profile: 1" ou o parâmetro ?_profile=1.
+    A requisição roda sob pyinstrument (amostragem, se instalado) ou cProfile
+    e o resultado é gravado em PROFILING_DIR com o ID da requisição no nome
+    (cabeçalho X-Request-ID, recebido do proxy ou gerado). Para os demais
+    usuários e requisições o custo é apenas a verificação do cabeçalho.
+
+    Com TRACEMALLOC_INTERVAL > 0, uma thread grava a cada intervalo um
+    snapshot do tracemalloc e a diferença em relação ao anterior.
+
+    Configuração:
+        - PROFILING_ADMINS: Usuários autorizados (padrão: nenhum)
+        - PROFILING_DIR: Diretório dos resultados (padrão: src/database/profiles)
+        - PROFILING_MAX_FILES: Arquivos mantidos; os mais antigos são
+          removidos (padrão: 100)
+        - TRACEMALLOC_INTERVAL: Segundos entre snapshots de memória (padrão: 0,
+          desligado)
+        - TRACEMALLOC_FRAMES: Quadros guardados por alocação (padrão: 10)
+    """
+
+    def __init__(self, app=None):
+        self.admins = frozenset()
+        self.directory = None
+        self.max_files = 100
+        self.tracemalloc_interval = 0
+        self.tracemalloc_frames = 10
+        self._busy = threading.Lock()
+        self._last_snapshot = None
+        self._thread = None
+        self._pid = None
+        self._thread_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PROFILING_ADMINS', [])
+        app.config.setdefault('PROFILING_DIR', os.path.join(
+            os.path.dirname(os.path.dirname(__file__)), 'database', 'profiles'))
+        app.config.setdefault('PROFILING_MAX_FILES', 100)
+        app.config.setdefault('TRACEMALLOC_INTERVAL', 0)
+        app.config.setdefault('TRACEMALLOC_FRAMES', 10)
+
+        self.admins = frozenset(app.config['PROFILING_ADMINS'])
+        self.directory = app.config['PROFILING_DIR']
+        self.max_files = app.config['PROFILING_MAX_FILES']
+        self.tracemalloc_interval = app.config['TRACEMALLOC_INTERVAL']
+        self.tracemalloc_frames = app.config['TRACEMALLOC_FRAMES']
+
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.extensions['profiler'] = self
+
+    def is_admin(self, user):
+        return bool(user and user.is_authenticated and user.username in self.admins)
+
+    def _requested(self):
+        return (request.headers.get(PROFILE_HEADER) == '1'
+                or request.args.get(PROFILE_QUERY_ARG) == '1')
+
+    def _start(self):
+        if self.tracemalloc_interval:
+            self._ensure_snapshot_thread()
+        if not self.admins or not self._requested() or not self.is_admin(current_user):
+            return
+        # Apenas um perfil por vez: o cProfile não aceita perfis simultâneos
+        if not self._busy.acquire(blocking=False):
+            g.profile_busy = True
+            return
+
+        g.request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        if SamplingProfiler is not None:
+            profiler = SamplingProfiler(async_mode='disabled')
+            profiler.start()
+        else:
+            import cProfile  # Importado apenas quando um perfil é pedido
+            profiler = cProfile.Profile()
+            profiler.enable()
+        g.profiler = profiler
+
+    def _finish(self, response):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            if g.pop('profile_busy', False):
+                response.headers[PROFILE_HEADER] = 'busy'
+            return response
+
+        try:
+            if SamplingProfiler is not None:
+                profiler.stop()
+            else:
+                profiler.disable()
+            name = self._save_profile(profiler, g.request_id)
+        finally:
+            self._busy.release()
+
+        response.headers[REQUEST_ID_HEADER] = g.request_id
+        response.headers[PROFILE_HEADER] = name
+        return response
+
+    def _base_name(self, kind, suffix):
+        now = time.time()
+        stamp = time.strftime('%Y%m%dT%H%M%S', time.localtime(now)) + f'{int(now * 1000) % 1000:03d}'
+        suffix = re.sub(r'[^\w-]', '_', suffix)[:64]
+        return f'{kind}_{stamp}_{suffix}'
+
+    def _save_profile(self, profiler, request_id):
+        os.makedirs(self.directory, exist_ok=True)
+        base = self._base_name('profile', request_id)
+        header = f'{request.method} {request.full_path}\nrequest_id: {request_id}\n\n'
+
+        if SamplingProfiler is not None:
+            with open(os.path.join(self.directory, f'{base}.html'), 'w') as f:
+                f.write(profiler.output_html())
+            text = profiler.output_text(unicode=True)
+            name = f'{base}.html'
+        else:
+            import pstats
+            profiler.dump_stats(os.path.join(self.directory, f'{base}.prof'))
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(50)
+            text = stream.getvalue()
+            name = f'{base}.prof'
+
+        with open(os.path.join(self.directory, f'{base}.txt'), 'w') as f:
+            f.write(header + text)
+        self._prune()
+        return name
+
+    def take_memory_snapshot(self):
+        """
+        Grava um snapshot do tracemalloc e um resumo com as maiores alocações
+        e o crescimento desde o snapshot anterior.
+
+        Returns:
+            str: Nome do arquivo .txt do resumo
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.tracemalloc_frames)
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+
+        os.makedirs(self.directory, exist_ok=True)
+        base = self._base_name('memory', str(os.getpid()))
+        snapshot.dump(os.path.join(self.directory, f'{base}.snapshot'))
+
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f'pid: {os.getpid()}', f'atual: {current / 1024:.1f} KiB, pico: {peak / 1024:.1f} KiB', '',
+                 'Maiores alocações:']
+        lines += [str(stat) for stat in snapshot.statistics('lineno')[:30]]
+        previous = self._last_snapshot
+        if previous is not None:
+            lines += ['', 'Crescimento desde o snapshot anterior:']
+            lines += [str(stat) for stat in snapshot.compare_to(previous, 'lineno')[:30]]
+        self._last_snapshot = snapshot
+
+        with open(os.path.join(self.directory, f'{base}.txt'), 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        self._prune()
+        return f'{base}.txt'
+
+    def list_files(self):
+        """Lista os resultados gravados, do mais recente para o mais antigo."""
+        if not self.directory or not os.path.isdir(self.directory):
+            return []
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and SAFE_NAME_RE.match(entry.name):
+                st = entry.stat()
+                files.append({
+                    'name': entry.name,
+                    'kind': entry.name.split('_', 1)[0],
+                    'size': st.st_size,
+                    'modified': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(st.st_mtime)),
+                })
+        return sorted(files, key=lambda f: (f['modified'], f['name']), reverse=True)
+
+    def _prune(self):
+        files = self.list_files()
+        for item in files[self.max_files:]:
+            try:
+                os.remove(os.path.join(self.directory, item['name']))
+            except FileNotFoundError:
+                pass
+
+    def _ensure_snapshot_thread(self):
+        # Uma thread por processo (após o fork do gunicorn, a do mestre não existe)
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._thread_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._last_snapshot = None
+            self._thread = threading.Thread(target=self._snapshot_loop, name='tracemalloc-snapshots', daemon=True)
+            self._thread.start()
+
+    def _snapshot_loop(self):
+        tracemalloc.start(self.tracemalloc_frames)
+        while True:
+            time.sleep(self.tracemalloc_interval)
+            try:
+                self.take_memory_snapshot()
+            except Exception as e:
+                print(f"Erro ao gravar snapshot de memória: {str(e)}")
+
+
+profiler = RequestProfiler()
@@ -0,0 +1,446 @@
+"""
+Cadastro das regras de IP (categoria, acesso, início e fim) em um arquivo
+JSON, no lugar da leitura das linhas checa_regra do ips_disponiveis.sh.
+
+Formato do arquivo (RULES_PATH):
+    {
+      "version": 1,
+      "rules": [
+        {"id": 1, "categoria": "Desktop", "acesso": "Internet NAT",
+         "inicio": "10.8.6.12", "fim": "10.8.7.185"}
+      ]
+    }
+
+As alterações (create_rule, update_rule, delete_rule) são serializadas entre
+processos por um flock em RULES_PATH + '.lock' e gravadas de forma atômica.
+Quem grava um host no dhcpd.conf mantém o mesmo lock, compartilhado, entre a
+verificação da regra do IP e a gravação (locked): uma regra não é excluída
+com um host sendo cadastrado no seu range.
+Cada regra é validada contra as subnets do dhcpd.conf e contra as demais
+regras: ranges sobrepostos são recusados. Para consulta, as regras são
+compiladas em um RuleIndex (busca binária por IP), mantido em cache por
+host_inventory.get_rule_index e recarregado quando o arquivo muda.
+
+Na primeira inicialização sem RULES_PATH, as regras são importadas do
+IPS_SCRIPT_PATH (init_rules). A importação também pode ser feita, ou
+refeita, pela linha de comando:
+    python -m src.utils.rule_store migrate [--force]
+    python -m src.utils.rule_store export > regras.sh   # linhas checa_regra
+
+Depois da importação, RULES_PATH é a fonte das regras: as alterações feitas
+pela API não são gravadas no ips_disponiveis.sh, que passa a divergir. Para
+atualizar o script, substitua as linhas checa_regra pela saída do export.
+"""
+import fcntl
+import json
+import os
+import re
+import sys
+from array import array
+from bisect import bisect_right
+from contextlib import contextmanager
+
+from dhcp_parser import parse_ip_ranges, ip_to_int, int_to_ip
+
+FORMAT_VERSION = 1
+RULE_FIELDS = ('categoria', 'acesso', 'inicio', 'fim')
+
+IP_FORMAT_RE = re.compile(r'^(\d{1,3}\.){3}\d{1,3}$')
+# Aspas e quebras de linha impediriam a exportação para linhas checa_regra
+INVALID_TEXT_RE = re.compile(r'["\\\x00-\x1f]')
+
+
+class RuleError(ValueError):
+    """Regra inválida; a mensagem é apresentada ao usuário."""
+
+
+class RuleNotFound(RuleError):
+    """Não existe regra com o ID informado."""
+
+
+class RuleInUse(RuleError):
+    """Há hosts com IP no range da regra (quantidade em hosts)."""
+
+    def __init__(self, message, hosts):
+        super().__init__(message)
+        self.hosts = hosts
+
+
+class RuleConflict(RuleError):
+    """O range da regra se sobrepõe ao de outras regras (em conflicts)."""
+
+    def __init__(self, message, conflicts):
+        super().__init__(message)
+        self.conflicts = conflicts
+
+
+def rule_label(rule):
+    """Rótulo 'categoria - acesso' de uma regra, como retornado pela API."""
+    return f"{rule['categoria']} - {rule['acesso']}"
+
+
+def load_rules(file_path):
+    """
+    Lê as regras do arquivo JSON.
+    Retorna uma lista de dicionários com 'id', 'categoria', 'acesso',
+    'inicio' e 'fim'.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        document = json.load(f)
+    if document.get('version') != FORMAT_VERSION:
+        raise RuleError(f'Versão do arquivo de regras não suportada: {document.get("version")}')
+    return [{'id': int(rule['id']), **{field: rule[field] for field in RULE_FIELDS}}
+            for rule in document['rules']]
+
+
+def save_rules(file_path, rules):
+    """Grava as regras de forma atômica (arquivo temporário + os.replace)."""
+    document = {'version': FORMAT_VERSION,
+                'rules': [{'id': rule['id'], **{field: rule[field] for field in RULE_FIELDS}} for rule in rules]}
+    tmp_path = f'{file_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    os.replace(tmp_path, file_path)
+
+
+@contextmanager
+def locked(file_path, shared=False):
+    """
+    Mantém o flock das regras. Exclusivo para alterá-las; compartilhado para
+    gravar hosts que dependem delas.
+    """
+    with open(f'{file_path}.lock', 'a') as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+
+
+def _parse_ip(value, field):
+    text = str(value or '').strip()
+    if not IP_FORMAT_RE.match(text):
+        raise RuleError(f'Endereço IP inválido em {field}: {text}')
+    try:
+        return ip_to_int(text)
+    except ValueError:
+        raise RuleError(f'Endereço IP inválido em {field}: {text}')
+
+
+def _parse_text(value, field):
+    text = str(value or '').strip()
+    if not text:
+        raise RuleError(f'O campo {field} é obrigatório')
+    if INVALID_TEXT_RE.search(text):
+        raise RuleError(f'O campo {field} contém caracteres não permitidos')
+    return text
+
+
+def subnet_ranges(subnets):
+    """Converte as subnets de get_subnets em tuplas (rede, broadcast) inteiras."""
+    ranges = []
+    for subnet in subnets:
+        network = ip_to_int(subnet['network'])
+        netmask = ip_to_int(subnet['netmask'])
+        ranges.append((network & netmask, (network & netmask) | (~netmask & 0xFFFFFFFF)))
+    return ranges
+
+
+def validate_rule(data, rules, subnets=(), rule_id=None):
+    """
+    Valida e normaliza uma regra.
+
+    Args:
+        data: dicionário com 'categoria', 'acesso', 'inicio' e 'fim'
+        rules: regras cadastradas, para a verificação de sobreposição
+        subnets: subnets do dhcpd.conf (get_subnets); o range deve estar
+            contido em uma delas, sem os endereços de rede e broadcast.
+            Sem subnets, a verificação é ignorada
+        rule_id: ID da regra sendo alterada, ignorada na sobreposição
+
+    Returns:
+        dict com os quatro campos normalizados
+
+    Raises:
+        RuleError, ou RuleConflict se o range se sobrepuser a outras regras
+    """
+    if not isinstance(data, dict):
+        raise RuleError('Dados JSON são obrigatórios')
+    categoria = _parse_text(data.get('categoria'), 'categoria')
+    acesso = _parse_text(data.get('acesso'), 'acesso')
+    start = _parse_ip(data.get('inicio'), 'inicio')
+    end = _parse_ip(data.get('fim'), 'fim')
+    if start > end:
+        raise RuleError('O IP inicial deve ser menor ou igual ao IP final')
+
+    ranges = subnet_ranges(subnets)
+    if ranges and not any(network < start and end < broadcast for network, broadcast in ranges):
+        raise RuleError(f'O range {int_to_ip(start)} - {int_to_ip(end)} não está contido em nenhuma '
+                        f'subnet do dhcpd.conf (excluídos os endereços de rede e broadcast)')
+
+    conflicts = [rule for rule in rules
+                 if rule.get('id') != rule_id
+                 and start <= ip_to_int(rule['fim']) and ip_to_int(rule['inicio']) <= end]
+    if conflicts:
+        names = ', '.join(f"{rule_label(rule)} ({rule['inicio']} - {rule['fim']})" for rule in conflicts)
+        raise RuleConflict(f'O range {int_to_ip(start)} - {int_to_ip(end)} se sobrepõe a: {names}', conflicts)
+
+    return {'categoria': categoria, 'acesso': acesso, 'inicio': int_to_ip(start), 'fim': int_to_ip(end)}
+
+
+def find_overlaps(rules):
+    """Pares de regras com ranges sobrepostos."""
+    ordered = sorted(rules, key=lambda rule: ip_to_int(rule['inicio']))
+    overlaps = []
+    for i, rule in enumerate(ordered):
+        end = ip_to_int(rule['fim'])
+        for other in ordered[i + 1:]:
+            if ip_to_int(other['inicio']) > end:
+                break
+            overlaps.append((rule, other))
+    return overlaps
+
+
+def create_rule(file_path, data, subnets=()):
+    """Cadastra uma regra e a retorna com o ID atribuído."""
+    with locked(file_path):
+        rules = load_rules(file_path)
+        rule = {'id': max((rule['id'] for rule in rules), default=0) + 1,
+                **validate_rule(data, rules, subnets)}
+        save_rules(file_path, rules + [rule])
+    return rule
+
+
+def update_rule(file_path, rule_id, data, subnets=()):
+    """
+    Altera uma regra. Campos ausentes em data mantêm o valor atual.
+
+    Returns:
+        tupla (regra anterior, regra alterada)
+    """
+    with locked(file_path):
+        rules = load_rules(file_path)
+        position = _position(rules, rule_id)
+        old = rules[position]
+        new = {'id': rule_id, **validate_rule({**old, **data}, rules, subnets, rule_id)}
+        rules[position] = new
+        save_rules(file_path, rules)
+    return old, new
+
+
+def delete_rule(file_path, rule_id, count_hosts=None):
+    """
+    Exclui uma regra e a retorna.
+
+    Args:
+        count_hosts: função (início, fim) -> quantidade de hosts no range,
+            chamada com o lock: se houver hosts, a regra não é excluída
+            (RuleInUse)
+    """
+    with locked(file_path):
+        rules = load_rules(file_path)
+        position = _position(rules, rule_id)
+        rule = rules[position]
+        if count_hosts is not None:
+            in_use = count_hosts(ip_to_int(rule['inicio']), ip_to_int(rule['fim']))
+            if in_use:
+                raise RuleInUse(f'{in_use} host(s) usam IPs desta regra; use force=true para excluir mesmo assim',
+                                in_use)
+        del rules[position]
+        save_rules(file_path, rules)
+    return rule
+
+
+def _position(rules, rule_id):
+    for position, rule in enumerate(rules):
+        if rule['id'] == rule_id:
+            return position
+    raise RuleNotFound(f'Regra {rule_id} não encontrada')
+
+
+def import_script(script_path, subnets=()):
+    """
+    Converte as linhas checa_regra do ips_disponiveis.sh em regras,
+    validando cada uma como em create_rule.
+
+    Returns:
+        tupla (regras válidas com IDs sequenciais, lista de mensagens das
+        linhas recusadas)
+    """
+    rules = []
+    problems = []
+    for rule in parse_ip_ranges(script_path):
+        try:
+            rules.append({'id': len(rules) + 1, **validate_rule(rule, rules, subnets)})
+        except RuleError as e:
+            problems.append(f"checa_regra {rule_label(rule)} ({rule['inicio']} - {rule['fim']}): {e}")
+    return rules, problems
+
+
+def migrate(script_path, file_path, subnets=(), force=False):
+    """
+    Importa as regras do script para o arquivo JSON. Só grava se o arquivo
+    ainda não existir (ou com force) e se todas as linhas forem válidas (ou
+    com force, gravando apenas as válidas).
+
+    Returns:
+        tupla (regras gravadas, ou None se nada foi gravado, e mensagens das
+        linhas recusadas)
+    """
+    with locked(file_path):
+        if os.path.exists(file_path) and not force:
+            return None, []
+        rules, problems = import_script(script_path, subnets)
+        if problems and not force:
+            return None, problems
+        save_rules(file_path, rules)
+    return rules, problems
+
+
+def export_script_lines(rules):
+    """Linhas checa_regra equivalentes às regras, para o ips_disponiveis.sh."""
+    return [f'checa_regra "{rule["categoria"]}" "{rule["acesso"]}" "{rule["inicio"]}" "{rule["fim"]}"'
+            for rule in rules]
+
+
+class RuleIndex:
+    """
+    Regras compiladas para busca por IP: intervalos disjuntos ordenados pelo
+    início, com a posição da regra dona de cada um, consultados por busca
+    binária. Se houver sobreposição (arquivo editado à mão), vale a primeira
+    regra do arquivo, como na busca linear anterior.
+    """
+
+    __slots__ = ('rules', 'labels', 'starts', 'ends', 'owners')
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.labels = [sys.intern(rule_label(rule)) for rule in rules]
+        bounds = [(ip_to_int(rule['inicio']), ip_to_int(rule['fim']), position)
+                  for position, rule in enumerate(rules)]
+        if find_overlaps(rules):
+            bounds = self._split(bounds)
+        bounds.sort()
+        self.starts = array('I', (start for start, _, _ in bounds))
+        self.ends = array('I', (end for _, end, _ in bounds))
+        self.owners = array('i', (position for _, _, position in bounds))
+
+    @staticmethod
+    def _split(bounds):
+        # Divide os ranges nos pontos de início e fim de todas as regras; cada
+        # trecho fica com a primeira regra que o cobre
+        points = sorted({start for start, _, _ in bounds} | {end + 1 for _, end, _ in bounds})
+        pieces = []
+        for start, next_start in zip(points, points[1:]):
+            for rule_start, rule_end, position in bounds:
+                if rule_start <= start and next_start - 1 <= rule_end:
+                    pieces.append((start, next_start - 1, position))
+                    break
+        return pieces
+
+    def __len__(self):
+        return len(self.rules)
+
+    def find(self, ip):
+        """Posição em rules da regra que contém o IP (inteiro), ou -1."""
+        i = bisect_right(self.starts, ip) - 1
+        if i >= 0 and ip <= self.ends[i]:
+            return self.owners[i]
+        return -1
+
+    def rule_for(self, ip_address):
+        """Regra que contém o IP (texto), ou None."""
+        position = self.find(ip_to_int(ip_address))
+        return self.rules[position] if position >= 0 else None
+
+    def label_for(self, ip_address):
+        """Rótulo da regra que contém o IP (texto), ou 'N/A'."""
+        position = self.find(ip_to_int(ip_address))
+        return self.labels[position] if position >= 0 else 'N/A'
+
+    def labels_for(self, ips):
+        """Rótulo da regra de cada IP (inteiros), ou 'N/A'."""
+        labels = self.labels + ['N/A']
+        return [labels[self.find(ip)] for ip in ips]
+
+
+def init_rules(app):
+    """
+    Importa as regras do IPS_SCRIPT_PATH se RULES_PATH ainda não existir
+    (primeira inicialização após a adoção do cadastro de regras).
+    """
+    rules_path = app.config['RULES_PATH']
+    script_path = app.config['IPS_SCRIPT_PATH']
+    if os.path.exists(rules_path) or not os.path.exists(script_path):
+        return
+    try:
+        subnets = _conf_subnets(app.config['DHCP_CONF_PATH'])
+        rules, problems = migrate(script_path, rules_path, subnets)
+    except OSError as e:
+        app.logger.warning('Regras de IP não importadas de %s: %s', script_path, e)
+        return
+    for problem in problems:
+        app.logger.warning('Regra de IP não importada: %s', problem)
+    if rules is not None:
+        app.logger.info('%d regras de IP importadas de %s para %s', len(rules), script_path, rules_path)
+    elif problems:
+        app.logger.error('Regras de IP não importadas; corrija as linhas acima ou execute '
+                         'python -m src.utils.rule_store migrate --force')
+
+
+def _conf_subnets(dhcp_conf_path):
+    from dhcp_parser import get_subnets
+    try:
+        return get_subnets(dhcp_conf_path)
+    except OSError:
+        return []
+
+
+def main():
+    import argparse
+    from src.config import Config
+
+    parser = argparse.ArgumentParser(description='Cadastro de regras de IP.')
+    parser.add_argument('command', choices=['migrate', 'export', 'check'],
+                        help='migrate: importa as linhas checa_regra; export: imprime as regras como '
+                             'linhas checa_regra; check: valida o arquivo de regras')
+    parser.add_argument('--rules', default=Config.RULES_PATH, help='Arquivo JSON de regras (padrão: RULES_PATH)')
+    parser.add_argument('--script', default=Config.IPS_SCRIPT_PATH,
+                        help='Script com as linhas checa_regra (padrão: IPS_SCRIPT_PATH)')
+    parser.add_argument('--conf', default=Config.DHCP_CONF_PATH,
+                        help='dhcpd.conf com as subnets (padrão: DHCP_CONF_PATH)')
+    parser.add_argument('--force', action='store_true',
+                        help='migrate: sobrescreve o arquivo existente e ignora as linhas inválidas')
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        print('\n'.join(export_script_lines(load_rules(args.rules))))
+        return
+
+    subnets = _conf_subnets(args.conf)
+    if args.command == 'check':
+        problems = []
+        checked = []
+        for rule in load_rules(args.rules):
+            try:
+                validate_rule(rule, checked, subnets)
+            except RuleError as e:
+                problems.append(f"Regra {rule['id']} ({rule_label(rule)}): {e}")
+            checked.append(rule)
+        for problem in problems:
+            print(f'❌ {problem}')
+        if problems:
+            sys.exit(1)
+        print(f'✅ {len(checked)} regra(s) válida(s) em {args.rules}')
+        return
+
+    rules, problems = migrate(args.script, args.rules, subnets, args.force)
+    for problem in problems:
+        print(f'❌ {problem}')
+    if rules is None:
+        if not problems:
+            print(f'{args.rules} já existe; use --force para importar novamente')
+        sys.exit(1)
+    print(f'✅ {len(rules)} regra(s) importada(s) de {args.script} para {args.rules}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+from sqlalchemy import event
+
+# Perfis de configuração do SQLite. Cada perfil define os PRAGMAs aplicados a
+# toda conexão nova do pool.
+PROFILES = {
+    # Comportamento padrão do SQLite: rollback journal e synchronous=FULL.
+    # Escritas bloqueiam leitores e concorrência gera "database is locked".
+    'default': {},
+    # WAL: leitores não bloqueiam o escritor (e vice-versa). synchronous=NORMAL
+    # é seguro com WAL (uma queda de energia pode perder apenas as últimas
+    # transações, nunca corromper o banco) e evita um fsync por commit.
+    'wal': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'cache_size': -16000,  # Em KiB quando negativo (16 MiB por conexão)
+        'mmap_size': 134217728,
+        'temp_store': 'MEMORY',
+    },
+}
+
+DEFAULT_PROFILE = 'wal'
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    """Executa os PRAGMAs em uma conexão sqlite3."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+
+def engine_options(app):
+    """
+    Monta as opções do engine SQLAlchemy para o perfil configurado.
+
+    Configuração:
+        - DB_PROFILE: Nome do perfil em PROFILES (padrão: 'wal')
+        - DB_POOL_SIZE: Conexões mantidas no pool (padrão: 10)
+        - DB_MAX_OVERFLOW: Conexões extras permitidas em picos (padrão: 10)
+        - DB_POOL_TIMEOUT: Espera máxima, em segundos, por uma conexão (padrão: 30)
+    """
+    pragmas = PROFILES[app.config['DB_PROFILE']]
+    options = {
+        'pool_size': app.config['DB_POOL_SIZE'],
+        'max_overflow': app.config['DB_MAX_OVERFLOW'],
+        'pool_timeout': app.config['DB_POOL_TIMEOUT'],
+    }
+    if 'busy_timeout' in pragmas:
+        # Mesmo valor para o busy handler do módulo sqlite3
+        options['connect_args'] = {'timeout': pragmas['busy_timeout'] / 1000}
+    return options
+
+
+def init_db(app, db):
+    """
+    Inicializa o Flask-SQLAlchemy com o perfil SQLite configurado: define as
+    opções de pool antes da criação do engine e registra os PRAGMAs do perfil
+    para cada nova conexão.
+    """
+    app.config.setdefault('DB_PROFILE', DEFAULT_PROFILE)
+    app.config.setdefault('DB_POOL_SIZE', 10)
+    app.config.setdefault('DB_MAX_OVERFLOW', 10)
+    app.config.setdefault('DB_POOL_TIMEOUT', 30)
+
+    if app.config['DB_PROFILE'] not in PROFILES:
+        raise ValueError(f"Perfil de banco desconhecido: {app.config['DB_PROFILE']}")
+
+    options = engine_options(app)
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+    db.init_app(app)
+
+    pragmas = PROFILES[app.config['DB_PROFILE']]
+    if pragmas:
+        with app.app_context():
+            event.listen(
+                db.engine, 'connect',
+                lambda dbapi_connection, connection_record: apply_pragmas(dbapi_connection, pragmas)
+            )
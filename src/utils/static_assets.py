@@ -0,0 +1,234 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+
+from flask import abort, request, send_file
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele, apenas gzip
+    brotli = None
+
+MANIFEST_NAME = 'manifest.json'
+
+# Diretório (relativo à saída) dos arquivos com hash no nome. Tudo que está
+# nele é imutável e pode ser guardado em cache pelo navegador por um ano.
+ASSETS_DIR = 'assets'
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Arquivos da pasta static que não são publicados
+IGNORED_SUFFIXES = ('_bck', '.bak', '~')
+
+# Variantes comprimidas só são mantidas acima deste tamanho e quando
+# economizam ao menos 10%
+MIN_COMPRESS_SIZE = 256
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json',
+                      'image/svg+xml', 'image/x-icon', 'image/vnd.microsoft.icon')
+
+INLINE_BLOCK_RE = re.compile(r'<(style|script)>(.*?)</\1>', re.DOTALL)
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def extract_inline_assets(html, stem='index'):
+    """
+    Move os blocos <style> e <script> inline de um HTML para arquivos com o
+    hash do conteúdo no nome.
+
+    Returns:
+        tupla (html reescrito, dict {caminho relativo: bytes})
+    """
+    assets = {}
+
+    def replace(match):
+        tag, content = match.group(1), match.group(2)
+        data = content.strip().encode('utf-8') + b'\n'
+        extension = 'css' if tag == 'style' else 'js'
+        name = f'{ASSETS_DIR}/{stem}-{len(assets)}.{_digest(data)[:12]}.{extension}'
+        assets[name] = data
+        if tag == 'style':
+            return f'<link rel="stylesheet" href="/{name}">'
+        return f'<script src="/{name}"></script>'
+
+    return INLINE_BLOCK_RE.sub(replace, html), assets
+
+
+def _compressed_variants(data, mimetype):
+    if len(data) < MIN_COMPRESS_SIZE or not mimetype or not mimetype.startswith(COMPRESSIBLE_TYPES):
+        return {}
+    variants = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(data, quality=11)
+    return {encoding: compressed for encoding, compressed in variants.items()
+            if len(compressed) < len(data) * 0.9}
+
+
+def build(source_dir, output_dir):
+    """
+    Gera a versão publicada da pasta static em output_dir: CSS/JS inline do
+    index.html extraídos para arquivos com hash, variantes .gz (e .br, se o
+    módulo brotli estiver instalado) e o manifest.json lido pelo servidor.
+
+    Returns:
+        dict: O manifesto gerado
+    """
+    files = {}
+    for name in sorted(os.listdir(source_dir)):
+        path = os.path.join(source_dir, name)
+        if not os.path.isfile(path) or name.endswith(IGNORED_SUFFIXES):
+            continue
+        with open(path, 'rb') as f:
+            data = f.read()
+        if name.endswith('.html'):
+            html, assets = extract_inline_assets(data.decode('utf-8'), stem=os.path.splitext(name)[0])
+            data = html.encode('utf-8')
+            files.update(assets)
+        files[name] = data
+
+    if os.path.isdir(output_dir):
+        shutil.rmtree(output_dir)
+
+    manifest = {}
+    for name, data in files.items():
+        mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        _write(os.path.join(output_dir, name), data)
+        encodings = {}
+        for encoding, compressed in _compressed_variants(data, mimetype).items():
+            variant = f"{name}.{'br' if encoding == 'br' else 'gz'}"
+            _write(os.path.join(output_dir, variant), compressed)
+            encodings[encoding] = variant
+        manifest[name] = {
+            'file': name,
+            'mimetype': mimetype,
+            'etag': _digest(data)[:32],
+            'size': len(data),
+            'immutable': name.startswith(ASSETS_DIR + '/'),
+            'encodings': encodings,
+        }
+
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def scan_manifest(folder):
+    """Manifesto mínimo da pasta static, sem build (sem compressão nem hash)."""
+    manifest = {}
+    for name in sorted(os.listdir(folder)):
+        if os.path.isfile(os.path.join(folder, name)) and not name.endswith(IGNORED_SUFFIXES):
+            manifest[name] = {
+                'file': name,
+                'mimetype': mimetypes.guess_type(name)[0] or 'application/octet-stream',
+                'etag': None,
+                'immutable': False,
+                'encodings': {},
+            }
+    return manifest
+
+
+class StaticAssets:
+    """
+    Serve a SPA a partir de um manifesto em memória, sem consultar o sistema
+    de arquivos para decidir o que existe.
+
+    Com o build (python -m src.utils.static_assets) usa os arquivos gerados:
+    variante comprimida escolhida pelo Accept-Encoding, cache imutável de um
+    ano para os arquivos com hash e revalidação por ETag para o index.html.
+    Sem o build, serve a pasta static original como antes.
+
+    Configuração:
+        - STATIC_BUILD_DIR: Saída do build (padrão: src/static_build)
+    """
+
+    def __init__(self, app=None):
+        self.folder = None
+        self.manifest = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('STATIC_BUILD_DIR', os.path.join(
+            os.path.dirname(os.path.dirname(__file__)), 'static_build'))
+
+        manifest_path = os.path.join(app.config['STATIC_BUILD_DIR'], MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r') as f:
+                self.manifest = json.load(f)
+            self.folder = app.config['STATIC_BUILD_DIR']
+        elif app.static_folder and os.path.isdir(app.static_folder):
+            self.manifest = scan_manifest(app.static_folder)
+            self.folder = app.static_folder
+        app.extensions['static_assets'] = self
+
+    def send(self, path):
+        """
+        Responde com o arquivo do manifesto, ou com o index.html para as rotas
+        da SPA. Arquivos com hash inexistentes (build antigo) geram 404.
+        """
+        entry = self.manifest.get(path)
+        if entry is None:
+            if path.startswith(ASSETS_DIR + '/'):
+                abort(404)
+            entry = self.manifest.get('index.html')
+            if entry is None:
+                return "index.html not found", 404
+
+        file_name, encoding = entry['file'], None
+        for candidate in ('br', 'gzip'):
+            if candidate in entry['encodings'] and request.accept_encodings[candidate]:
+                file_name, encoding = entry['encodings'][candidate], candidate
+                break
+
+        etag = True
+        if entry['etag']:
+            etag = f"{entry['etag']}-{encoding}" if encoding else entry['etag']
+        # Sem max_age o send_file responde com "no-cache": o navegador revalida
+        # o index.html (e os arquivos sem hash) pelo ETag a cada navegação
+        response = send_file(os.path.join(self.folder, file_name), mimetype=entry['mimetype'],
+                             etag=etag, conditional=True,
+                             max_age=IMMUTABLE_MAX_AGE if entry['immutable'] else None)
+
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if entry['encodings']:
+            response.vary.add('Accept-Encoding')
+        if entry['immutable']:
+            response.cache_control.immutable = True
+        return response
+
+
+static_assets = StaticAssets()
+
+
+def main():
+    import argparse
+
+    base_dir = os.path.dirname(os.path.dirname(__file__))
+    parser = argparse.ArgumentParser(description='Gera os arquivos estáticos publicados (hash + compressão).')
+    parser.add_argument('--source', default=os.path.join(base_dir, 'static'))
+    parser.add_argument('--output', default=os.path.join(base_dir, 'static_build'))
+    args = parser.parse_args()
+
+    manifest = build(args.source, args.output)
+    original = sum(entry['size'] for entry in manifest.values())
+    gzipped = sum(os.path.getsize(os.path.join(args.output, entry['encodings'].get('gzip', entry['file'])))
+                  for entry in manifest.values())
+    print(f"✅ {len(manifest)} arquivo(s) em {args.output} "
+          f"({original / 1024:.1f} KiB, {gzipped / 1024:.1f} KiB com gzip"
+          f"{'' if brotli else '; brotli não instalado'})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from src.models.user import db, User
+
+
+class UserCache:
+    """
+    Cache por processo dos usuários carregados pelo Flask-Login.
+
+    Guarda os valores das colunas de cada usuário (LRU com TTL) e devolve uma
+    instância User nova e desanexada da sessão a cada chamada, evitando uma
+    consulta ao SQLite por requisição autenticada.
+
+    Alterações de usuários devem chamar invalidate(). Além de limpar o cache
+    local, isso atualiza o arquivo de geração, que os demais workers (e o
+    create_user.py) comparam a cada consulta para descartar seus caches.
+
+    Configuração:
+        - USER_CACHE_SIZE: Máximo de usuários em cache (padrão: 256)
+        - USER_CACHE_TTL: Validade de cada entrada, em segundos (padrão: 60)
+        - USER_CACHE_GENERATION_FILE: Arquivo de geração compartilhado
+    """
+
+    def __init__(self, app=None):
+        self.max_size = 256
+        self.ttl = 60
+        self.generation_file = None
+        self._entries = OrderedDict()
+        self._generation = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('USER_CACHE_SIZE', 256)
+        app.config.setdefault('USER_CACHE_TTL', 60)
+        app.config.setdefault('USER_CACHE_GENERATION_FILE', os.path.join(
+            os.path.dirname(os.path.dirname(__file__)), 'database', 'user_cache.gen'))
+
+        self.max_size = app.config['USER_CACHE_SIZE']
+        self.ttl = app.config['USER_CACHE_TTL']
+        self.generation_file = app.config['USER_CACHE_GENERATION_FILE']
+        app.extensions['user_cache'] = self
+
+    def get(self, user_id):
+        """Retorna o usuário com o ID informado, ou None se não existir."""
+        now = time.monotonic()
+        generation = self._read_generation()
+
+        with self._lock:
+            if generation != self._generation:
+                self._entries.clear()
+                self._generation = generation
+
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                return User(**entry[1])
+
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+
+        values = {column.name: getattr(user, column.name) for column in User.__table__.columns}
+        with self._lock:
+            if generation == self._generation:
+                self._entries[user_id] = (now + self.ttl, values)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return user
+
+    def invalidate(self, user_id=None):
+        """
+        Descarta um usuário (ou todos, sem user_id) do cache deste processo e
+        sinaliza a alteração para os demais processos.
+        """
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+        self._bump_generation()
+
+    def _read_generation(self):
+        if not self.generation_file:
+            return None
+        try:
+            st = os.stat(self.generation_file)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _bump_generation(self):
+        if not self.generation_file:
+            return
+        # Grava em um arquivo temporário e substitui, o que troca o inode e
+        # garante uma assinatura nova mesmo com mtime de baixa resolução
+        tmp_path = f'{self.generation_file}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(f'{time.time_ns()}\n')
+        os.replace(tmp_path, self.generation_file)
+
+
+user_cache = UserCache()
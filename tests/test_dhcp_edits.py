@@ -0,0 +1,119 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+from dhcp_parser import parse_hosts
+from src.main import create_app, init_database
+from src.models.user import db
+from src.utils import host_changes, host_inventory
+from src.utils.rule_store import save_rules
+
+OLD_HOSTS = 40
+NEW_HOSTS = 40
+
+
+def conf_text(hosts):
+    blocks = ''.join(
+        f'  host {name} {{\n    hardware ethernet {mac};\n    fixed-address {ip};\n  }}\n'
+        for name, mac, ip in hosts)
+    return f'subnet 10.0.0.0 netmask 255.255.0.0 {{\n  option routers 10.0.0.1;\n{blocks}}}\n'
+
+
+def old_host(i):
+    return (f'antigo_{i}', f'AA:BB:CC:00:00:{i:02X}', f'10.0.1.{i + 1}')
+
+
+def new_host(i):
+    return (f'novo_{i}', f'AA:BB:CC:00:01:{i:02X}', f'10.0.2.{i + 1}')
+
+
+def run_worker(app, action, queue):
+    # Como um worker do gunicorn: conexões próprias, abertas após o fork
+    with app.app_context():
+        db.engine.dispose(close=False)
+    client = app.test_client()
+    statuses = []
+    for i in range(OLD_HOSTS if action == 'delete' else NEW_HOSTS):
+        if action == 'delete':
+            response = client.delete(f'/api/dhcp/hosts/{old_host(i)[0]}')
+        else:
+            name, mac, ip = new_host(i)
+            response = client.post('/api/dhcp/register',
+                                   json={'host_name': name, 'mac_address': mac, 'ip_address': ip})
+        statuses.append(response.status_code)
+    queue.put(statuses)
+
+
+class ConcurrentEditsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.conf_path = os.path.join(self.workdir.name, 'dhcpd.conf')
+        with open(self.conf_path, 'w') as f:
+            f.write(conf_text([old_host(i) for i in range(OLD_HOSTS)]))
+        rules_path = os.path.join(self.workdir.name, 'ip_rules.json')
+        save_rules(rules_path, [{'id': 1, 'categoria': 'Desktop', 'acesso': 'Internet NAT',
+                                 'inicio': '10.0.0.2', 'fim': '10.0.255.254'}])
+        os.environ['SANDBOX_ENV'] = 'true'
+        self.app = create_app({
+            'SECRET_KEY': 'test',
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(self.workdir.name, 'app.db')}",
+            'HOST_CHANGES_DB': os.path.join(self.workdir.name, 'host_changes.db'),
+            'DHCP_CONF_PATH': self.conf_path,
+            'RULES_PATH': rules_path,
+            'AUDIT_SYNC': True,
+            'LOGIN_DISABLED': True,
+        })
+        init_database(self.app)
+
+    def tearDown(self):
+        os.environ.pop('SANDBOX_ENV', None)
+        host_changes.configure(None)
+        host_inventory.invalidate()
+        self.workdir.cleanup()
+
+    def test_concurrent_register_and_delete_keep_the_file_intact(self):
+        context = multiprocessing.get_context('fork')
+        queue = context.Queue()
+        processes = [context.Process(target=run_worker, args=(self.app, action, queue))
+                     for action in ('delete', 'register')]
+        for process in processes:
+            process.start()
+        statuses = [queue.get(timeout=60) for _ in processes]
+        for process in processes:
+            process.join(10)
+            self.assertEqual(process.exitcode, 0)
+        self.assertEqual(sorted(status for result in statuses for status in result),
+                         [200] * (OLD_HOSTS + NEW_HOSTS))
+
+        hosts = parse_hosts(self.conf_path)
+        self.assertEqual(sorted(host.name for host in hosts),
+                         sorted(new_host(i)[0] for i in range(NEW_HOSTS)))
+        for name, mac, ip in map(new_host, range(NEW_HOSTS)):
+            host = hosts.find(name)
+            self.assertEqual((host.mac_address, host.ip_address), (mac, ip))
+        with open(self.conf_path) as f:
+            content = f.read()
+        # Todos os blocos dentro do subnet, que continua fechado no fim
+        self.assertTrue(content.startswith('subnet 10.0.0.0 netmask 255.255.0.0 {\n  option routers 10.0.0.1;\n'))
+        self.assertEqual(content.rstrip()[-1], '}')
+        self.assertEqual(content.count('{'), content.count('}'))
+        self.assertEqual(content.count('{'), NEW_HOSTS + 1)
+
+    def test_rule_in_use_is_not_deleted(self):
+        client = self.app.test_client()
+        response = client.delete('/api/dhcp/rules/1')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json['hosts'], OLD_HOSTS)
+
+        response = client.delete('/api/dhcp/rules/1', query_string={'force': 'true'})
+        self.assertEqual(response.status_code, 200)
+        name, mac, ip = new_host(0)
+        response = client.post('/api/dhcp/register', json={'host_name': name, 'mac_address': mac, 'ip_address': ip})
+        self.assertEqual(response.status_code, 400)
+        self.assertIsNone(parse_hosts(self.conf_path).find(name))
+
+
+if __name__ == '__main__':
+    unittest.main()
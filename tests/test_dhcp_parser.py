@@ -0,0 +1,24 @@
+import os
+import tempfile
+import unittest
+
+from dhcp_parser import parse_hosts
+
+
+class ParseHostsTest(unittest.TestCase):
+
+    def test_malformed_mac_skips_only_its_block(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            conf_path = os.path.join(workdir, 'dhcpd.conf')
+            with open(conf_path, 'w') as f:
+                f.write('host ruim {\n  hardware ethernet :::::::::::::::::;\n  fixed-address 10.0.0.1;\n}\n'
+                        'host ruim_2 {\n  # sem MAC no início\n  hardware ethernet AABBCCDDEEFF:::::;\n'
+                        '  fixed-address 10.0.0.2;\n}\n'
+                        'host bom {\n  hardware ethernet aa:bb:cc:dd:ee:ff;\n  fixed-address 10.0.0.3;\n}\n')
+            hosts = parse_hosts(conf_path)
+        self.assertEqual([host.name for host in hosts], ['bom'])
+        self.assertEqual(hosts[0].mac_address, 'AA:BB:CC:DD:EE:FF')
+
+
+if __name__ == '__main__':
+    unittest.main()
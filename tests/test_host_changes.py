@@ -0,0 +1,95 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+from dhcp_parser import HostRecord
+from src.utils import host_changes, host_inventory
+
+HOSTS = [('h1', 'AA:BB:CC:00:00:01', '10.0.0.1'), ('h2', 'AA:BB:CC:00:00:02', '10.0.0.2')]
+
+
+def write_conf(conf_path, hosts):
+    with open(conf_path, 'w') as f:
+        for name, mac, ip in hosts:
+            f.write(f'host {name} {{\n  hardware ethernet {mac};\n  fixed-address {ip};\n}}\n')
+    host_inventory.invalidate(conf_path)
+
+
+def update_host(conf_path, hosts, index, ip):
+    """Grava o arquivo com o IP de um host alterado, como as rotas de DHCP."""
+    host_changes.sync_with_file(conf_path)
+    name, mac, _ = hosts[index]
+    hosts[index] = (name, mac, ip)
+    write_conf(conf_path, hosts)
+    host_changes.record_upsert(conf_path, HostRecord.from_strings(name, mac, ip))
+
+
+def worker_a(conf_path, queue):
+    hosts = list(HOSTS)
+    update_host(conf_path, hosts, 0, '10.0.0.11')
+    queue.put(host_changes.current_version())
+
+
+class HostChangesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.conf_path = os.path.join(self.workdir.name, 'dhcpd.conf')
+        host_changes.configure(os.path.join(self.workdir.name, 'host_changes.db'))
+        write_conf(self.conf_path, HOSTS)
+        # Como o warm_caches do gunicorn --preload, antes do fork
+        host_changes.sync_with_file(self.conf_path)
+
+    def tearDown(self):
+        host_changes.configure(None)
+        host_inventory.invalidate()
+        self.workdir.cleanup()
+
+    def test_versions_are_shared_between_workers(self):
+        context = multiprocessing.get_context('fork')
+        queue = context.Queue()
+        process = context.Process(target=worker_a, args=(self.conf_path, queue))
+        process.start()
+        version_a = queue.get(timeout=10)
+        process.join(10)
+        self.assertEqual(process.exitcode, 0)
+
+        # Este processo (worker B) não viu a alteração de A e altera h2
+        hosts = [('h1', 'AA:BB:CC:00:00:01', '10.0.0.11'), HOSTS[1]]
+        update_host(self.conf_path, hosts, 1, '10.0.0.22')
+
+        delta = host_changes.changes_since(version_a)
+        self.assertIsNotNone(delta)
+        self.assertEqual([host['name'] for host in delta['upserted']], ['h2'])
+        self.assertEqual(delta['upserted'][0]['ip_address'], '10.0.0.22')
+        self.assertEqual(delta['version'], host_changes.current_version())
+        self.assertGreater(delta['version'], version_a)
+
+    def test_external_edit_is_recorded_once(self):
+        version = host_changes.current_version()
+        write_conf(self.conf_path, [HOSTS[1]])
+        host_changes.sync_with_file(self.conf_path)
+        host_changes.sync_with_file(self.conf_path)
+
+        delta = host_changes.changes_since(version)
+        self.assertEqual(delta['removed'], ['h1'])
+        self.assertEqual(delta['upserted'], [])
+        self.assertEqual(delta['version'], version + 1)
+
+    def test_unknown_previous_state_forces_full_inventory(self):
+        version = host_changes.current_version()
+        # Processo novo (sem o estado anterior) encontra o arquivo alterado
+        host_changes.configure(None)
+        host_changes.configure(os.path.join(self.workdir.name, 'host_changes.db'))
+        write_conf(self.conf_path, [HOSTS[0]])
+        host_changes.sync_with_file(self.conf_path)
+
+        self.assertIsNone(host_changes.changes_since(version))
+        current = host_changes.current_version()
+        self.assertEqual(host_changes.changes_since(current),
+                         {'version': current, 'upserted': [], 'removed': []})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+import statistics
+import unittest
+
+from benchmarks.import_budget import BUDGETS, forbidden_imports, measure
+
+REPEAT = 3
+
+
+class ImportBudgetTest(unittest.TestCase):
+
+    def check(self, target):
+        budget, prefixes = BUDGETS[target]
+        runs = [measure(target) for _ in range(REPEAT)]
+        self.assertIn(target, runs[0][1])
+        self.assertEqual(forbidden_imports(runs[0][1], prefixes), [])
+        elapsed = statistics.median(run[0] for run in runs)
+        self.assertLessEqual(elapsed, budget, f'{target}: {elapsed:.1f} ms')
+
+    def test_main_module(self):
+        self.check('src.main')
+
+    def test_create_user(self):
+        self.check('create_user')
+
+
+if __name__ == '__main__':
+    unittest.main()
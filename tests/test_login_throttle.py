@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+from src.main import create_app, init_database
+from src.models.user import User, db
+from src.utils.login_throttle import SQLiteBuckets
+
+
+class LoginThrottleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.app = create_app({
+            'SECRET_KEY': 'test',
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(self.workdir.name, 'app.db')}",
+            'HOST_CHANGES_DB': os.path.join(self.workdir.name, 'host_changes.db'),
+            'AUDIT_SYNC': True,
+            'LOGIN_THROTTLE_IP_BURST': 3,
+            'LOGIN_THROTTLE_USER_BURST': 2,
+        })
+        init_database(self.app)
+        with self.app.app_context():
+            user = User(username='alice', email='alice@example.com')
+            user.set_password('correta')
+            db.session.add(user)
+            db.session.commit()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def login(self, password, **environ):
+        return self.client.post('/api/auth/login', json={'username': 'alice', 'password': password},
+                                environ_base=environ).status_code
+
+    def test_forwarded_for_does_not_create_new_ip_buckets(self):
+        statuses = [self.login('errada', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'192.0.2.{i}')
+                    for i in range(4)]
+        self.assertEqual(statuses[-1], 429)
+
+    def test_successful_logins_do_not_lock_the_user(self):
+        for i in range(4):
+            self.assertEqual(self.login('correta', REMOTE_ADDR=f'10.0.1.{i}'), 200)
+
+    def test_failed_logins_lock_the_user(self):
+        statuses = [self.login('errada', REMOTE_ADDR=f'10.0.2.{i}') for i in range(3)]
+        self.assertEqual(statuses, [401, 401, 429])
+
+
+class SQLiteBucketsTest(unittest.TestCase):
+
+    def test_full_buckets_are_pruned(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            buckets = SQLiteBuckets(os.path.join(workdir, 'throttle.db'), prune_interval=0)
+            for i in range(100):
+                buckets.consume(f'ip:{i}', 10, 1.0, now=1000.0)
+            self.assertEqual(len(buckets), 100)
+            # Uma ficha consumida volta em 1 s: depois disso os buckets estão cheios
+            buckets.consume('ip:novo', 10, 1.0, now=1001.5)
+            self.assertEqual(len(buckets), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
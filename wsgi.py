@@ -0,0 +1,27 @@
+"""
+Ponto de entrada WSGI para produção.
+
+gunicorn (Linux), carregando a aplicação e os caches uma única vez no processo
+mestre antes do fork dos workers:
+    gunicorn --preload -w 4 -b 127.0.0.1:5000 wsgi:app
+
+Atrás de um proxy reverso (nginx) nesse endereço, defina TRUSTED_PROXY_COUNT=1
+para que o limite de tentativas de login use o IP real do cliente.
+
+waitress (Windows ou sem fork):
+    waitress-serve --listen=127.0.0.1:5000 wsgi:app
+
+A cada deploy, gere os arquivos estáticos publicados (hash + gzip/brotli):
+    python -m src.utils.static_assets
+
+As variáveis de ambiente aceitas estão descritas em src/config.py.
+"""
+import logging
+
+from src.main import create_app, init_database, warm_caches
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+app = create_app()
+init_database(app)
+warm_caches(app)